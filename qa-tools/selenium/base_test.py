@@ -3,9 +3,6 @@ Base test class para Selenium WebDriver
 Autor: Eddy Alexander Ramirez Lorenzana
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -13,39 +10,40 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 import os
 from config import Config
+from waits import Waits
+from driver_pool import get_pool, create_driver, reset_driver_state
+from network_cache import detach_interceptor
+from console_collector import detach_console_collector
+from session_bootstrap import bootstrap_session
+from screenshot_writer import capture_screenshot
+from page_metrics import navigate_with_metrics, format_metrics
+from tracing import traced
+from dom_snapshot import probe_present, probe_absent, locator_selector
+import idle_time
 
 class BaseTest:
     def __init__(self):
+        idle_time.install()
         self.driver = None
         self.wait = None
+        self.waits = None
+        self.pooled = False
+        self.page_metrics = []  # Una entrada por navigate_to (page_metrics.py)
         
+    @traced("helper")
     def setup_driver(self):
-        """Configurar el driver de Chrome"""
+        """Configurar el driver de Chrome (caliente desde el pool si está habilitado)"""
         try:
-            # Configurar opciones de Chrome
-            chrome_options = Options()
+            if Config.REUSE_DRIVERS:
+                self.driver = get_pool().acquire()
+                self.pooled = True
+            else:
+                self.driver = create_driver()
+                self.pooled = False
             
-            # Especificar la ruta al ejecutable de Chrome
-            chrome_options.binary_location = Config.CHROME_BINARY_PATH
-            
-            # Agregar opciones adicionales
-            for option in Config.CHROME_OPTIONS:
-                chrome_options.add_argument(option)
-                
-            if Config.HEADLESS:
-                chrome_options.add_argument("--headless")
-            
-            # Usar webdriver-manager para descargar automáticamente la versión correcta
-            from webdriver_manager.chrome import ChromeDriverManager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Configurar timeouts
-            self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
-            self.driver.set_page_load_timeout(Config.PAGE_LOAD_TIMEOUT)
-            
-            # Configurar WebDriverWait
+            # Configurar WebDriverWait y esperas basadas en eventos
             self.wait = WebDriverWait(self.driver, Config.EXPLICIT_WAIT)
+            self.waits = Waits(self.driver)
             
             print("✅ Driver de Chrome configurado exitosamente")
             return True
@@ -54,23 +52,51 @@ class BaseTest:
             print(f"❌ Error configurando driver: {e}")
             return False
     
+    @traced("helper")
+    def use_driver(self, driver):
+        """Reutilizar un driver ya creado (por ejemplo, el de un worker paralelo)"""
+        self.driver = driver
+        self.wait = WebDriverWait(self.driver, Config.EXPLICIT_WAIT)
+        self.waits = Waits(self.driver)
+    
+    @traced("helper")
+    def reset_state(self):
+        """Limpiar cookies, almacenamiento y caché vía CDP para reutilizar el driver"""
+        try:
+            reset_driver_state(self.driver)
+        except Exception as e:
+            print(f"⚠️  No se pudo limpiar el estado del navegador: {e}")
+    
+    @traced("helper")
     def teardown_driver(self):
-        """Cerrar el driver"""
+        """Cerrar el driver (o devolverlo limpio al pool)"""
         if self.driver:
-            self.driver.quit()
-            print("🔌 Driver cerrado")
+            if self.pooled:
+                get_pool().release(self.driver)
+                print("🔌 Driver devuelto al pool")
+            else:
+                detach_interceptor(self.driver)
+                detach_console_collector(self.driver)
+                self.driver.quit()
+                print("🔌 Driver cerrado")
+            self.driver = None
     
+    @traced("helper")
     def navigate_to(self, url):
         """Navegar a una URL"""
         try:
             full_url = f"{Config.BASE_URL}{url}" if not url.startswith('http') else url
-            self.driver.get(full_url)
+            metrics = navigate_with_metrics(self.driver, full_url)
             print(f"🌐 Navegando a: {full_url}")
+            if metrics:
+                self.page_metrics.append(metrics)
+                print(f"⏱️  {format_metrics(metrics)}")
             return True
         except Exception as e:
             print(f"❌ Error navegando a {url}: {e}")
             return False
     
+    @traced("helper")
     def wait_for_element(self, by, value, timeout=None):
         """Esperar a que aparezca un elemento"""
         try:
@@ -82,6 +108,7 @@ class BaseTest:
             print(f"⏰ Timeout esperando elemento: {by}={value}")
             return None
     
+    @traced("helper")
     def wait_for_clickable(self, by, value, timeout=None):
         """Esperar a que un elemento sea clickeable"""
         try:
@@ -93,41 +120,45 @@ class BaseTest:
             print(f"⏰ Timeout esperando elemento clickeable: {by}={value}")
             return None
     
-    def find_element_safe(self, by, value):
-        """Buscar elemento de forma segura"""
-        try:
-            element = self.driver.find_element(by, value)
-            return element
-        except NoSuchElementException:
+    @traced("helper")
+    def find_element_safe(self, by, value, settle=0):
+        """Buscar elemento de forma segura: una consulta al DOM, sin esperar IMPLICIT_WAIT si no está"""
+        element = probe_present(self.driver, locator_selector(by, value), settle)
+        if element is None:
             print(f"❌ Elemento no encontrado: {by}={value}")
-            return None
+        return element
+    
+    @traced("helper")
+    def is_present(self, by, value, settle=0, visible_only=False):
+        """Presencia inmediata (o dentro de 'settle' s) sin espera implícita"""
+        return probe_present(self.driver, locator_selector(by, value), settle, visible_only) is not None
+    
+    @traced("helper")
+    def is_absent(self, by, value, settle=0, visible_only=False):
+        """Ausencia en milisegundos; 'settle' da un margen acotado para que el elemento desaparezca"""
+        return probe_absent(self.driver, locator_selector(by, value), settle, visible_only)
     
+    @traced("helper")
     def take_screenshot(self, name):
-        """Tomar captura de pantalla"""
+        """Tomar captura de pantalla (la escritura a disco ocurre en segundo plano)"""
         try:
-            screenshot_dir = "screenshots"
-            if not os.path.exists(screenshot_dir):
-                os.makedirs(screenshot_dir)
-            
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = f"{screenshot_dir}/{name}_{timestamp}.png"
-            
-            self.driver.save_screenshot(filename)
-            print(f"📸 Screenshot guardada: {filename}")
+            filename = capture_screenshot(self.driver, name)
+            if filename:
+                print(f"📸 Screenshot guardada: {filename}")
             return filename
         except Exception as e:
             print(f"❌ Error tomando screenshot: {e}")
             return None
     
+    @traced("helper")
     def login(self, email=None, password=None):
         """Login automático"""
         try:
             email = email or Config.TEST_USER["email"]
             password = password or Config.TEST_USER["password"]
             
-            # Navegar a login
+            # Navegar a login (el campo de email se espera abajo)
             self.navigate_to("/login")
-            time.sleep(2)
             
             # Llenar formulario
             email_field = self.wait_for_element(By.NAME, "email")
@@ -144,8 +175,8 @@ class BaseTest:
             submit_button = self.wait_for_clickable(By.CSS_SELECTOR, "button[type='submit']")
             if submit_button:
                 submit_button.click()
-                time.sleep(3)
-                return True
+                # Esperar la redirección fuera de /login en lugar de una pausa fija
+                return self.waits.route_excludes("/login")
             
             return False
             
@@ -153,11 +184,20 @@ class BaseTest:
             print(f"❌ Error en login: {e}")
             return False
     
+    @traced("helper")
+    def login_via_api(self, email=None, password=None, landing="/"):
+        """Login rápido: JWT vía API inyectado en localStorage, sin formulario"""
+        try:
+            return bootstrap_session(self.driver, email, password, landing)
+        except Exception as e:
+            print(f"❌ Error en login vía API: {e}")
+            return False
+    
+    @traced("helper")
     def is_logged_in(self):
         """Verificar si el usuario está logueado"""
         try:
-            # Buscar elemento que solo aparece cuando está logueado
-            user_menu = self.find_element_safe(By.CSS_SELECTOR, "[data-testid='user-menu'], .user-menu")
-            return user_menu is not None
+            # Buscar elemento que solo aparece cuando está logueado (sin pagar IMPLICIT_WAIT si no está)
+            return self.is_present(By.CSS_SELECTOR, "[data-testid='user-menu'], .user-menu")
         except:
             return False
\ No newline at end of file
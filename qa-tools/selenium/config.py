@@ -6,14 +6,81 @@ class Config:
     BASE_URL = "http://localhost:5176"
     API_BASE_URL = "http://localhost:3000"
     
-    # Paths
-    CHROME_BINARY_PATH = r"C:\Users\eddyr\OneDrive\Escritorio\chrome-win64\chrome.exe"
-    CHROMEDRIVER_PATH = r"C:\Users\eddyr\OneDrive\Escritorio\software-sales-system\qa-tools\selenium\chromedriver.exe"
+    # Paths (None = detección automática sin red, ver driver_resolver.py)
+    CHROME_BINARY_PATH = os.environ.get("CHROME_BINARY_PATH")
+    CHROMEDRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+    DRIVER_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".driver_cache.json")
+    CHROMEDRIVER_ALLOW_DOWNLOAD = False  # True = webdriver-manager si no hay chromedriver local
+    
+    # Datos de prueba compartidos con JMeter (load_test.py)
+    LOAD_TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "jmeter", "test-data")
+    
+    # Resultados: JSONL por ejecución + índice SQLite entre ejecuciones (results_sink.py)
+    RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+    RESULTS_DB = os.path.join(RESULTS_DIR, "results.db")
+    
+    # Historial de duraciones compartido por todos los runners de CI (sharding.py --update)
+    SHARD_HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shard_durations.json")
+
+    # Spans por paso, helper, espera y comando WebDriver en formato trace-event (tracing.py)
+    TRACE_SPANS = os.environ.get("QA_TRACE_SPANS") == "1"
+    TRACE_DIR = os.path.join(RESULTS_DIR, "traces")
+    TRACE_MAX_EVENTS = 200000  # Por proceso; el resto se descarta
+
+    # Tiempo ocioso por test y por línea: sleeps, esperas implícitas agotadas y timeouts (idle_time.py)
+    IDLE_ACCOUNTING = True
+    IDLE_DIR = os.path.join(RESULTS_DIR, "idle")
+    
+    # Consola y excepciones JS de toda la sesión vía CDP, etiquetadas por paso (console_collector.py)
+    CONSOLE_COLLECTOR = True
+    CONSOLE_BUFFER_SIZE = 1000  # Eventos completos en el buffer circular; los contadores no rotan
+    CONSOLE_MAX_GROUPS = 500  # Firmas distintas agrupadas; las nuevas después del tope solo se cuentan
+    CONSOLE_SIGNATURE_FRAMES = 3  # Marcos de la pila que forman parte de la firma
+    CONSOLE_MAX_TEXT = 500
+    CONSOLE_MAX_STEP_MARKS = 10000  # Cambios de paso recordados para etiquetar eventos tardíos
+    
+    # Métricas web por navegación vía CDP: Navigation Timing, FCP/LCP, CLS, TBT (page_metrics.py)
+    COLLECT_PAGE_METRICS = True
+    
+    # Screenshots direccionados por contenido, escritos en segundo plano (screenshot_writer.py)
+    SCREENSHOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshots")
+    SCREENSHOT_FORMAT = "png"  # "jpeg" = compresión con pérdida hecha por Chrome
+    SCREENSHOT_QUALITY = 70  # Solo para jpeg
+    SCREENSHOT_QUEUE_SIZE = 32  # Capturas pendientes antes de empezar a descartar
+    SCREENSHOT_PHASH_DISTANCE = 4  # Bits de diferencia para anotar dos capturas como parecidas (requiere Pillow)
+    
+    # Interceptación de red vía CDP Fetch (network_cache.py)
+    # "perf" = red real sin interceptar, "cache" = assets inmutables desde la caché en disco,
+    # "fast" = caché + bloquear recursos no esenciales (pruebas funcionales rápidas)
+    # None = "perf" si COLLECT_PAGE_METRICS (métricas sobre la red real), "cache" si no
+    NETWORK_MODE = None
+    ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_cache")
+    ASSET_CACHE_TTL_HOURS = 24
+    ASSET_CACHE_PATTERNS = [  # Comodines de CDP: '*' cualquier texto
+        "*/images/*",
+        "*/node_modules/.vite/deps/*v=*",
+        "*/assets/*.js", "*/assets/*.css",
+        "*.woff2", "*.woff", "*.ttf",
+        "*.svg", "*.ico"
+    ]
+    NETWORK_BLOCK_RESOURCE_TYPES = ["Image", "Media", "Font"]  # Solo en modo "fast"
+    NETWORK_BLOCK_PATTERNS = [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*fonts.googleapis.com*", "*fonts.gstatic.com*"
+    ]
+
+    # Caché de selectores ganadores por ruta (selector_resolver.py)
+    SELECTOR_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".selector_cache.json")
     
     # Timeouts
     IMPLICIT_WAIT = 10
     EXPLICIT_WAIT = 15
     PAGE_LOAD_TIMEOUT = 30
+    PROBE_SETTLE_MAX = 2  # Tope (s) de la ventana de asentamiento de probe_present/probe_absent
+    SCRIPT_TIMEOUT = 30  # execute_async_script (30 = default W3C); waits.script_timeout lo sube solo si hace falta
+    
+    # Pausas fijas (time.sleep) entre pasos; desactivadas para esperar eventos reales
+    FIXED_SLEEPS = False  # Cambiar a True para ver los pasos a velocidad humana (demos)
     
     # Usuario de prueba
     TEST_USER = {
@@ -22,6 +89,10 @@ class Config:
         "name": "Usuario Demo"
     }
     
+    # Login vía API (POST /api/auth/login + localStorage) en lugar del formulario.
+    # test_login.py siempre usa el formulario real.
+    FAST_LOGIN = True
+    
     # Nuevo usuario para registro
     NEW_USER = {
         "email": "test@selenium.com",
@@ -35,8 +106,27 @@ class Config:
         "--disable-dev-shm-usage",
         "--disable-gpu",
         "--window-size=1920,1080",
-        "--start-maximized"
+        "--start-maximized",
+        # Sin pausar frames ni frenar timers en ventanas tapadas (ventanas paralelas de responsive.py)
+        "--disable-backgrounding-occluded-windows",
+        "--disable-renderer-backgrounding",
+        "--disable-background-timer-throttling"
     ]
     
+    WINDOW_SIZE = (1920, 1080)
+    
+    # Matriz de dispositivos de TC-003, emulados en ventanas paralelas vía CDP (responsive.py)
+    RESPONSIVE_DEVICES = [
+        {"name": "Desktop", "width": 1920, "height": 1080, "scale": 1, "mobile": False},
+        {"name": "Tablet", "width": 768, "height": 1024, "scale": 2, "mobile": True},
+        {"name": "Mobile", "width": 375, "height": 667, "scale": 2, "mobile": True}
+    ]
+    RESPONSIVE_PARALLEL = True  # False = emular uno por uno en la pestaña actual
+    RESPONSIVE_MAX_WINDOWS = 4  # Ventanas emuladas abiertas a la vez
+    
+    # Reutilizar procesos de Chrome entre tests (estado limpiado vía CDP)
+    REUSE_DRIVERS = True
+    DRIVER_POOL_SIZE = 1  # Chrome vivos por proceso
+    
     # Para ejecutar en modo headless (sin interfaz gráfica)
     HEADLESS = False  # Cambiar a True para ejecutar sin interfaz
\ No newline at end of file
@@ -0,0 +1,2 @@
+# Fixtures y recolección de las suites de Selenium para pytest (ver pytest_plugin.py)
+pytest_plugins = ["pytest_plugin"]
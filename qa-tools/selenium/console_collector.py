@@ -0,0 +1,307 @@
+"""
+Colector de consola y excepciones JavaScript por sesión de navegador (CDP)
+driver.get_log('browser') devuelve solo lo que sigue en el buffer de
+chromedriver al momento de llamarlo: lo que rotó antes se pierde y nada indica
+qué paso del test lo produjo. Aquí una conexión CDP propia (como en
+network_cache.py) escucha durante toda la sesión:
+
+    Runtime.consoleAPICalled   console.error / warn / log / assert ...
+    Runtime.exceptionThrown    excepciones no capturadas
+    Log.entryAdded             errores del navegador (recursos 404, CSP, ...)
+
+Cada evento se etiqueta con el paso activo en el instante en que ocurrió
+(timestamp de Chrome contra la línea de tiempo de step()) y con su ámbito, el
+paso más externo (el item de pytest, la suite de run_parallel.py); se guarda en un
+buffer circular de CONSOLE_BUFFER_SIZE eventos y se agrupa por firma (nivel,
+texto y primeros marcos de la pila). Los contadores por paso y por grupo se
+actualizan al llegar cada evento, así que no se pierden cuando el buffer rota
+y consultarlos no cuesta ningún comando WebDriver.
+
+Uso:
+    collector = attach_console_collector(driver)
+    with step("Agregar al carrito"):      # o @stepped() sobre la función del paso
+        ...
+    collector.counts_by_step()   # {'Agregar al carrito': {'error': 2, 'warning': 0, ...}}
+    collector.counts(scope=current_scope())   # {nivel: n} del test/suite en curso
+    collector.groups(level='error')
+"""
+
+import math
+import time
+import bisect
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+from network_cache import _cdp_endpoint
+
+try:
+    import trio
+    from selenium.webdriver.common.bidi import cdp
+except ImportError:  # Sin trio no hay eventos CDP: queda driver.get_log('browser')
+    trio = None
+
+NO_STEP = "(sin paso)"
+
+# Tipos de consoleAPICalled agrupados en los niveles de los contadores
+CONSOLE_LEVELS = {"error": "error", "assert": "error", "warning": "warning"}
+LOG_LEVELS = {"error": "error", "warning": "warning"}
+
+# Línea de tiempo de pasos compartida por todos los colectores del proceso
+_steps_lock = threading.Lock()
+_step_stack = []
+_step_times = []  # ms epoch de cada cambio de paso, en orden
+_step_paths = []  # pila de pasos activa a partir del instante correspondiente
+
+
+def _mark():
+    _step_times.append(time.time() * 1000)
+    _step_paths.append(tuple(_step_stack))
+    if len(_step_times) > Config.CONSOLE_MAX_STEP_MARKS:
+        del _step_times[0], _step_paths[0]
+
+
+@contextmanager
+def step(name):
+    """Marcar el paso activo: los eventos ocurridos dentro quedan a su nombre (anidable)"""
+    with _steps_lock:
+        _step_stack.append(name)
+        _mark()
+    try:
+        yield
+    finally:
+        with _steps_lock:
+            _step_stack.pop()
+            _mark()
+
+
+def stepped(name=None):
+    """Decorador: la función completa como un paso (por defecto, con su nombre)"""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with step(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_step():
+    with _steps_lock:
+        return _step_stack[-1] if _step_stack else None
+
+
+def current_scope():
+    """Paso más externo en curso (None fuera de todo paso = toda la sesión)"""
+    with _steps_lock:
+        return _step_stack[0] if _step_stack else None
+
+
+def step_at(timestamp_ms):
+    """(ámbito, paso) activos en un instante (ms epoch, el reloj de los timestamps de Chrome)"""
+    with _steps_lock:
+        index = bisect.bisect_right(_step_times, timestamp_ms) - 1
+        path = _step_paths[index] if index >= 0 else ()
+    return (path[0], path[-1]) if path else (NO_STEP, NO_STEP)
+
+
+def _frames(stack_trace):
+    if stack_trace is None:
+        return ()
+    return tuple(f"{frame.function_name or '(anónima)'} {frame.url}:{frame.line_number + 1}:{frame.column_number + 1}"
+                 for frame in stack_trace.call_frames[:Config.CONSOLE_SIGNATURE_FRAMES])
+
+
+def _remote_text(remote):
+    if remote.value is not None:
+        return str(remote.value)
+    return remote.description or remote.unserializable_value or remote.type_
+
+
+class ConsoleCollector:
+    def __init__(self, driver, buffer_size=None):
+        self.driver = driver
+        self.events = deque(maxlen=buffer_size or Config.CONSOLE_BUFFER_SIZE)
+        self.step_counts = {}  # (ámbito, paso) -> {nivel: n}
+        self.group_index = {}  # firma -> grupo
+        self.total = 0
+        self.dropped_groups = 0
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.error = None
+        self.thread = None
+        self._token = None
+        self._scope = None
+
+    def start(self, timeout=10):
+        """Arrancar el hilo de eventos; False si no se pudo habilitar Runtime"""
+        self.thread = threading.Thread(target=self._run, name="console-collector", daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout) or self.error:
+            print(f"[WARN] Colector de consola desactivado: {self.error or 'timeout'}")
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        if self._token is not None and self._scope is not None:
+            try:
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+            except (trio.RunFinishedError, RuntimeError):
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            if not self.ready.is_set():
+                self.error = str(e)[:100] or type(e).__name__
+                self.ready.set()
+
+    async def _main(self):
+        self._token = trio.lowlevel.current_trio_token()
+        ws_url, version = _cdp_endpoint(self.driver)
+        devtools = cdp.import_devtools(version)
+        runtime, log = devtools.runtime, devtools.log
+        with trio.CancelScope() as scope:
+            self._scope = scope
+            async with cdp.open_cdp(ws_url) as conn:
+                targets = await conn.execute(devtools.target.get_targets())
+                page = next(t for t in targets if t.type_ == "page")
+                async with conn.open_session(page.target_id) as session:
+                    events = session.listen(runtime.ConsoleAPICalled, runtime.ExceptionThrown,
+                                            log.EntryAdded, buffer_size=math.inf)
+                    await session.execute(runtime.enable())
+                    await session.execute(log.enable())
+                    self.ready.set()
+                    async for event in events:
+                        if isinstance(event, runtime.ConsoleAPICalled):
+                            self._add_console(event)
+                        elif isinstance(event, runtime.ExceptionThrown):
+                            self._add_exception(event)
+                        else:
+                            self._add_log(event)
+
+    def _add_console(self, event):
+        text = " ".join(_remote_text(arg) for arg in event.args)
+        self.add("console", CONSOLE_LEVELS.get(event.type_, "info"), text,
+                 float(event.timestamp), _frames(event.stack_trace))
+
+    def _add_exception(self, event):
+        details = event.exception_details
+        text = details.text
+        if details.exception is not None and details.exception.description:
+            # "Uncaught" + primera línea de la descripción (tipo y mensaje, sin la pila)
+            text = f"{text} {details.exception.description.splitlines()[0]}"
+        frames = _frames(details.stack_trace)
+        if not frames and details.url:
+            frames = (f"{details.url}:{details.line_number + 1}:{details.column_number + 1}",)
+        self.add("exception", "error", text, float(event.timestamp), frames)
+
+    def _add_log(self, event):
+        entry = event.entry
+        # Los mensajes de console.* ya llegan por Runtime; de Log solo interesa el navegador
+        if entry.source == "javascript":
+            return
+        frames = _frames(entry.stack_trace) or ((entry.url,) if entry.url else ())
+        self.add(f"log:{entry.source}", LOG_LEVELS.get(entry.level, "info"),
+                 entry.text, float(entry.timestamp), frames)
+
+    def add(self, kind, level, text, timestamp_ms, frames=()):
+        """Registrar un evento: buffer circular, contador del paso y grupo de su firma"""
+        scope, step_name = step_at(timestamp_ms)
+        text = text[:Config.CONSOLE_MAX_TEXT]
+        event = {'kind': kind, 'level': level, 'text': text, 'timestamp': timestamp_ms,
+                 'scope': scope, 'step': step_name, 'stack': list(frames)}
+        signature = (level, text, frames)
+        with self.lock:
+            self.events.append(event)
+            self.total += 1
+            counts = self.step_counts.setdefault((scope, step_name), {})
+            counts[level] = counts.get(level, 0) + 1
+            group = self.group_index.get(signature)
+            if group is None:
+                if len(self.group_index) >= Config.CONSOLE_MAX_GROUPS:
+                    self.dropped_groups += 1
+                    return
+                group = self.group_index[signature] = {
+                    'kind': kind, 'level': level, 'text': text, 'stack': list(frames),
+                    'count': 0, 'first_step': step_name, 'steps': {}, 'scopes': {}}
+            group['count'] += 1
+            group['steps'][step_name] = group['steps'].get(step_name, 0) + 1
+            group['scopes'][scope] = group['scopes'].get(scope, 0) + 1
+
+    # --- Consultas (en memoria, sin comandos WebDriver) --------------------------
+
+    def counts_by_step(self, scope=None):
+        """{paso: {nivel: n}} de la sesión o de un ámbito, incluidos los eventos que ya rotaron"""
+        totals = {}
+        with self.lock:
+            for (event_scope, name), counts in self.step_counts.items():
+                if scope is None or event_scope == scope:
+                    step_totals = totals.setdefault(name, {})
+                    for level, n in counts.items():
+                        step_totals[level] = step_totals.get(level, 0) + n
+        return totals
+
+    def counts(self, step_name=None, scope=None):
+        """{nivel: n} de un paso, de un ámbito o de toda la sesión"""
+        totals = {}
+        for name, counts in self.counts_by_step(scope).items():
+            if step_name is None or name == step_name:
+                for level, n in counts.items():
+                    totals[level] = totals.get(level, 0) + n
+        return totals
+
+    def recent(self, level=None, step_name=None, scope=None):
+        """Eventos que siguen en el buffer circular, del más viejo al más nuevo"""
+        with self.lock:
+            events = list(self.events)
+        return [e for e in events
+                if (level is None or e['level'] == level) and (step_name is None or e['step'] == step_name)
+                and (scope is None or e['scope'] == scope)]
+
+    def groups(self, level=None, scope=None):
+        """Grupos de eventos idénticos (misma firma), de más a menos frecuente"""
+        with self.lock:
+            groups = [dict(g, steps=dict(g['steps']), scopes=dict(g['scopes'])) for g in self.group_index.values()
+                      if (level is None or g['level'] == level) and (scope is None or scope in g['scopes'])]
+        return sorted(groups, key=lambda g: g['count'], reverse=True)
+
+
+def attach_console_collector(driver):
+    """Escuchar la consola de un driver recién creado (None si no hay CDP o está desactivado)"""
+    if not Config.CONSOLE_COLLECTOR:
+        return None
+    if trio is None:
+        print("[WARN] trio no está instalado: colector de consola desactivado")
+        return None
+    collector = ConsoleCollector(driver)
+    try:
+        started = collector.start()
+    except Exception as e:
+        print(f"[WARN] Colector de consola desactivado: {str(e)[:100]}")
+        return None
+    if not started:
+        return None
+    driver._qa_console = collector
+    return collector
+
+
+def get_console_collector(driver):
+    return getattr(driver, "_qa_console", None)
+
+
+def detach_console_collector(driver):
+    """Detener el colector antes de cerrar el driver; devuelve sus contadores por paso"""
+    collector = get_console_collector(driver)
+    if collector is None:
+        return None
+    collector.stop()
+    driver._qa_console = None
+    return collector.counts_by_step()
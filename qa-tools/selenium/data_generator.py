@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Generador masivo de datos sintéticos para SQLite
+Escribe usuarios, productos y cart_items directamente con el esquema de
+backend/database/migrate.js (las sentencias CREATE se leen de ese archivo),
+en lotes de executemany dentro de transacciones grandes y con pragmas de carga
+masiva: sin journal, sin fsync, caché grande, claves foráneas desactivadas e
+índices secundarios recreados al final.
+
+Los hashes de contraseña (bcrypt, mismo costo que el backend) se calculan en
+un pool de procesos mientras se insertan los productos. Con millones de
+usuarios no tiene sentido un hash por usuario: se generan --unique-passwords
+contraseñas distintas y los usuarios las reparten cíclicamente; el CSV indica
+la de cada uno. Sin el paquete bcrypt se reutiliza el hash del usuario demo
+de la BD de origen (contraseña de TEST_USER para todos).
+
+Además de la BD se escriben users.csv y products.csv con el formato de
+jmeter/test-data para load_test.py y los planes de JMeter.
+
+Uso:
+    python data_generator.py --users 1000000 --products 100000
+    python data_generator.py --users 50000 --db /tmp/qa.db --from-db ../../backend/database/software_sales.db
+"""
+
+import os
+import re
+import csv
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import itertools
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from stub_backend import iter_catalog
+
+try:
+    import bcrypt
+except ImportError:  # Sin bcrypt: un solo hash conocido para todos los usuarios
+    bcrypt = None
+
+BACKEND_DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "database")
+MIGRATE_JS = os.path.join(BACKEND_DATABASE_DIR, "migrate.js")
+SOURCE_DB = os.path.join(BACKEND_DATABASE_DIR, "software_sales.db")
+DEFAULT_OUTPUT_DIR = os.path.join(Config.RESULTS_DIR, "synthetic")
+
+BCRYPT_ROUNDS = 10  # Igual que bcrypt.hash(..., 10) en SqliteUserRepository
+BATCH_SIZE = 10000
+COMMIT_EVERY = 500000  # Filas por transacción
+
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Carmen", "Carlos", "Lucía", "Jorge", "Sofía", "Miguel",
+               "Elena", "Pedro", "Laura", "Diego", "Paula", "Andrés", "Valeria", "Ricardo", "Daniela", "Fernando"]
+LAST_NAMES = ["García", "López", "Martínez", "Rodríguez", "Pérez", "González", "Hernández", "Ramírez",
+              "Torres", "Flores", "Morales", "Castillo", "Ortiz", "Vásquez", "Reyes", "Cruz"]
+
+# Pragmas de carga masiva: la BD generada se descarta si el proceso muere a mitad
+BULK_PRAGMAS = [
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA cache_size=-262144",  # 256 MB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA locking_mode=EXCLUSIVE",
+    "PRAGMA foreign_keys=OFF"
+]
+
+
+def migration_statements(path=MIGRATE_JS):
+    """CREATE TABLE / CREATE INDEX tal como los ejecuta migrate.js"""
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    return [sql.strip() for sql in re.findall(r"`(\s*CREATE\s.*?)`", source, re.S)]
+
+
+def _ascii(text):
+    return (text.lower().replace("á", "a").replace("é", "e").replace("í", "i")
+            .replace("ó", "o").replace("ú", "u").replace("ñ", "n"))
+
+
+def _timestamp(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("ascii")
+
+
+def hash_passwords(passwords, rounds=BCRYPT_ROUNDS, workers=None):
+    """Iterador de hashes en el mismo orden; el cálculo arranca de inmediato en el pool"""
+    executor = ProcessPoolExecutor(max_workers=workers)
+    chunksize = max(1, len(passwords) // ((workers or os.cpu_count() or 1) * 4))
+    results = executor.map(_hash, passwords, itertools.repeat(rounds), chunksize=chunksize)
+    executor.shutdown(wait=False)
+    return results
+
+
+def _known_hash(source_db):
+    """Hash bcrypt existente de TEST_USER en la BD de origen (sin paquete bcrypt)"""
+    try:
+        conn = sqlite3.connect(source_db)
+        try:
+            row = conn.execute("SELECT password_hash FROM users WHERE email = ?",
+                               (Config.TEST_USER['email'],)).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        row = None
+    return row[0] if row else None
+
+
+def _insert_batches(conn, sql, rows):
+    """executemany por lotes, con un COMMIT cada COMMIT_EVERY filas"""
+    total = 0
+    conn.execute("BEGIN")
+    while True:
+        batch = list(itertools.islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        conn.executemany(sql, batch)
+        total += len(batch)
+        if total % COMMIT_EVERY < BATCH_SIZE:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+    conn.execute("COMMIT")
+    return total
+
+
+def insert_products(conn, count, seed=42, skip=0):
+    """Productos del catálogo sintético (stub_backend.iter_catalog); 'skip' omite los primeros"""
+    rows = ((p['name'], p['description'], p['price'], p['category'], p['version'],
+             p['compatibility'], p['imageUrl'],
+             p['createdAt'][:19].replace('T', ' '), p['updatedAt'][:19].replace('T', ' '))
+            for p in itertools.islice(iter_catalog(count, seed), skip, None))
+    return _insert_batches(conn, """INSERT INTO products (name, description, price, category, version,
+                                    compatibility, image_url, created_at, updated_at)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+
+
+def _users(count, passwords, hashes, rng, start_index):
+    now = datetime(2025, 9, 1)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f"{_ascii(first)}.{_ascii(last)}.{start_index + i}@example.com"
+        created_at = _timestamp(now - timedelta(seconds=rng.randrange(2 * 365 * 86400)))
+        yield (f"{first} {last}", email, hashes[i % len(hashes)], created_at, created_at), \
+            (email, passwords[i % len(passwords)], first, last)
+
+
+def _cart_items(user_ids, product_ids, ratio, mean_items, rng):
+    now = datetime(2025, 9, 1)
+    for user_id in user_ids:
+        if rng.random() >= ratio:
+            continue
+        # Entre 1 y 2*media-1 productos distintos por carrito (UNIQUE(user_id, product_id))
+        size = min(len(product_ids), rng.randint(1, max(1, 2 * mean_items - 1)))
+        for product_id in rng.sample(product_ids, size):
+            yield (user_id, product_id, rng.randint(1, 3),
+                   _timestamp(now - timedelta(seconds=rng.randrange(30 * 86400))))
+
+
+def _search_term(name):
+    """Palabra más distintiva del nombre, como la columna searchTerm de JMeter"""
+    words = [w for w in re.findall(r"[a-záéíóúñ]+", name.lower()) if len(w) > 2]
+    return max(words, key=len) if words else name.lower()
+
+
+def generate(args):
+    os.makedirs(args.output_dir, exist_ok=True)
+    db_path = args.db or os.path.join(args.output_dir, "software_sales_synthetic.db")
+    tmp_path = f"{db_path}.tmp"
+    if args.from_db:
+        shutil.copyfile(args.from_db, tmp_path)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    rng = random.Random(args.seed)
+    timings = {}
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        for pragma in BULK_PRAGMAS:
+            conn.execute(pragma)
+        statements = migration_statements()
+        for sql in statements:
+            if sql.upper().startswith("CREATE TABLE"):
+                conn.execute(sql)
+        # Índices secundarios fuera durante la carga; se recrean al final en una pasada
+        index_sql = [sql for sql in statements if sql.upper().startswith("CREATE INDEX")]
+        for sql in index_sql:
+            index_name = re.search(r"EXISTS\s+(\w+)", sql).group(1)
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        # Hashes en segundo plano mientras se cargan los productos
+        passwords = [f"Qa{rng.randrange(10**8):08d}!" for _ in range(min(args.users, args.unique_passwords))]
+        start = time.perf_counter()
+        if bcrypt is not None:
+            hashes = hash_passwords(passwords, args.bcrypt_rounds, args.workers)
+        else:
+            known = _known_hash(args.from_db or SOURCE_DB)
+            if not known:
+                raise RuntimeError("bcrypt no está instalado y no hay un hash de TEST_USER en la BD de origen")
+            print(f"[WARN] bcrypt no está instalado: todos los usuarios usan la contraseña de {Config.TEST_USER['email']}")
+            passwords, hashes = [Config.TEST_USER['password']], iter([known])
+
+        existing_products = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        t = time.perf_counter()
+        # Con --from-db se omiten las primeras filas del catálogo, como en search_benchmark.py
+        insert_products(conn, existing_products + args.products, args.seed, skip=existing_products)
+        timings['products'] = round(time.perf_counter() - t, 2)
+
+        hashes = list(hashes)
+        timings['password_hashes'] = round(time.perf_counter() - start, 2)
+
+        t = time.perf_counter()
+        first_user = (conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]) + 1
+        users_csv = os.path.join(args.output_dir, "users.csv")
+        with open(users_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "password", "firstName", "lastName"])
+
+            def rows():
+                for row, csv_row in _users(args.users, passwords, hashes, rng, first_user):
+                    writer.writerow(csv_row)
+                    yield row
+            _insert_batches(conn, """INSERT INTO users (name, email, password_hash, created_at, updated_at)
+                                     VALUES (?, ?, ?, ?, ?)""", rows())
+        timings['users'] = round(time.perf_counter() - t, 2)
+
+        t = time.perf_counter()
+        user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE id >= ?", (first_user,))]
+        product_ids = [row[0] for row in conn.execute("SELECT id FROM products")]
+        cart_count = _insert_batches(conn, """INSERT OR IGNORE INTO cart_items (user_id, product_id, quantity, created_at)
+                                              VALUES (?, ?, ?, ?)""",
+                                     _cart_items(user_ids, product_ids, args.cart_ratio, args.cart_items, rng))
+        timings['cart_items'] = round(time.perf_counter() - t, 2)
+
+        t = time.perf_counter()
+        products_csv = os.path.join(args.output_dir, "products.csv")
+        with open(products_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["productId", "productName", "searchTerm", "category", "quantity"])
+            for product_id, name, category in conn.execute("SELECT id, name, category FROM products"):
+                writer.writerow([product_id, name, _search_term(name), category, rng.randint(1, 3)])
+
+        for sql in index_sql:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+        timings['indexes_and_csv'] = round(time.perf_counter() - t, 2)
+
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("users", "products", "cart_items")}
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return {
+        'db': db_path,
+        'users_csv': users_csv,
+        'products_csv': products_csv,
+        'counts': counts,
+        'new_products': counts['products'] - existing_products,
+        'new_cart_items': cart_count,
+        'unique_password_hashes': len(hashes),
+        'timings_seconds': timings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Datos sintéticos masivos con el esquema de migrate.js")
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--products', type=int, default=10000)
+    parser.add_argument('--cart-ratio', type=float, default=0.3, help="Fracción de usuarios con carrito")
+    parser.add_argument('--cart-items', type=int, default=3, help="Productos promedio por carrito")
+    parser.add_argument('--unique-passwords', type=int, default=1000,
+                        help="Contraseñas (y hashes bcrypt) distintas repartidas entre los usuarios")
+    parser.add_argument('--bcrypt-rounds', type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument('--workers', type=int, default=None, help="Procesos para bcrypt (por defecto: núcleos)")
+    parser.add_argument('--db', help="BD de salida (por defecto: results/synthetic/software_sales_synthetic.db)")
+    parser.add_argument('--from-db', help="Partir de una copia de esta BD en lugar de una vacía")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="Dónde quedan la BD y los CSV")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        report = generate(args)
+    except (RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"BD generada: {report['db']}")
+    for table, count in report['counts'].items():
+        print(f"  {table:<11} {count:>12,}")
+    print(f"CSV: {report['users_csv']}, {report['products_csv']}")
+    print(f"Hashes bcrypt distintos: {report['unique_password_hashes']}")
+    print("Tiempos (s): " + ", ".join(f"{name}={value}" for name, value in report['timings_seconds'].items()))
+    rows = sum(report['counts'].values())
+    print(f"Total: {round(elapsed, 1)} s ({round(rows / elapsed):,} filas/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Snapshot del DOM en un solo round-trip
+En lugar de llamar is_displayed(), is_enabled(), .text y get_attribute()
+elemento por elemento (un comando HTTP de WebDriver cada uno), serializa
+todos los elementos que coinciden con los selectores en una sola llamada.
+El filtrado se hace después en Python sobre la lista de diccionarios.
+
+probe_present / probe_absent responden "¿está?" con una sola consulta al DOM,
+sin la espera implícita que paga find_element cuando el elemento no existe.
+"""
+
+from config import Config
+from waits import script_timeout
+
+DEFAULT_ATTRIBUTES = [
+    "id", "class", "type", "name", "href", "role", "title",
+    "aria-label", "data-slot", "data-testid", "placeholder", "value"
+]
+
+# Funciones JS comunes a los scripts de este módulo y a selector_resolver.py: una
+# sola definición de qué selector es XPath, de cómo se consulta y de qué es visible
+QUERY_HELPERS = """
+function isXPath(sel) { return sel.charAt(0) === '/' || sel.indexOf('./') === 0 || sel.charAt(0) === '('; }
+function query(sel, root) {
+    root = root || document;
+    try {
+        if (isXPath(sel)) {
+            var snapshot = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var k = 0; k < snapshot.snapshotLength; k++) { nodes.push(snapshot.snapshotItem(k)); }
+            return nodes;
+        }
+        return Array.prototype.slice.call(root.querySelectorAll(sel));
+    } catch (e) {
+        return [];  // selector inválido para este motor: se ignora
+    }
+}
+function countOf(sel, root) {
+    root = root || document;
+    if (isXPath(sel)) {
+        return document.evaluate('count(' + sel + ')', root, null, XPathResult.NUMBER_TYPE, null).numberValue;
+    }
+    return root.querySelectorAll(sel).length;
+}
+function isVisible(el, rect) {
+    rect = rect || el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) { return false; }
+    if (el.checkVisibility) { return el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true}); }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+}
+"""
+
+SNAPSHOT_SCRIPT = QUERY_HELPERS + """
+var selectors = arguments[0], attributes = arguments[1], root = arguments[2] || document;
+var limit = arguments[3], textLimit = arguments[4];
+window.__qaHandles = window.__qaHandles || new WeakMap();
+window.__qaNextHandle = window.__qaNextHandle || 1;
+function handleFor(el) {
+    if (!window.__qaHandles.has(el)) { window.__qaHandles.set(el, window.__qaNextHandle++); }
+    return window.__qaHandles.get(el);
+}
+var seen = new Set(), out = [];
+for (var i = 0; i < selectors.length; i++) {
+    var elements = query(selectors[i], root);
+    for (var j = 0; j < elements.length; j++) {
+        var el = elements[j];
+        if (seen.has(el)) { continue; }
+        seen.add(el);
+        var rect = el.getBoundingClientRect();
+        var attrs = {};
+        for (var a = 0; a < attributes.length; a++) {
+            var value = el.getAttribute(attributes[a]);
+            if (value !== null) { attrs[attributes[a]] = value; }
+        }
+        out.push({
+            selector: selectors[i],
+            handle: handleFor(el),
+            element: el,
+            tag: el.tagName.toLowerCase(),
+            text: (el.innerText || el.textContent || '').trim().substring(0, textLimit),
+            attributes: attrs,
+            visible: isVisible(el, rect),
+            enabled: !el.disabled && el.getAttribute('aria-disabled') !== 'true',
+            rect: {x: Math.round(rect.x), y: Math.round(rect.y),
+                   width: Math.round(rect.width), height: Math.round(rect.height)}
+        });
+        if (limit && out.length >= limit) { return out; }
+    }
+}
+return out;
+"""
+
+COUNT_SCRIPT = QUERY_HELPERS + """
+var selectors = arguments[0], counts = {};
+selectors.forEach(function (sel) {
+    try {
+        counts[sel] = countOf(sel);
+    } catch (e) {
+        counts[sel] = 0;
+    }
+});
+return counts;
+"""
+
+
+# Primer elemento que coincide; con settleMs > 0 espera (MutationObserver) a que la
+# respuesta buscada se cumpla, como mucho settleMs. Sin esperas implícitas: una sola llamada.
+PROBE_SCRIPT = QUERY_HELPERS + """
+var selectors = arguments[0], wantPresent = arguments[1], settleMs = arguments[2], visibleOnly = arguments[3];
+var done = arguments[arguments.length - 1];
+function first() {
+    for (var i = 0; i < selectors.length; i++) {
+        var elements = query(selectors[i]);
+        for (var j = 0; j < elements.length; j++) {
+            if (!visibleOnly || isVisible(elements[j])) { return elements[j]; }
+        }
+    }
+    return null;
+}
+function answered(el) { return wantPresent ? el !== null : el === null; }
+var found = first();
+if (answered(found) || settleMs <= 0) { done(found); return; }
+var finished = false;
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    done(first());
+}
+var observer = new MutationObserver(function () { if (answered(first())) { finish(); } });
+observer.observe(document, {subtree: true, childList: true, attributes: true});
+setTimeout(finish, settleMs);
+"""
+
+# Localizadores de Selenium expresados como selector CSS o XPath para los scripts
+_LOCATOR_SELECTORS = {
+    "css selector": lambda v: v,
+    "xpath": lambda v: v,
+    "id": lambda v: f'[id="{v}"]',
+    "name": lambda v: f'[name="{v}"]',
+    "class name": lambda v: f".{v}",
+    "tag name": lambda v: v,
+    "link text": lambda v: f'//a[normalize-space()="{v}"]',
+    "partial link text": lambda v: f'//a[contains(normalize-space(), "{v}")]',
+}
+
+
+def snapshot(driver, selectors, root=None, attributes=None, limit=None, text_limit=200):
+    """
+    Serializar los elementos que coinciden con los selectores en un solo round-trip.
+    Cada entrada trae: selector, handle (id estable dentro de la página), element
+    (WebElement para interactuar), tag, text, attributes, visible, enabled y rect.
+    """
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    return driver.execute_script(SNAPSHOT_SCRIPT, list(selectors), attributes or DEFAULT_ATTRIBUTES,
+                                 root, limit or 0, text_limit) or []
+
+
+def count(driver, selectors):
+    """Número de coincidencias por selector (CSS o XPath), sin esperas implícitas"""
+    return driver.execute_script(COUNT_SCRIPT, list(selectors)) or {}
+
+
+def visible(entries):
+    """Filtrar las entradas visibles del snapshot"""
+    return [entry for entry in entries if entry['visible']]
+
+
+def interactive(entries):
+    """Filtrar las entradas visibles y habilitadas del snapshot"""
+    return [entry for entry in entries if entry['visible'] and entry['enabled']]
+
+
+def first_selector_group(entries):
+    """Entradas del primer selector (en orden) que obtuvo coincidencias"""
+    if not entries:
+        return []
+    winner = entries[0]['selector']
+    return [entry for entry in entries if entry['selector'] == winner]
+
+
+def describe(entry):
+    """Descripción corta de una entrada para los logs de debug"""
+    attrs = entry['attributes']
+    label = entry['text'][:30] or attrs.get('aria-label', '') or attrs.get('title', '')
+    return f"<{entry['tag']} class='{attrs.get('class', '')[:50]}' text='{label}'>"
+
+
+def locator_selector(by, value):
+    """Selector CSS/XPath equivalente a un localizador (By.NAME, By.ID, ...)"""
+    return _LOCATOR_SELECTORS[by](value)
+
+
+def _probe(driver, selectors, want_present, settle, visible_only):
+    if isinstance(selectors, str):
+        selectors = [selectors]
+    settle_ms = int(min(settle, Config.PROBE_SETTLE_MAX) * 1000)
+    with script_timeout(driver, settle_ms / 1000 + 5):
+        return driver.execute_async_script(PROBE_SCRIPT, list(selectors), want_present, settle_ms, visible_only)
+
+
+def probe_present(driver, selectors, settle=0, visible_only=False):
+    """Primer elemento presente (o None) sin pagar la espera implícita; espera como mucho 'settle' s"""
+    return _probe(driver, selectors, True, settle, visible_only)
+
+
+def probe_absent(driver, selectors, settle=0, visible_only=False):
+    """True si ningún selector coincide; con 'settle' da tiempo (acotado) a que desaparezca"""
+    return _probe(driver, selectors, False, settle, visible_only) is None
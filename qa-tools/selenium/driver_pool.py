@@ -0,0 +1,161 @@
+"""
+Pool de drivers de Chrome reutilizables
+Mantiene los procesos de Chrome vivos entre tests y los devuelve limpios
+(cookies, localStorage, sessionStorage, IndexedDB y caché) mediante CDP,
+sin relanzar el navegador. Chrome y chromedriver se resuelven sin red una
+sola vez por proceso (driver_resolver.py) y cada Chrome nuevo arranca con
+la interceptación de red de network_cache.py según Config.NETWORK_MODE y
+el colector de consola de console_collector.py.
+"""
+
+import queue
+import atexit
+import threading
+from urllib.parse import urlparse
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from config import Config
+from driver_resolver import chrome_binary, chromedriver_path
+from network_cache import attach_interceptor, detach_interceptor
+from console_collector import attach_console_collector, detach_console_collector
+
+# Tipos de almacenamiento que Storage.clearDataForOrigin limpia por origen
+STORAGE_TYPES = "local_storage,indexeddb,websql,cache_storage,service_workers,file_systems"
+
+
+def build_chrome_options():
+    """Opciones de Chrome a partir de Config"""
+    chrome_options = Options()
+    if chrome_binary():
+        chrome_options.binary_location = chrome_binary()
+
+    for option in Config.CHROME_OPTIONS:
+        chrome_options.add_argument(option)
+
+    if Config.HEADLESS:
+        chrome_options.add_argument("--headless")
+
+    return chrome_options
+
+
+def create_driver():
+    """Lanzar un Chrome nuevo con los timeouts de Config"""
+    service = Service(chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=build_chrome_options())
+    driver.implicitly_wait(Config.IMPLICIT_WAIT)
+    driver.set_page_load_timeout(Config.PAGE_LOAD_TIMEOUT)
+    driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+    attach_interceptor(driver)
+    attach_console_collector(driver)
+    return driver
+
+
+def _app_origins():
+    """Orígenes del frontend y de la API cuyo almacenamiento se limpia"""
+    return ["{0.scheme}://{0.netloc}".format(urlparse(url))
+            for url in (Config.BASE_URL, Config.API_BASE_URL)]
+
+
+def reset_driver_state(driver):
+    """Dejar el navegador como recién abierto sin relanzarlo"""
+    # sessionStorage es por pestaña: limpiarlo desde la página antes de salir de ella
+    if driver.current_url.startswith("http"):
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.get("about:blank")
+
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        for origin in _app_origins():
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin",
+                                   {"origin": origin, "storageTypes": STORAGE_TYPES})
+    except AttributeError:
+        # Driver sin CDP: solo se pueden borrar las cookies
+        driver.delete_all_cookies()
+
+    # Deshacer cambios que algunos tests hacen sobre la sesión
+    driver.implicitly_wait(Config.IMPLICIT_WAIT)
+    driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+    driver.set_window_size(*Config.WINDOW_SIZE)
+
+
+def is_alive(driver):
+    """Comprobar que el proceso de Chrome sigue respondiendo"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class DriverPool:
+    def __init__(self, size=1, factory=create_driver):
+        self.size = size
+        self.factory = factory
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Obtener un driver: uno caliente si hay, uno nuevo si no se llegó a 'size'"""
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    can_create = self.created < self.size
+                    if can_create:
+                        self.created += 1
+                if can_create:
+                    try:
+                        return self.factory()
+                    except Exception:
+                        with self.lock:
+                            self.created -= 1
+                        raise
+                driver = self.idle.get(timeout=timeout)
+
+            if is_alive(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver):
+        """Devolver el driver al pool con el estado limpio"""
+        try:
+            reset_driver_state(driver)
+            self.idle.put(driver)
+        except Exception as e:
+            print(f"[WARN] Driver descartado al limpiar estado: {str(e)[:100]}")
+            self._discard(driver)
+
+    def _discard(self, driver):
+        with self.lock:
+            self.created -= 1
+        try:
+            detach_interceptor(driver)
+            detach_console_collector(driver)
+            driver.quit()
+        except Exception:
+            pass
+
+    def close_all(self):
+        """Cerrar todos los Chrome inactivos del pool"""
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_default_pool = None
+
+
+def get_pool():
+    """Pool compartido del proceso (se cierra automáticamente al salir)"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = DriverPool(size=Config.DRIVER_POOL_SIZE)
+        atexit.register(_default_pool.close_all)
+    return _default_pool
@@ -0,0 +1,206 @@
+"""
+Resolución offline de Chrome y chromedriver
+Detecta el navegador local (Config/variables de entorno, Chrome o Chromium en
+las rutas habituales de Linux, macOS y Windows) y busca un chromedriver de la
+misma versión mayor entre los ya instalados: junto al navegador, en el PATH,
+en los paquetes de Chromium y en las cachés de webdriver-manager y Selenium
+Manager. Nunca toca la red salvo que CHROMEDRIVER_ALLOW_DOWNLOAD lo permita.
+
+El resultado se guarda en .driver_cache.json por versión del navegador: en
+las siguientes ejecuciones basta con comprobar (stat) que el binario no
+cambió y que el chromedriver sigue ahí.
+
+Uso:
+    python driver_resolver.py     # qué Chrome y qué chromedriver se usarán
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import shutil
+import subprocess
+from config import Config
+
+VERSION_RE = re.compile(r"(\d+)\.\d+\.\d+\.\d+")
+
+CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+CHROME_PATHS = [
+    "/opt/google/chrome/chrome",
+    "/usr/bin/google-chrome",
+    "/usr/bin/chromium",
+    "/usr/bin/chromium-browser",
+    "/snap/bin/chromium",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    os.path.expandvars(r"%PROGRAMFILES%\Google\Chrome\Application\chrome.exe"),
+    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe")
+]
+CHROMEDRIVER_PATHS = [
+    "/usr/lib/chromium/chromedriver",
+    "/usr/lib/chromium-browser/chromedriver",
+    "/usr/bin/chromedriver",
+    "/snap/bin/chromium.chromedriver"
+]
+# Cachés locales de webdriver-manager (~/.wdm) y Selenium Manager (~/.cache/selenium)
+CHROMEDRIVER_CACHE_GLOBS = [
+    os.path.join("~", ".wdm", "drivers", "chromedriver", "*", "*", "*", "chromedriver*"),
+    os.path.join("~", ".wdm", "drivers", "chromedriver", "*", "*", "chromedriver*"),
+    os.path.join("~", ".cache", "selenium", "chromedriver", "*", "*", "chromedriver*")
+]
+
+_resolved = {}
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _run_version(path):
+    """Versión que informa el propio ejecutable (--version) o None"""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_RE.search(output)
+    return match.group(0) if match else None
+
+
+def find_chrome_binary():
+    """Primer Chrome/Chromium disponible: Config, PATH y rutas de instalación habituales"""
+    if Config.CHROME_BINARY_PATH:
+        return Config.CHROME_BINARY_PATH if os.path.isfile(Config.CHROME_BINARY_PATH) else None
+    candidates = [shutil.which(command) for command in CHROME_COMMANDS] + CHROME_PATHS
+    for candidate in candidates:
+        if _is_executable(candidate):
+            return os.path.realpath(candidate)
+    return None
+
+
+def browser_version(binary):
+    """Versión del navegador sin lanzarlo cuando se puede (carpeta de versión en Windows)"""
+    try:
+        for name in os.listdir(os.path.dirname(binary)):
+            if VERSION_RE.fullmatch(name):
+                return name
+    except OSError:
+        pass
+    return _run_version(binary)
+
+
+def _driver_candidates(binary):
+    if Config.CHROMEDRIVER_PATH:
+        yield Config.CHROMEDRIVER_PATH
+    if binary:
+        # Chrome for Testing: chrome-linux64/ y chromedriver-linux64/ son carpetas hermanas
+        chrome_dir = os.path.dirname(binary)
+        yield os.path.join(chrome_dir, "chromedriver")
+        yield os.path.join(chrome_dir, "chromedriver.exe")
+        yield from sorted(glob.glob(os.path.join(os.path.dirname(chrome_dir), "chromedriver-*", "chromedriver*")))
+    yield shutil.which("chromedriver")
+    yield from CHROMEDRIVER_PATHS
+    here = os.path.dirname(os.path.abspath(__file__))
+    yield os.path.join(here, "chromedriver")
+    yield os.path.join(here, "chromedriver.exe")
+    for pattern in CHROMEDRIVER_CACHE_GLOBS:
+        yield from sorted(glob.glob(os.path.expanduser(pattern)), reverse=True)
+
+
+def find_chromedriver(binary, version):
+    """chromedriver local con la misma versión mayor que el navegador"""
+    major = version.split(".")[0] if version else None
+    fallback = None
+    seen = set()
+    for candidate in _driver_candidates(binary):
+        if not _is_executable(candidate) or candidate.endswith(".zip") or candidate in seen:
+            continue
+        seen.add(candidate)
+        driver_version = _run_version(candidate)
+        if major is None or (driver_version and driver_version.split(".")[0] == major):
+            return candidate
+        fallback = fallback or candidate
+    if fallback:
+        print(f"[WARN] No hay chromedriver {major} local; se usa {fallback}")
+    return fallback
+
+
+def _load_cache():
+    try:
+        with open(Config.DRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    tmp_path = f"{Config.DRIVER_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, Config.DRIVER_CACHE_FILE)
+    except OSError as e:
+        print(f"[WARN] No se pudo guardar la caché de chromedriver: {e}")
+
+
+def _download(version):
+    """Último recurso con red: webdriver-manager para la versión detectada"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager(driver_version=version).install() if version else ChromeDriverManager().install()
+
+
+def resolve():
+    """(chrome, versión, chromedriver), resuelto una vez por proceso y cacheado en disco"""
+    if _resolved:
+        return _resolved["chrome"], _resolved["version"], _resolved["chromedriver"]
+
+    binary = find_chrome_binary()
+    key = binary or ""
+    cache = _load_cache()
+    entry = cache.get(key)
+    try:
+        mtime = os.stat(binary).st_mtime if binary else None
+    except OSError:
+        mtime = None
+
+    if entry and entry.get("mtime") == mtime and _is_executable(entry.get("chromedriver")):
+        version, driver = entry.get("version"), entry["chromedriver"]
+    else:
+        version = browser_version(binary) if binary else None
+        driver = find_chromedriver(binary, version)
+        if driver is None:
+            if not Config.CHROMEDRIVER_ALLOW_DOWNLOAD:
+                raise FileNotFoundError(
+                    f"No se encontró chromedriver local para Chrome {version or '(no detectado)'}; "
+                    "instálalo junto al navegador o define CHROMEDRIVER_PATH")
+            driver = _download(version)
+        cache[key] = {"mtime": mtime, "version": version, "chromedriver": driver}
+        _save_cache(cache)
+
+    _resolved.update(chrome=binary, version=version, chromedriver=driver)
+    return binary, version, driver
+
+
+def chrome_binary():
+    """Ruta del navegador detectado (None = el que elija chromedriver)"""
+    return resolve()[0]
+
+
+def chromedriver_path():
+    return resolve()[2]
+
+
+def main():
+    try:
+        binary, version, driver = resolve()
+    except FileNotFoundError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    print(f"Chrome:       {binary or 'no detectado'} ({version or 'versión desconocida'})")
+    print(f"chromedriver: {driver}")
+    print(f"Caché:        {Config.DRIVER_CACHE_FILE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Contabilidad de tiempo ocioso: sleeps, fallos de espera implícita y timeouts
+Un find_element que no encuentra nada espera IMPLICIT_WAIT completo (10 s)
+antes de fallar, y ese costo no aparece en ningún reporte. Este módulo mide,
+por test y por línea de código que originó la espera:
+
+    sleep             time.sleep fuera de una espera explícita (pausas fijas)
+    implicit_miss     find_element(s) sin resultado: la espera implícita agotada
+    explicit_timeout  WebDriverWait / SelectorResolver que terminan en timeout
+                      (menos lo ya contado dentro, sin duplicar)
+
+El sondeo de una espera explícita que termina bien no cuenta: la condición
+todavía no se cumplía. Cada resultado de ResultsSink lleva su 'idle_ms' y cada
+proceso escribe results/idle/<run_id>_<pid>.jsonl; el CLI los combina en un
+ranking de segundos desperdiciados.
+
+Solo se mide el hilo principal, el que ejecuta los tests: los hilos de fondo
+(network_cache, console_collector, screenshot_writer, responsive) esperan
+eventos a propósito y ese tiempo no lo paga ningún paso. Importar el módulo no
+instrumenta nada; lo activan con install() los puntos de entrada del arnés
+(BaseTest, run_parallel.py, pytest_plugin.py y el setup_driver de las suites
+independientes), así las herramientas que solo importan results_sink
+(sharding.py, los CLI) no cambian time.sleep ni WebDriver.
+
+Uso:
+    python idle_time.py                    # última ejecución
+    python idle_time.py --run 20250906_170049_1234 --top 30
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import atexit
+import sysconfig
+import argparse
+import threading
+import selenium
+from contextlib import contextmanager
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from config import Config
+import results_sink
+
+# Archivos de infraestructura: el sitio reportado es quien los llamó
+_INFRA_FILES = {'idle_time.py', 'tracing.py', 'waits.py', 'selector_resolver.py',
+                'dom_snapshot.py', 'base_test.py'}
+_SKIP_DIRS = (os.path.dirname(selenium.__file__), sysconfig.get_paths()['stdlib'])
+
+_original_sleep = time.sleep
+_local = threading.local()
+_lock = threading.Lock()
+_pending = {}  # (kind, sitio) -> [segundos, veces]; aún sin test asignado
+_totals = {}   # (suite, test, kind, sitio) -> [segundos, veces]
+_installed = False
+
+
+def _call_site():
+    """Primera línea fuera de selenium, la stdlib y los módulos de infraestructura"""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_SKIP_DIRS):
+            site = f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+            if os.path.basename(filename) not in _INFRA_FILES:
+                return site
+            fallback = fallback or site
+        frame = frame.f_back
+    return fallback or "?"
+
+
+def _wait_stack():
+    if not hasattr(_local, 'waits'):
+        _local.waits = []
+    return _local.waits
+
+
+def _record(kind, seconds, site):
+    # Solo el hilo principal (los tests); los hilos de fondo esperan eventos a propósito
+    if seconds <= 0 or threading.current_thread() is not threading.main_thread():
+        return
+    stack = _wait_stack()
+    if stack:
+        stack[-1]['inner'] += seconds
+    with _lock:
+        entry = _pending.setdefault((kind, site), [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextmanager
+def waiting(site=None):
+    """Espera explícita: sin sleeps contados dentro; si termina en timeout cuenta lo no contado"""
+    site = site or _call_site()
+    frame = {'inner': 0.0, 'timed_out': False}
+    stack = _wait_stack()
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield frame
+    except TimeoutException:
+        frame['timed_out'] = True
+        raise
+    finally:
+        stack.pop()
+        if frame['timed_out']:
+            _record('explicit_timeout', time.perf_counter() - start - frame['inner'], site)
+        elif stack:
+            stack[-1]['inner'] += frame['inner']
+
+
+def _sleep(seconds):
+    if _wait_stack():
+        return _original_sleep(seconds)
+    start = time.perf_counter()
+    try:
+        return _original_sleep(seconds)
+    finally:
+        _record('sleep', time.perf_counter() - start, _call_site())
+
+
+def _measure_find(method, plural):
+    def find(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except NoSuchElementException:
+            _record('implicit_miss', time.perf_counter() - start, _call_site())
+            raise
+        if plural and not result:
+            _record('implicit_miss', time.perf_counter() - start, _call_site())
+        return result
+    return find
+
+
+def _measure_until(method):
+    def until(self, *args, **kwargs):
+        with waiting(_call_site()):
+            return method(self, *args, **kwargs)
+    return until
+
+
+def install():
+    """Instrumentar time.sleep, find_element(s) y WebDriverWait (idempotente; nada sin IDLE_ACCOUNTING)"""
+    global _installed
+    if _installed or not Config.IDLE_ACCOUNTING:
+        return
+    _installed = True
+    time.sleep = _sleep
+    for cls in (WebDriver, WebElement):
+        cls.find_element = _measure_find(cls.find_element, False)
+        cls.find_elements = _measure_find(cls.find_elements, True)
+    WebDriverWait.until = _measure_until(WebDriverWait.until)
+    WebDriverWait.until_not = _measure_until(WebDriverWait.until_not)
+    atexit.register(export)
+
+
+def close_test(suite, test):
+    """Asignar al test que acaba de terminar el tiempo ocioso pendiente; {kind: ms}"""
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        idle = {}
+        for (kind, site), (seconds, count) in pending.items():
+            entry = _totals.setdefault((suite, test, kind, site), [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+            idle[kind] = idle.get(kind, 0) + round(seconds * 1000)
+    return idle
+
+
+def export():
+    """Escribir los totales del proceso en results/idle/<run_id>_<pid>.jsonl"""
+    close_test(None, "(fuera de un test)")
+    with _lock:
+        totals = dict(_totals)
+        _totals.clear()
+    if not totals:
+        return None
+    os.makedirs(Config.IDLE_DIR, exist_ok=True)
+    path = os.path.join(Config.IDLE_DIR, f"{results_sink.current_run_id()}_{os.getpid()}.jsonl")
+    with open(path, 'a', encoding='utf-8') as f:
+        for (suite, test, kind, site), (seconds, count) in totals.items():
+            f.write(json.dumps({'suite': suite, 'test': test, 'kind': kind, 'site': site,
+                                'seconds': round(seconds, 3), 'count': count}, ensure_ascii=False) + "\n")
+    return path
+
+
+# --- Reporte ----------------------------------------------------------------------
+
+def load_run(run_id=None, idle_dir=None):
+    """Entradas de todos los procesos de un run (por defecto, el más reciente)"""
+    idle_dir = idle_dir or Config.IDLE_DIR
+    files = glob.glob(os.path.join(idle_dir, "*.jsonl"))
+    if not files:
+        return None, []
+    if run_id is None:
+        latest = max(files, key=os.path.getmtime)
+        run_id = os.path.basename(latest).rsplit("_", 1)[0]
+    entries = []
+    for path in files:
+        if os.path.basename(path).rsplit("_", 1)[0] == run_id:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+    return run_id, entries
+
+
+def _ranking(entries, key):
+    totals = {}
+    for entry in entries:
+        total = totals.setdefault(key(entry), [0.0, 0])
+        total[0] += entry['seconds']
+        total[1] += entry['count']
+    return sorted(totals.items(), key=lambda item: item[1][0], reverse=True)
+
+
+def print_report(run_id, entries, top):
+    wasted = sum(entry['seconds'] for entry in entries)
+    print("=" * 70)
+    print(f"SEGUNDOS DESPERDICIADOS - run {run_id}: {round(wasted, 1)} s")
+    print("=" * 70)
+    for (kind,), (seconds, count) in _ranking(entries, lambda e: (e['kind'],)):
+        print(f"  {kind:<17} {round(seconds, 1):>8} s  ({count} veces)")
+
+    print("\nPor línea (corregir primero las de arriba):")
+    for (kind, site), (seconds, count) in _ranking(entries, lambda e: (e['kind'], e['site']))[:top]:
+        print(f"  {round(seconds, 1):>8} s  {count:>5}x  [{kind}] {site}")
+
+    print("\nPor test:")
+    for (suite, test), (seconds, count) in _ranking(entries, lambda e: (e['suite'], e['test']))[:top]:
+        print(f"  {round(seconds, 1):>8} s  {count:>5}x  {suite or '-'} / {test}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking de tiempo ocioso (sleeps, esperas implícitas, timeouts)")
+    parser.add_argument('--run', help="run_id (por defecto: el más reciente)")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--idle-dir', default=None)
+    args = parser.parse_args()
+
+    run_id, entries = load_run(args.run, args.idle_dir)
+    if not entries:
+        print("[INFO] No hay datos de tiempo ocioso para ese run")
+        return 0
+    print_report(run_id, entries, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
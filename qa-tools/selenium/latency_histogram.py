@@ -0,0 +1,174 @@
+"""
+Histograma de latencias con memoria acotada (estilo HDR)
+Guarda conteos en buckets logarítmicos con subdivisión lineal en lugar de
+conservar cada muestra: con 7 bits de precisión el error relativo es menor
+a 0.8% y todo el rango de 1 µs a 1 hora cabe en ~1.700 buckets, sin importar
+cuántos requests se registren. min, max, promedio y cantidad son exactos.
+
+Los histogramas de varios workers se combinan con merge() y se serializan en
+una forma compacta (pares índice/conteo en varint, zlib y base64).
+"""
+
+import zlib
+import base64
+
+DEFAULT_PRECISION_BITS = 7
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+class LatencyHistogram:
+    """Histograma de latencias en milisegundos (resolución interna: microsegundos)"""
+
+    def __init__(self, precision_bits=DEFAULT_PRECISION_BITS):
+        self.precision_bits = precision_bits
+        self._linear_limit = 1 << precision_bits
+        self._half = 1 << (precision_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = None
+
+    def _index(self, value):
+        if value < self._linear_limit:
+            return value
+        exponent = value.bit_length() - self.precision_bits
+        mantissa = value >> exponent
+        return self._linear_limit + (exponent - 1) * self._half + (mantissa - self._half)
+
+    def _bounds(self, index):
+        """Rango [low, high] de microsegundos que cubre un bucket"""
+        if index < self._linear_limit:
+            return index, index
+        exponent, offset = divmod(index - self._linear_limit, self._half)
+        exponent += 1
+        mantissa = offset + self._half
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, value_ms, count=1):
+        """Registrar una latencia (ms); los valores negativos se cuentan como 0"""
+        value = max(0, int(round(value_ms * 1000)))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total_us += value * count
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if self.max_us is None or value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other):
+        """Sumar otro histograma (de otro worker o proceso) a este"""
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("No se pueden combinar histogramas con distinta precisión")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        for value in (other.min_us, other.max_us):
+            if value is not None:
+                self.min_us = value if self.min_us is None else min(self.min_us, value)
+                self.max_us = value if self.max_us is None else max(self.max_us, value)
+        return self
+
+    def percentile(self, p):
+        """Valor (ms) por debajo del cual está el p% de las muestras"""
+        return self.percentiles((p,))[p]
+
+    def percentiles(self, ps=DEFAULT_PERCENTILES):
+        """Varios percentiles en un solo recorrido de los buckets"""
+        if not self.count:
+            return {p: 0 for p in ps}
+        # ceil(count * p / 100): mismo criterio de rango que el runner JS
+        targets = sorted((max(1, -(-self.count * p // 100)), p) for p in ps)
+        results = {}
+        seen = 0
+        pending = iter(targets)
+        target, p = next(pending)
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while seen >= target:
+                low, high = self._bounds(index)
+                results[p] = round(min(max((low + high) // 2, self.min_us), self.max_us) / 1000, 3)
+                try:
+                    target, p = next(pending)
+                except StopIteration:
+                    return results
+        return results
+
+    @property
+    def mean(self):
+        return round(self.total_us / self.count / 1000, 3) if self.count else 0
+
+    def summary(self, ps=DEFAULT_PERCENTILES):
+        """Resumen con las mismas claves que response_times de simple-load-test.js"""
+        summary = {
+            'count': self.count,
+            'min': round(self.min_us / 1000, 3) if self.count else 0,
+            'max': round(self.max_us / 1000, 3) if self.count else 0,
+            'avg': self.mean
+        }
+        for p, value in self.percentiles(ps).items():
+            summary[f"p{p:g}".replace('.', '_')] = value
+        return summary
+
+    def encode(self):
+        """Forma compacta: varints (delta de índice, conteo) comprimidos en base64"""
+        out = bytearray()
+        for value in (self.precision_bits, self.count, self.total_us,
+                      self.min_us or 0, self.max_us or 0, len(self.counts)):
+            _write_varint(out, value)
+        previous = 0
+        for index in sorted(self.counts):
+            _write_varint(out, index - previous)
+            _write_varint(out, self.counts[index])
+            previous = index
+        return base64.b64encode(zlib.compress(bytes(out))).decode('ascii')
+
+    @classmethod
+    def decode(cls, encoded):
+        values = _read_varints(zlib.decompress(base64.b64decode(encoded)))
+        precision_bits, count, total_us, min_us, max_us, buckets = (next(values) for _ in range(6))
+        histogram = cls(precision_bits)
+        histogram.count = count
+        histogram.total_us = total_us
+        histogram.min_us = min_us if count else None
+        histogram.max_us = max_us if count else None
+        index = 0
+        for _ in range(buckets):
+            index += next(values)
+            histogram.counts[index] = next(values)
+        return histogram
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"<LatencyHistogram count={self.count} buckets={len(self.counts)}>"
+
+
+def merge_encoded(encoded_histograms):
+    """Combinar varios histogramas serializados (p. ej. uno por worker)"""
+    merged = None
+    for encoded in encoded_histograms:
+        histogram = LatencyHistogram.decode(encoded)
+        merged = histogram if merged is None else merged.merge(histogram)
+    return merged or LatencyHistogram()
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+Generador de carga HTTP con asyncio
+Alternativa en Python a simple-load-test.js y a los planes .jmx de JMeter.
+Lee los usuarios y productos de qa-tools/jmeter/test-data y ejecuta escenarios
+ponderados contra las rutas reales de backend/server.js (login, listado,
+búsqueda, categorías y carrito: agregar, actualizar y eliminar).
+
+Dos modelos de carga:
+- Cerrado (--vus): N usuarios virtuales repiten escenarios sin pausa (o con --think-time).
+- Abierto (--rate): llegan R iteraciones por segundo sin importar cuánto tarde
+  el servidor; --max-in-flight limita las iteraciones simultáneas y las que no
+  caben se cuentan como descartadas.
+
+Cada usuario virtual mantiene su propia conexión keep-alive (HTTP/1.1 sobre
+asyncio streams, sin dependencias extra), así un solo proceso sostiene miles
+de requests por segundo. Si hay escenarios con sesión (cart, login), cada VU
+usa un usuario propio de users.csv: dos VUs con el mismo carrito se pisarían
+los ítems (404 y 400 que no son del servidor). Por eso --vus toma por defecto
+min(50, usuarios de users.csv) y un --vus mayor que los usuarios es un error; en
+el modelo abierto solo min(--max-in-flight, usuarios) iteraciones con sesión
+corren a la vez (las demás llegadas de cart/login se descartan) y los
+escenarios de solo lectura usan todo --max-in-flight.
+
+El users.csv de jmeter/test-data tiene unos 30 usuarios y en la BD sembrada
+solo existe demo@example.com: contra el backend real, los demás logins fallan
+(NO_TOKEN). Para escenarios con sesión se generan usuarios en la BD y en el
+CSV a la vez con data_generator.py, con el backend apuntando a esa BD.
+
+Uso:
+    python load_test.py --duration 30            # users.csv de ejemplo: completo contra stub_backend.py
+    python load_test.py --vus 200 --weights login=0,cart=0       # solo lectura: sin límite de usuarios
+    python data_generator.py --users 1000 --db /tmp/qa.db --output-dir /tmp/qa-data
+    python load_test.py --vus 200 --duration 60 --data-dir /tmp/qa-data
+    python load_test.py --rate 2000 --max-in-flight 500 --duration 120 --data-dir /tmp/qa-data
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime
+from urllib.parse import urlparse, urlencode
+from config import Config
+from latency_histogram import LatencyHistogram
+
+RESULTS_FILE = 'load_test_results.json'
+
+# Peso relativo de cada escenario (se puede sobrescribir con --weights)
+DEFAULT_WEIGHTS = {
+    'browse': 30,
+    'search': 30,
+    'categories': 10,
+    'product_detail': 10,
+    'login': 5,
+    'cart': 15
+}
+
+# Criterios de aceptación (los mismos que simple-load-test.js)
+ACCEPTANCE_CRITERIA = {
+    'avg_ms': 2000,
+    'p95_ms': 5000,
+    'error_rate': 1,
+    'throughput_rps': 10
+}
+
+
+# Escenarios que usan el usuario (y el carrito) del VU
+USER_SCENARIOS = {'cart', 'login'}
+
+DEFAULT_VUS = 50
+
+
+class HTTPError(Exception):
+    pass
+
+
+def load_test_data(data_dir=None):
+    """Leer users.csv y products.csv de los datos de prueba de JMeter"""
+    data_dir = data_dir or Config.LOAD_TEST_DATA_DIR
+    with open(os.path.join(data_dir, 'users.csv'), newline='', encoding='utf-8') as f:
+        users = list(csv.DictReader(f))
+    with open(os.path.join(data_dir, 'products.csv'), newline='', encoding='utf-8') as f:
+        products = list(csv.DictReader(f))
+    return users, products
+
+
+def parse_weights(value):
+    """'search=50,cart=20' -> {'search': 50, 'cart': 20, ...resto por defecto}"""
+    weights = dict(DEFAULT_WEIGHTS)
+    if not value:
+        return weights
+    for pair in value.split(','):
+        name, _, weight = pair.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Escenario desconocido: {name}")
+        weights[name] = float(weight)
+    return weights
+
+
+class Connection:
+    """Conexión HTTP/1.1 keep-alive mínima sobre asyncio streams"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        """Enviar un request y devolver (status, body_bytes); reintenta una vez si la conexión caducó"""
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 "Connection: keep-alive", "Accept: application/json",
+                 f"Content-Length: {len(payload)}"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + payload
+
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(self._roundtrip(raw), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.close()
+            if not reused:
+                raise HTTPError(str(e) or e.__class__.__name__)
+            # El servidor cerró la conexión inactiva (keepAliveTimeout): abrir otra
+            return await asyncio.wait_for(self._roundtrip(raw), self.timeout)
+        except asyncio.TimeoutError:
+            self.close()
+            raise
+
+    async def _roundtrip(self, raw):
+        if self.writer is None:
+            await self._connect()
+        self.writer.write(raw)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode('latin-1').split("\r\n")
+        status = int(status_line.split(" ", 2)[1])
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            data = b''.join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, data
+
+
+class LoadStats:
+    """Acumulador de resultados por ruta con memoria constante (histogramas)"""
+
+    def __init__(self):
+        self.routes = {}
+        self.errors = {}
+        self.iterations = 0
+        self.dropped = 0
+        self.start_time = None
+        self.end_time = None
+
+    def record(self, label, status, elapsed_ms, error=None):
+        route = self.routes.get(label)
+        if route is None:
+            route = self.routes[label] = {'histogram': LatencyHistogram(), 'failed': 0}
+        route['histogram'].record(elapsed_ms)
+        if error or not 200 <= status < 400:
+            route['failed'] += 1
+            key = status or error or 'CONNECTION_ERROR'
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def get_statistics(self):
+        duration = (self.end_time or time.perf_counter()) - (self.start_time or time.perf_counter())
+        overall = LatencyHistogram()
+        for route in self.routes.values():
+            overall.merge(route['histogram'])
+        total = overall.count
+        failed = sum(route['failed'] for route in self.routes.values())
+
+        return {
+            'duration_seconds': round(duration, 2),
+            'total_requests': total,
+            'successful_requests': total - failed,
+            'failed_requests': failed,
+            'success_rate': round((total - failed) / total * 100, 2) if total else 0,
+            'throughput_rps': round(total / duration, 2) if duration > 0 else 0,
+            'iterations': self.iterations,
+            'dropped_iterations': self.dropped,
+            'response_times': overall.summary(),
+            'routes': {label: dict(route['histogram'].summary(), failed=route['failed'])
+                       for label, route in sorted(self.routes.items())},
+            'errors_by_status': {str(key): count for key, count in self.errors.items()},
+            # Histogramas serializados: se combinan entre ejecuciones con merge_encoded()
+            'histograms': {label: route['histogram'].encode()
+                           for label, route in sorted(self.routes.items())}
+        }
+
+
+class VirtualUser:
+    """Usuario virtual: una conexión y un usuario de users.csv (con su carrito) propios"""
+
+    def __init__(self, vu_id, runner):
+        self.vu_id = vu_id
+        self.runner = runner
+        # En el modelo abierto los VUs que sobran sobre users.csv quedan sin usuario (solo lectura)
+        self.user = runner.users[vu_id] if runner.needs_users and vu_id < len(runner.users) else None
+        self.connection = Connection(runner.host, runner.port, runner.timeout)
+        self.rng = random.Random(vu_id)
+
+    async def call(self, label, method, path, body=None, auth=False):
+        """Ejecutar un request y registrarlo; devuelve el JSON decodificado o None"""
+        headers = None
+        if auth:
+            token = await self.runner.token_for(self)
+            if not token:
+                # Sin sesión la iteración no hizo nada: cuenta como error (el login se reintenta)
+                self.runner.stats.record(label, 0, 0, error='NO_TOKEN')
+                return None
+            headers = {'Authorization': f"Bearer {token}"}
+
+        start = time.perf_counter()
+        try:
+            status, data = await self.connection.request(method, path, body, headers)
+        except (HTTPError, OSError, asyncio.TimeoutError) as e:
+            self.runner.stats.record(label, 0, (time.perf_counter() - start) * 1000,
+                                     error=e.__class__.__name__)
+            return None
+        self.runner.stats.record(label, status, (time.perf_counter() - start) * 1000)
+
+        if not 200 <= status < 300:
+            return None
+        try:
+            return json.loads(data) if data else {}
+        except ValueError:
+            return None
+
+    def product(self):
+        return self.rng.choice(self.runner.products)
+
+
+# ----------------------------------------------------------------------------
+# Escenarios: cada uno es una iteración de un usuario virtual
+# ----------------------------------------------------------------------------
+
+async def scenario_browse(vu):
+    """Listado paginado de productos"""
+    query = urlencode({'page': vu.rng.randint(1, 3), 'limit': 20})
+    await vu.call("GET /api/products", "GET", f"/api/products?{query}")
+
+
+async def scenario_search(vu):
+    """Búsqueda con los términos de products.csv"""
+    query = urlencode({'q': vu.product()['searchTerm']})
+    await vu.call("GET /api/products/search", "GET", f"/api/products/search?{query}")
+
+
+async def scenario_categories(vu):
+    """Categorías y rango de precios (filtros del catálogo)"""
+    await vu.call("GET /api/products/categories", "GET", "/api/products/categories")
+    await vu.call("GET /api/products/price-range", "GET", "/api/products/price-range")
+
+
+async def scenario_product_detail(vu):
+    """Detalle de un producto"""
+    await vu.call("GET /api/products/:id", "GET", f"/api/products/{vu.product()['productId']}")
+
+
+async def scenario_login(vu):
+    """Login real (incluye el costo de bcrypt en el backend)"""
+    await vu.call("POST /api/auth/login", "POST", "/api/auth/login",
+                  {'email': vu.user['email'], 'password': vu.user['password']})
+
+
+async def scenario_cart(vu):
+    """Agregar un producto, cambiar su cantidad, consultar el carrito y eliminarlo"""
+    product = vu.product()
+    added = await vu.call("POST /api/cart/items", "POST", "/api/cart/items",
+                          {'productId': int(product['productId']),
+                           'quantity': int(product['quantity'] or 1)}, auth=True)
+    if not added:
+        return
+    item_id = added['data']['item']['id']
+    await vu.call("PUT /api/cart/items/:id", "PUT", f"/api/cart/items/{item_id}",
+                  {'quantity': vu.rng.randint(1, 5)}, auth=True)
+    await vu.call("GET /api/cart", "GET", "/api/cart", auth=True)
+    await vu.call("DELETE /api/cart/items/:id", "DELETE", f"/api/cart/items/{item_id}", auth=True)
+
+
+SCENARIOS = {
+    'browse': scenario_browse,
+    'search': scenario_search,
+    'categories': scenario_categories,
+    'product_detail': scenario_product_detail,
+    'login': scenario_login,
+    'cart': scenario_cart
+}
+
+
+class LoadTestRunner:
+    def __init__(self, base_url, users, products, weights, timeout=10, think_time=0, seed=None):
+        parsed = urlparse(base_url)
+        self.base_url = base_url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.users = users
+        self.products = products
+        self.timeout = timeout
+        self.think_time = think_time
+        self.stats = LoadStats()
+        self.rng = random.Random(seed)
+
+        active = [(name, weight) for name, weight in weights.items() if weight > 0]
+        self.scenario_names = [name for name, _ in active]
+        self.scenario_weights = [weight for _, weight in active]
+        self.needs_users = bool(USER_SCENARIOS.intersection(self.scenario_names))
+
+        # Un solo login por VU mientras funcione: los tokens viven 7 días
+        self.tokens = {}
+        self.token_locks = {}
+
+    def default_vus(self):
+        """VUs por defecto del modelo cerrado: no más que usuarios si algún escenario usa sesión"""
+        return min(DEFAULT_VUS, len(self.users)) if self.needs_users else DEFAULT_VUS
+
+    def session_slots(self, max_in_flight):
+        """Iteraciones con sesión simultáneas del modelo abierto (una por usuario de users.csv)"""
+        return min(max_in_flight, len(self.users)) if self.needs_users else 0
+
+    def check_users(self, vus):
+        """Un usuario distinto por VU si algún escenario usa sesión; ValueError si no alcanzan"""
+        if self.needs_users and len(self.users) < vus:
+            raise ValueError(f"{vus} VUs necesitan {vus} usuarios distintos y users.csv tiene "
+                             f"{len(self.users)} (generar más con data_generator.py --users {vus} "
+                             f"y pasar su directorio con --data-dir)")
+
+    def pick_name(self, rng):
+        return rng.choices(self.scenario_names, weights=self.scenario_weights)[0]
+
+    async def token_for(self, vu):
+        """Token JWT del usuario del VU; un login fallido no se guarda y se reintenta la próxima vez"""
+        email = vu.user['email']
+        if email in self.tokens:
+            return self.tokens[email]
+        lock = self.token_locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            if email not in self.tokens:
+                data = await vu.call("POST /api/auth/login", "POST", "/api/auth/login",
+                                     {'email': email, 'password': vu.user['password']})
+                if data:
+                    self.tokens[email] = data['data']['token']
+        return self.tokens.get(email)
+
+    async def _iteration(self, vu, name=None):
+        try:
+            await SCENARIOS[name or self.pick_name(vu.rng)](vu)
+        except (KeyError, TypeError) as e:
+            # Respuesta con formato inesperado: se cuenta como error del escenario
+            self.stats.record("scenario", 0, 0, error=f"{e.__class__.__name__}: {e}")
+        self.stats.iterations += 1
+
+    async def run_closed(self, vus, duration, ramp_up=0):
+        """Modelo cerrado: 'vus' usuarios iterando hasta que termine 'duration'"""
+        self.check_users(vus)
+        deadline = time.perf_counter() + duration
+
+        async def virtual_user(vu_id):
+            if ramp_up:
+                await asyncio.sleep(ramp_up * vu_id / vus)
+            vu = VirtualUser(vu_id, self)
+            try:
+                while time.perf_counter() < deadline:
+                    await self._iteration(vu)
+                    if self.think_time:
+                        await asyncio.sleep(vu.rng.uniform(0, 2 * self.think_time))
+            finally:
+                vu.connection.close()
+
+        self.stats.start_time = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(vus)))
+        self.stats.end_time = time.perf_counter()
+
+    async def run_open(self, rate, duration, max_in_flight):
+        """Modelo abierto: 'rate' iteraciones/segundo con llegadas de Poisson
+
+        Los primeros session_slots() VUs tienen usuario propio y son los únicos que
+        corren cart/login; los escenarios de solo lectura usan cualquier VU libre.
+        """
+        slots = self.session_slots(max_in_flight)
+        idle_session, idle_anonymous = asyncio.Queue(), asyncio.Queue()
+        for vu_id in range(max_in_flight):
+            (idle_session if vu_id < slots else idle_anonymous).put_nowait(VirtualUser(vu_id, self))
+        in_flight = set()
+
+        async def arrival(vu, name):
+            try:
+                await self._iteration(vu, name)
+            finally:
+                (idle_session if vu.user is not None else idle_anonymous).put_nowait(vu)
+
+        self.stats.start_time = time.perf_counter()
+        deadline = self.stats.start_time + duration
+        next_arrival = self.stats.start_time
+
+        while next_arrival < deadline:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Llegadas según el reloj, no según las respuestas: si el servidor se
+            # atrasa, las iteraciones se acumulan hasta max_in_flight
+            name = self.pick_name(self.rng)
+            pools = (idle_session,) if name in USER_SCENARIOS else (idle_anonymous, idle_session)
+            idle = next((pool for pool in pools if not pool.empty()), None)
+            if idle is None:
+                self.stats.dropped += 1
+            else:
+                task = asyncio.ensure_future(arrival(idle.get_nowait(), name))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_arrival += self.rng.expovariate(rate)
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        self.stats.end_time = time.perf_counter()
+        for idle in (idle_session, idle_anonymous):
+            while not idle.empty():
+                idle.get_nowait().connection.close()
+
+
+def _event_loop_policy():
+    """uvloop si está instalado (opcional): más throughput por proceso"""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+
+def print_results(stats):
+    print("\n" + "="*60)
+    print("RESULTADOS DE PRUEBA DE CARGA")
+    print("="*60)
+    print(f"Duración Total: {stats['duration_seconds']} segundos")
+    print(f"Iteraciones: {stats['iterations']} (descartadas: {stats['dropped_iterations']})")
+    print(f"Total de Requests: {stats['total_requests']}")
+    print(f"Requests Exitosos: {stats['successful_requests']}")
+    print(f"Requests Fallidos: {stats['failed_requests']}")
+    print(f"Tasa de Éxito: {stats['success_rate']}%")
+    print(f"Throughput: {stats['throughput_rps']} requests/segundo")
+    print("")
+    print("TIEMPOS DE RESPUESTA (ms):")
+    for label, route in stats['routes'].items():
+        print(f"  {label:<32} n={route['count']:<7} avg={route['avg']:<8} "
+              f"p95={route['p95']:<8} p99={route['p99']:<8} fallidos={route['failed']}")
+    total = stats['response_times']
+    print(f"  {'TOTAL':<32} avg={total['avg']} p50={total['p50']} p95={total['p95']} "
+          f"p99={total['p99']} p99.9={total['p99_9']} max={total['max']}")
+
+    if stats['errors_by_status']:
+        print("")
+        print("ERRORES POR CÓDIGO:")
+        for status, count in stats['errors_by_status'].items():
+            print(f"  {status}: {count} errores")
+    print("="*60)
+
+
+def validate(stats):
+    """Criterios de aceptación; devuelve True si se cumplen todos"""
+    criteria = {
+        f"Tiempo promedio < {ACCEPTANCE_CRITERIA['avg_ms']}ms":
+            stats['response_times']['avg'] < ACCEPTANCE_CRITERIA['avg_ms'],
+        f"Percentil 95 < {ACCEPTANCE_CRITERIA['p95_ms']}ms":
+            stats['response_times']['p95'] < ACCEPTANCE_CRITERIA['p95_ms'],
+        f"Tasa de error < {ACCEPTANCE_CRITERIA['error_rate']}%":
+            (100 - stats['success_rate']) < ACCEPTANCE_CRITERIA['error_rate'],
+        f"Throughput > {ACCEPTANCE_CRITERIA['throughput_rps']} RPS":
+            stats['throughput_rps'] > ACCEPTANCE_CRITERIA['throughput_rps']
+    }
+    print("\nVALIDACIÓN DE CRITERIOS:")
+    for criterion, passed in criteria.items():
+        print(f"  {'✅ CUMPLE' if passed else '❌ NO CUMPLE'}: {criterion}")
+    return all(criteria.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga asyncio contra la API")
+    parser.add_argument('--base-url', default=Config.API_BASE_URL, help="URL del backend")
+    parser.add_argument('--vus', type=int,
+                        help=f"Usuarios virtuales (modelo cerrado; por defecto {DEFAULT_VUS}, "
+                             f"o los usuarios de users.csv si son menos y hay escenarios con sesión)")
+    parser.add_argument('--rate', type=float,
+                        help="Iteraciones por segundo (modelo abierto; ignora --vus)")
+    parser.add_argument('--max-in-flight', type=int, default=1000,
+                        help="Iteraciones simultáneas máximas en modelo abierto")
+    parser.add_argument('--duration', type=float, default=30, help="Duración en segundos")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Segundos para arrancar todos los VUs")
+    parser.add_argument('--think-time', type=float, default=0,
+                        help="Pausa media entre iteraciones de un VU (modelo cerrado)")
+    parser.add_argument('--weights', type=parse_weights, default=dict(DEFAULT_WEIGHTS),
+                        help="Pesos por escenario, p. ej. search=50,cart=20")
+    parser.add_argument('--timeout', type=float, default=10, help="Timeout por request (s)")
+    parser.add_argument('--data-dir', default=Config.LOAD_TEST_DATA_DIR,
+                        help="Directorio con users.csv y products.csv")
+    parser.add_argument('--seed', type=int, help="Semilla para reproducir la secuencia de llegadas")
+    parser.add_argument('--output', default=RESULTS_FILE, help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    users, products = load_test_data(args.data_dir)
+    loop_name = _event_loop_policy()
+    runner = LoadTestRunner(args.base_url, users, products, args.weights,
+                            timeout=args.timeout, think_time=args.think_time, seed=args.seed)
+    if args.vus is None:
+        args.vus = runner.default_vus()
+
+    print("="*60)
+    print("PRUEBA DE CARGA (asyncio)")
+    print(f"Endpoint: {args.base_url}")
+    if args.rate:
+        print(f"Modelo abierto: {args.rate} iteraciones/s, máx. {args.max_in_flight} simultáneas")
+        slots = runner.session_slots(args.max_in_flight)
+        if runner.needs_users and slots < args.max_in_flight:
+            print(f"Con sesión (cart/login): máx. {slots} simultáneas, una por usuario de users.csv")
+    else:
+        print(f"Modelo cerrado: {args.vus} usuarios virtuales")
+    print(f"Duración: {args.duration} segundos | Event loop: {loop_name}")
+    print(f"Escenarios: {', '.join(f'{n}={w:g}' for n, w in args.weights.items() if w > 0)}")
+    print(f"Datos: {len(users)} usuarios, {len(products)} productos")
+    print("="*60)
+
+    if not args.rate:
+        try:
+            runner.check_users(args.vus)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return 1
+
+    if args.rate:
+        coroutine = runner.run_open(args.rate, args.duration, args.max_in_flight)
+    else:
+        coroutine = runner.run_closed(args.vus, args.duration, args.ramp_up)
+    try:
+        asyncio.run(coroutine)
+    except KeyboardInterrupt:
+        runner.stats.end_time = time.perf_counter()
+        print("\n[WARN] Prueba interrumpida; se reportan los resultados parciales")
+
+    stats = runner.stats.get_statistics()
+    print_results(stats)
+    passed = validate(stats)
+
+    report = {
+        'test_info': {
+            'date': datetime.now().isoformat(),
+            'base_url': args.base_url,
+            'model': 'open' if args.rate else 'closed',
+            'vus': None if args.rate else args.vus,
+            'rate': args.rate,
+            'max_in_flight': args.max_in_flight if args.rate else None,
+            'duration_seconds': args.duration,
+            'weights': args.weights
+        },
+        'statistics': stats
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en: {args.output}")
+
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
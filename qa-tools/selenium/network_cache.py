@@ -0,0 +1,310 @@
+"""
+Interceptación de red por sesión de navegador (CDP Fetch)
+Cada Chrome nuevo arranca con el perfil vacío y vuelve a descargar las
+imágenes de /images y los módulos de Vite en cada navegación. Aquí se pausan
+solo las peticiones que coinciden con ASSET_CACHE_PATTERNS y se responden
+desde una caché en disco compartida por todos los workers
+(.asset_cache/<sha256 de la URL>.json + .bin, escrita de forma atómica).
+
+Modos (Config.NETWORK_MODE):
+    perf   red real, sin interceptar nada (para medir con page_metrics.py)
+    cache  assets inmutables desde la caché; el resto va a la red
+    fast   caché + bloquear recursos no esenciales (NETWORK_BLOCK_RESOURCE_TYPES
+           y NETWORK_BLOCK_PATTERNS); XHR/fetch de la API nunca se tocan
+Sin modo configurado (None) se usa perf mientras COLLECT_PAGE_METRICS esté
+activo: TTFB, FCP, LCP y TBT medidos sobre respuestas servidas desde la
+caché no son los de la red real.
+
+Los eventos Fetch.requestPaused llegan por una conexión CDP propia (la de
+Selenium, sobre trio) atendida en un hilo de fondo. Si ese hilo o Chrome
+mueren, Chrome libera las peticiones pausadas al cerrarse la conexión.
+
+Uso:
+    python network_cache.py            # tamaño de la caché
+    python network_cache.py --clear
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import base64
+import fnmatch
+import hashlib
+import argparse
+import threading
+import urllib.request
+from config import Config
+
+try:
+    import trio
+    from selenium.webdriver.common.bidi import cdp
+except ImportError:  # Sin trio no hay eventos CDP: el navegador usa la red real
+    trio = None
+
+# Cabeceras que no tienen sentido al servir un cuerpo ya decodificado
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding",
+                   "connection", "keep-alive", "set-cookie"}
+
+
+class AssetCache:
+    """Caché en disco de respuestas completas, segura entre procesos"""
+
+    def __init__(self, base_dir=None, ttl_hours=None):
+        self.base_dir = base_dir or Config.ASSET_CACHE_DIR
+        self.ttl = (Config.ASSET_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.base_dir, f"{key}.json"), os.path.join(self.base_dir, f"{key}.bin")
+
+    def get(self, url):
+        """(status, cabeceras, cuerpo) o None si no está o expiró"""
+        meta_path, body_path = self._paths(url)
+        try:
+            if time.time() - os.path.getmtime(meta_path) > self.ttl:
+                return None
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if len(body) != meta.get("size"):
+            return None  # Otro proceso está reemplazando la entrada
+        return meta["status"], meta["headers"], body
+
+    def put(self, url, status, headers, body):
+        meta_path, body_path = self._paths(url)
+        headers = [h for h in headers if h["name"].lower() not in DROPPED_HEADERS]
+        # Primero el cuerpo y luego los metadatos: quien lea el .json encuentra el .bin completo
+        self._write(body_path, body)
+        self._write(meta_path, json.dumps({"url": url, "status": status, "headers": headers,
+                                           "size": len(body)}).encode("utf-8"))
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        entries = [name for name in os.listdir(self.base_dir) if name.endswith(".json")]
+        size = sum(os.path.getsize(os.path.join(self.base_dir, name))
+                   for name in os.listdir(self.base_dir) if name.endswith(".bin"))
+        return {"entries": len(entries), "bytes": size}
+
+    def clear(self):
+        for name in os.listdir(self.base_dir):
+            try:
+                os.remove(os.path.join(self.base_dir, name))
+            except OSError:
+                pass
+
+
+def _matches(url, patterns):
+    return any(fnmatch.fnmatchcase(url, pattern) for pattern in patterns)
+
+
+def _cdp_endpoint(driver):
+    """URL del websocket del navegador y versión mayor de Chrome"""
+    if driver.capabilities.get("se:cdp"):
+        return driver.capabilities["se:cdp"], driver.capabilities["se:cdpVersion"].split(".")[0]
+    address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=5) as response:
+        info = json.load(response)
+    return info["webSocketDebuggerUrl"], info["Browser"].split("/")[1].split(".")[0]
+
+
+class NetworkInterceptor:
+    def __init__(self, driver, mode=None, cache=None):
+        self.driver = driver
+        self.mode = mode or network_mode()
+        self.cache = cache or AssetCache()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "blocked": 0, "passed": 0}
+        self.ready = threading.Event()
+        self.error = None
+        self.thread = None
+        self._token = None
+        self._scope = None
+
+    def start(self, timeout=10):
+        """Arrancar el hilo de eventos; False si no se pudo habilitar Fetch"""
+        self.thread = threading.Thread(target=self._run, name="network-interceptor", daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout) or self.error:
+            print(f"[WARN] Interceptación de red desactivada: {self.error or 'timeout'}")
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        if self._token is not None and self._scope is not None:
+            try:
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+            except (trio.RunFinishedError, RuntimeError):
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            # Chrome cerrado o conexión perdida: las peticiones pausadas se liberan solas
+            if not self.ready.is_set():
+                self.error = str(e)[:100] or type(e).__name__
+                self.ready.set()
+
+    def _patterns(self, devtools):
+        fetch, network = devtools.fetch, devtools.network
+        patterns = [fetch.RequestPattern(url_pattern=pattern, request_stage=fetch.RequestStage.REQUEST)
+                    for pattern in Config.ASSET_CACHE_PATTERNS]
+        if self.mode == "fast":
+            patterns += [fetch.RequestPattern(url_pattern=pattern, request_stage=fetch.RequestStage.REQUEST)
+                         for pattern in Config.NETWORK_BLOCK_PATTERNS]
+            patterns += [fetch.RequestPattern(url_pattern="*", resource_type=network.ResourceType(name),
+                                              request_stage=fetch.RequestStage.REQUEST)
+                         for name in Config.NETWORK_BLOCK_RESOURCE_TYPES]
+        return patterns
+
+    async def _main(self):
+        self._token = trio.lowlevel.current_trio_token()
+        ws_url, version = _cdp_endpoint(self.driver)
+        devtools = cdp.import_devtools(version)
+        with trio.CancelScope() as scope:
+            self._scope = scope
+            async with cdp.open_cdp(ws_url) as conn:
+                targets = await conn.execute(devtools.target.get_targets())
+                page = next(t for t in targets if t.type_ == "page")
+                async with conn.open_session(page.target_id) as session:
+                    # Sin límite: un evento descartado dejaría la petición colgada
+                    events = session.listen(devtools.fetch.RequestPaused, buffer_size=math.inf)
+                    await session.execute(devtools.fetch.enable(patterns=self._patterns(devtools)))
+                    self.ready.set()
+                    async with trio.open_nursery() as nursery:
+                        async for event in events:
+                            nursery.start_soon(self._handle, session, devtools, event)
+
+    async def _handle(self, session, devtools, event):
+        fetch = devtools.fetch
+        try:
+            if event.response_status_code is not None or event.response_error_reason is not None:
+                await self._store(session, devtools, event)
+                return
+
+            url = event.request.url
+            if self.mode == "fast" and (event.resource_type.value in Config.NETWORK_BLOCK_RESOURCE_TYPES
+                                        or _matches(url, Config.NETWORK_BLOCK_PATTERNS)):
+                self.stats["blocked"] += 1
+                await session.execute(fetch.fail_request(event.request_id,
+                                                         devtools.network.ErrorReason.BLOCKED_BY_CLIENT))
+                return
+
+            if event.request.method == "GET" and _matches(url, Config.ASSET_CACHE_PATTERNS):
+                cached = await trio.to_thread.run_sync(self.cache.get, url)
+                if cached:
+                    status, headers, body = cached
+                    self.stats["hits"] += 1
+                    await session.execute(fetch.fulfill_request(
+                        event.request_id, status,
+                        response_headers=[fetch.HeaderEntry(h["name"], h["value"]) for h in headers],
+                        body=base64.b64encode(body).decode("ascii")))
+                    return
+                self.stats["misses"] += 1
+                await session.execute(fetch.continue_request(event.request_id, intercept_response=True))
+                return
+
+            self.stats["passed"] += 1
+            await session.execute(fetch.continue_request(event.request_id))
+        except Exception as e:
+            print(f"[WARN] Error interceptando {event.request.url[:80]}: {str(e)[:100]}")
+            try:
+                await session.execute(fetch.continue_request(event.request_id))
+            except Exception:
+                pass
+
+    async def _store(self, session, devtools, event):
+        """Etapa de respuesta de un fallo de caché: guardar y entregar la respuesta"""
+        fetch = devtools.fetch
+        headers = [{"name": h.name, "value": h.value} for h in event.response_headers or []]
+        cache_control = next((h["value"].lower() for h in headers if h["name"].lower() == "cache-control"), "")
+        if event.response_status_code != 200 or "no-store" in cache_control:
+            await session.execute(fetch.continue_request(event.request_id))
+            return
+
+        body, encoded = await session.execute(fetch.get_response_body(event.request_id))
+        data = base64.b64decode(body) if encoded else body.encode("utf-8")
+        await trio.to_thread.run_sync(self.cache.put, event.request.url, 200, headers, data)
+        self.stats["stored"] += 1
+        # El cuerpo ya está decodificado: se entrega sin Content-Encoding
+        await session.execute(fetch.fulfill_request(
+            event.request_id, 200,
+            response_headers=[fetch.HeaderEntry(h["name"], h["value"])
+                              for h in headers if h["name"].lower() not in DROPPED_HEADERS],
+            body=base64.b64encode(data).decode("ascii")))
+
+
+def network_mode():
+    """Modo efectivo: el configurado o, sin configurar, perf si se recolectan métricas de página"""
+    if Config.NETWORK_MODE:
+        return Config.NETWORK_MODE
+    return "perf" if Config.COLLECT_PAGE_METRICS else "cache"
+
+
+def driver_network_mode(driver):
+    """Modo con el que navega un driver: el de su interceptor o perf si no tiene"""
+    interceptor = getattr(driver, "_qa_interceptor", None)
+    return interceptor.mode if interceptor is not None else "perf"
+
+
+def attach_interceptor(driver, mode=None):
+    """Activar la interceptación en un driver recién creado (None en modo perf)"""
+    mode = mode or network_mode()
+    if mode == "perf":
+        return None
+    if trio is None:
+        print("[WARN] trio no está instalado: interceptación de red desactivada")
+        return None
+    interceptor = NetworkInterceptor(driver, mode)
+    try:
+        started = interceptor.start()
+    except Exception as e:
+        print(f"[WARN] Interceptación de red desactivada: {str(e)[:100]}")
+        return None
+    if not started:
+        return None
+    driver._qa_interceptor = interceptor
+    return interceptor
+
+
+def detach_interceptor(driver):
+    """Detener la interceptación antes de cerrar el driver; devuelve sus contadores"""
+    interceptor = getattr(driver, "_qa_interceptor", None)
+    if interceptor is None:
+        return None
+    interceptor.stop()
+    driver._qa_interceptor = None
+    return interceptor.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Caché de assets compartida por los navegadores de prueba")
+    parser.add_argument('--clear', action='store_true', help="Vaciar la caché")
+    args = parser.parse_args()
+
+    cache = AssetCache()
+    if args.clear:
+        cache.clear()
+        print(f"Caché vaciada: {cache.base_dir}")
+    else:
+        stats = cache.stats()
+        print(f"{cache.base_dir}: {stats['entries']} assets, {round(stats['bytes'] / 1024)} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Detección de confirmación de pedido en una sola pasada
+Toma un único snapshot JS de la página (URL, título, texto visible y nodos
+de éxito/confirmación/alerta) y compara todas las frases indicadoras con una
+sola expresión regular multi-patrón por texto. Devuelve un veredicto
+estructurado con la evidencia encontrada.
+"""
+
+import re
+import time
+
+# Indicadores de éxito en contenido y título
+SUCCESS_PHRASES = [
+    "pedido confirmado",
+    "pedido realizado",
+    "pedido completado",
+    "compra exitosa",
+    "compra realizada",
+    "order confirmed",
+    "order placed",
+    "order completed",
+    "purchase successful",
+    "gracias por tu compra",
+    "thank you for your purchase",
+    "confirmación de pedido",
+    "order confirmation",
+    "éxito",
+    "success"
+]
+
+# Indicadores de éxito en URL
+SUCCESS_URL_PHRASES = [
+    "success", "confirmation", "complete", "thank", "gracias",
+    "pedido", "order", "checkout/success", "purchase/complete"
+]
+
+# Palabras que, dentro de un nodo de confirmación visible, indican éxito
+CONFIRMATION_NODE_WORDS = ["éxito", "success", "confirmado", "confirmed", "realizado", "completed"]
+
+# Rutas que indican avance en el flujo (análisis heurístico)
+PROGRESS_URL_PHRASES = ["checkout", "order", "purchase"]
+
+ERROR_PHRASES = [
+    "error", "fallo", "failed", "problema", "incorrecto",
+    "invalid", "inválido", "no válido"
+]
+
+CONFIRMATION_SELECTORS = ", ".join([
+    ".success-message", ".order-success", ".purchase-success", ".confirmation-message",
+    "[class*='success']", "[class*='confirm']", "[class*='complete']",
+    ".alert-success", ".notification-success", "[role='alert']",
+    ".success", ".confirmation", "#success", "#confirmation"
+])
+
+POSITIVE_CLASS_SELECTOR = "[class*='success'], [class*='confirm'], [class*='complete']"
+
+SUCCESS_ICON_XPATH = ("count(//*[local-name()='svg'][contains(@class, 'check') or contains(@class, 'success')]"
+                      " | //*[contains(@class, 'fa-check')] | //*[contains(@class, 'icon-success')])")
+
+PAGE_STATE_SCRIPT = """
+var confirmationSelector = arguments[0], positiveSelector = arguments[1], iconXPath = arguments[2];
+function isVisible(el) {
+    var rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) { return false; }
+    if (el.checkVisibility) { return el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true}); }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+var nodes = [];
+document.querySelectorAll(confirmationSelector).forEach(function (el) {
+    if (nodes.length < 50 && isVisible(el)) {
+        nodes.push({
+            tag: el.tagName.toLowerCase(),
+            className: (typeof el.className === 'string' ? el.className : '').substring(0, 100),
+            role: el.getAttribute('role'),
+            text: (el.innerText || '').trim().substring(0, 200)
+        });
+    }
+});
+return {
+    url: window.location.href,
+    title: document.title,
+    text: document.body ? document.body.innerText : '',
+    nodes: nodes,
+    positive_count: document.querySelectorAll(positiveSelector).length,
+    icon_count: document.evaluate(iconXPath, document, null, XPathResult.NUMBER_TYPE, null).numberValue
+};
+"""
+
+
+def _phrase_pattern(phrases):
+    """
+    Una sola regex con todas las frases (las más largas primero). El lookahead
+    permite coincidencias solapadas, p. ej. 'success' dentro de 'checkout/success'.
+    """
+    ordered = sorted(set(phrases), key=len, reverse=True)
+    return re.compile("(?=(" + "|".join(re.escape(phrase) for phrase in ordered) + "))")
+
+
+SUCCESS_PATTERN = _phrase_pattern(SUCCESS_PHRASES)
+SUCCESS_URL_PATTERN = _phrase_pattern(SUCCESS_URL_PHRASES)
+CONFIRMATION_NODE_PATTERN = _phrase_pattern(CONFIRMATION_NODE_WORDS)
+PROGRESS_URL_PATTERN = _phrase_pattern(PROGRESS_URL_PHRASES)
+ERROR_PATTERN = _phrase_pattern(ERROR_PHRASES)
+
+
+def _matches(pattern, text, phrases):
+    """Frases encontradas en el texto, en el orden de prioridad de la lista original"""
+    found = set(pattern.findall(text))
+    return [phrase for phrase in phrases if phrase in found]
+
+
+def capture_page_state(driver):
+    """Snapshot de la página necesario para el veredicto (un solo round-trip)"""
+    return driver.execute_script(PAGE_STATE_SCRIPT, CONFIRMATION_SELECTORS,
+                                 POSITIVE_CLASS_SELECTOR, SUCCESS_ICON_XPATH)
+
+
+def evaluate_page_state(state):
+    """Calcular el veredicto a partir de un snapshot ya capturado"""
+    url = state['url'].lower()
+    title = state['title'].lower()
+    text = state['text'].lower()
+
+    evidence = {
+        'url': _matches(SUCCESS_URL_PATTERN, url, SUCCESS_URL_PHRASES),
+        'title': _matches(SUCCESS_PATTERN, title, SUCCESS_PHRASES),
+        'content': _matches(SUCCESS_PATTERN, text, SUCCESS_PHRASES),
+        'elements': [node for node in state['nodes']
+                     if CONFIRMATION_NODE_PATTERN.search(node['text'].lower())],
+        'errors': _matches(ERROR_PATTERN, text, ERROR_PHRASES)
+    }
+
+    # Mismo orden de decisión que el análisis original: URL, título, contenido,
+    # elementos visuales, heurística y, por último, ausencia de errores
+    if evidence['url']:
+        method = f"URL contains '{evidence['url'][0]}'"
+    elif evidence['title']:
+        method = f"Title contains '{evidence['title'][0]}'"
+    elif evidence['content']:
+        method = f"Content contains '{evidence['content'][0]}'"
+    elif evidence['elements']:
+        method = f"Element <{evidence['elements'][0]['tag']} class='{evidence['elements'][0]['className'][:50]}'>"
+    elif PROGRESS_URL_PATTERN.search(url) or state['positive_count'] or state['icon_count']:
+        method = "Heuristic analysis"
+    elif not evidence['errors']:
+        method = "No errors detected"
+    else:
+        method = None
+
+    return {
+        'confirmed': method is not None,
+        'method': method,
+        'evidence': evidence,
+        'heuristics': {
+            'url_progress': bool(PROGRESS_URL_PATTERN.search(url)),
+            'positive_elements': state['positive_count'],
+            'success_icons': int(state['icon_count'])
+        },
+        'url': state['url'],
+        'title': state['title']
+    }
+
+
+def detect_order_confirmation(driver):
+    """Veredicto estructurado sobre si la página muestra un pedido confirmado"""
+    start_time = time.time()
+    verdict = evaluate_page_state(capture_page_state(driver))
+    verdict['elapsed_ms'] = round((time.time() - start_time) * 1000)
+    return verdict
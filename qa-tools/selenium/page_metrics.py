@@ -0,0 +1,161 @@
+"""
+Métricas de rendimiento web por navegación (CDP)
+Antes de la primera navegación se registra vía Page.addScriptToEvaluateOnNewDocument
+un observador que corre antes que la app y acumula paint, LCP, layout shifts y
+long tasks. Después de cada carga se lee Navigation Timing y esos buffers en
+un solo execute_script, y se suma el delta de Performance.getMetrics (tiempo
+de script, layout y estilos del renderer). Así los números salen del propio
+navegador y no del reloj de Python alrededor de driver.get.
+
+Cada registro lleva el network_mode del driver (network_cache.py): con cache o
+fast los assets salen de la caché en disco y los tiempos no son los de la red
+real, así que se avisa una vez por driver.
+"""
+
+import time
+from config import Config
+from network_cache import driver_network_mode
+
+OBSERVER_SCRIPT = """
+(function () {
+    if (window.__qaPerf || typeof PerformanceObserver === 'undefined') { return; }
+    var perf = window.__qaPerf = {lcp: null, shifts: [], longTasks: []};
+    function observe(type, callback) {
+        try {
+            new PerformanceObserver(function (list) { list.getEntries().forEach(callback); })
+                .observe({type: type, buffered: true});
+        } catch (e) { /* tipo no soportado por este navegador */ }
+    }
+    observe('largest-contentful-paint', function (entry) {
+        perf.lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    });
+    observe('layout-shift', function (entry) {
+        if (!entry.hadRecentInput) { perf.shifts.push([entry.startTime, entry.value]); }
+    });
+    observe('longtask', function (entry) {
+        perf.longTasks.push([entry.startTime, entry.duration]);
+    });
+})();
+"""
+
+COLLECT_SCRIPT = """
+var perf = window.__qaPerf || {lcp: null, shifts: [], longTasks: []};
+var nav = performance.getEntriesByType('navigation')[0];
+var fcpEntry = performance.getEntriesByName('first-contentful-paint')[0];
+var fcp = fcpEntry ? fcpEntry.startTime : null;
+
+// CLS: mayor ventana de sesión (huecos < 1 s, ventana <= 5 s)
+var cls = 0, windowValue = 0, windowStart = 0, previous = -Infinity;
+perf.shifts.forEach(function (shift) {
+    if (shift[0] - previous > 1000 || shift[0] - windowStart > 5000) {
+        windowStart = shift[0];
+        windowValue = 0;
+    }
+    windowValue += shift[1];
+    previous = shift[0];
+    cls = Math.max(cls, windowValue);
+});
+
+// TBT: tiempo por encima de 50 ms de cada long task desde el FCP
+var tbt = 0;
+perf.longTasks.forEach(function (task) {
+    if (fcp === null || task[0] >= fcp) { tbt += Math.max(0, task[1] - 50); }
+});
+
+var transfer = nav ? nav.transferSize : 0;
+var resources = performance.getEntriesByType('resource');
+resources.forEach(function (entry) { transfer += entry.transferSize || 0; });
+
+function round(value) { return value === null || value === undefined ? null : Math.round(value); }
+return {
+    url: window.location.href,
+    ttfb_ms: nav ? round(nav.responseStart - nav.requestStart) : null,
+    dom_content_loaded_ms: nav ? round(nav.domContentLoadedEventEnd) : null,
+    load_ms: nav ? round(nav.loadEventEnd) : null,
+    fcp_ms: round(fcp),
+    lcp_ms: round(perf.lcp),
+    cls: Math.round(cls * 10000) / 10000,
+    tbt_ms: round(tbt),
+    long_tasks: perf.longTasks.length,
+    transfer_bytes: transfer,
+    resource_count: resources.length,
+    observer: !!window.__qaPerf
+};
+"""
+
+# Contadores de Performance.getMetrics (acumulados por el renderer; se reporta el delta)
+CDP_DURATIONS = ["ScriptDuration", "LayoutDuration", "RecalcStyleDuration", "TaskDuration"]
+CDP_GAUGES = ["JSHeapUsedSize", "Nodes"]
+
+
+def install(driver):
+    """Registrar el observador en el navegador una sola vez por driver"""
+    if getattr(driver, "_qa_perf_installed", False):
+        return True
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": OBSERVER_SCRIPT})
+        driver.execute_cdp_cmd("Performance.enable", {})
+        driver._qa_perf_installed = True
+    except AttributeError:
+        return False  # Driver sin CDP: solo Navigation Timing y paint
+    return True
+
+
+def _cdp_metrics(driver):
+    try:
+        result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+    except Exception:
+        return {}
+    return {metric["name"]: metric["value"] for metric in result.get("metrics", [])}
+
+
+def collect(driver, before=None):
+    """Métricas de la página actual; 'before' es el snapshot CDP previo a navegar"""
+    metrics = driver.execute_script(COLLECT_SCRIPT) or {}
+    after = _cdp_metrics(driver)
+    if after:
+        before = before or {}
+        cdp = {name: round((after.get(name, 0) - before.get(name, 0)) * 1000)
+               for name in CDP_DURATIONS if name in after}
+        cdp = {f"{name[:-len('Duration')].lower()}_ms": value for name, value in cdp.items()}
+        if "JSHeapUsedSize" in after:
+            cdp["js_heap_bytes"] = int(after["JSHeapUsedSize"])
+        if "Nodes" in after:
+            cdp["dom_nodes"] = int(after["Nodes"])
+        metrics["renderer"] = cdp
+    return metrics
+
+
+def navigate_with_metrics(driver, url):
+    """driver.get(url) y métricas de esa carga (None si están desactivadas)"""
+    if not Config.COLLECT_PAGE_METRICS:
+        driver.get(url)
+        return None
+
+    install(driver)
+    before = _cdp_metrics(driver)
+    start_time = time.time()
+    driver.get(url)
+    wall_ms = round((time.time() - start_time) * 1000)
+    try:
+        metrics = collect(driver, before)
+    except Exception as e:
+        print(f"[WARN] No se pudieron leer las métricas de {url}: {str(e)[:100]}")
+        return None
+    metrics["wall_ms"] = wall_ms
+    metrics["network_mode"] = driver_network_mode(driver)
+    if metrics["network_mode"] != "perf" and not getattr(driver, "_qa_perf_mode_warned", False):
+        driver._qa_perf_mode_warned = True
+        print(f"[WARN] Métricas de página con interceptación de red (modo {metrics['network_mode']}): "
+              f"los tiempos no son los de la red real (usar --network-mode perf)")
+    return metrics
+
+
+def format_metrics(metrics):
+    """Resumen de una línea para los logs de las pruebas"""
+    if not metrics:
+        return "sin métricas"
+    return (f"TTFB {metrics.get('ttfb_ms')} ms, FCP {metrics.get('fcp_ms')} ms, "
+            f"LCP {metrics.get('lcp_ms')} ms, CLS {metrics.get('cls')}, "
+            f"TBT {metrics.get('tbt_ms')} ms, {round((metrics.get('transfer_bytes') or 0) / 1024)} KB"
+            + (f", red {metrics['network_mode']}" if metrics.get('network_mode', 'perf') != 'perf' else ""))
@@ -0,0 +1,354 @@
+"""
+Plugin de pytest para las suites de Selenium
+Expone lo que ofrece BaseTest como fixtures y recolecta los checks TC-00x
+existentes como items de pytest, sin reescribir las suites:
+
+    driver_pool         (sesión)  pool de Chrome calientes del proceso
+    driver              (función) driver limpio del pool; se devuelve reseteado vía CDP
+    base_test           (función) BaseTest ya enlazado a 'driver'
+    authenticated_user  (función) navegador con la sesión de TEST_USER inyectada (API)
+    check_results       (función) sink del item, reenvía al ResultsSink de la suite
+
+Cada item es independiente: los pasos previos que necesita (p. ej. TC-CART-002
+antes de TC-CART-003) se ejecutan como preparación y, si fallan, el item se
+marca como skip. Los checks que necesitan sesión (TC-CART-003 en adelante y
+complete_order_flow con FAST_LOGIN) arrancan con authenticated_user, como el
+login vía API de la suite. Con pytest-xdist cada worker tiene su propio pool y todos
+escriben en el mismo run_id (QA_RUN_ID) de results_sink.py.
+
+Uso:
+    pytest
+    pytest -n auto --headless --network-mode fast
+    pytest -k "TC-CART" --html=report.html
+    pytest --trace-spans            # un JSON trace-event por proceso (tracing.py)
+"""
+
+import os
+import ast
+import time
+import pytest
+from datetime import datetime
+from config import Config
+from base_test import BaseTest
+from waits import Waits
+from driver_pool import get_pool
+from results_sink import ResultsSink, current_run_id
+from session_bootstrap import api_login, inject_session
+from screenshot_writer import flush_pending
+import console_collector
+import tracing
+import idle_time
+
+try:
+    import pytest_html
+except ImportError:  # Sin pytest-html los detalles quedan solo en user_properties
+    pytest_html = None
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("selenium-qa")
+    group.addoption("--headless", action="store_true", help="Ejecutar Chrome sin interfaz")
+    group.addoption("--network-mode", choices=["perf", "cache", "fast"],
+                    help="Interceptación de red (ver network_cache.py)")
+    group.addoption("--trace-spans", action="store_true",
+                    help="Spans por paso y comando WebDriver para Perfetto (ver tracing.py)")
+
+
+def pytest_configure(config):
+    idle_time.install()
+    if config.getoption("headless"):
+        Config.HEADLESS = True
+    if config.getoption("network_mode"):
+        Config.NETWORK_MODE = config.getoption("network_mode")
+    if config.getoption("trace_spans"):
+        os.environ["QA_TRACE_SPANS"] = "1"  # Para los workers de xdist
+        tracing.enable()
+    # En el proceso principal, antes de lanzar los workers de xdist: lo heredan por entorno
+    current_run_id()
+
+
+def pytest_unconfigure(config):
+    # Los workers de xdist no siempre llegan a atexit
+    tracing.export()
+    idle_time.export()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    with tracing.span(item.nodeid, "test"), console_collector.step(item.nodeid):
+        yield
+
+
+# --- Fixtures --------------------------------------------------------------
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    pool = get_pool()
+    yield pool
+    pool.close_all()
+    flush_pending()
+
+
+@pytest.fixture
+def driver(driver_pool):
+    driver = driver_pool.acquire()
+    yield driver
+    driver_pool.release(driver)
+
+
+@pytest.fixture
+def base_test(driver):
+    tester = BaseTest()
+    tester.use_driver(driver)
+    return tester
+
+
+@pytest.fixture
+def authenticated_user(driver):
+    """Usuario de prueba ya logueado en el navegador; devuelve {'token', 'user'}"""
+    session = api_login(Config.TEST_USER['email'], Config.TEST_USER['password'])
+    if not session:
+        pytest.fail("No se pudo iniciar sesión vía API con TEST_USER")
+    inject_session(driver, session)
+    return session
+
+
+@pytest.fixture(scope="session")
+def _suite_sinks():
+    sinks = {}
+    yield sinks
+    for sink in sinks.values():
+        sink.close()
+
+
+@pytest.fixture
+def check_results(request, _suite_sinks):
+    suite = getattr(request.module, "SUITE", request.module.__name__)
+    if suite not in _suite_sinks:
+        _suite_sinks[suite] = ResultsSink(suite)
+    recorder = CheckRecorder(_suite_sinks[suite])
+    request.node.qa_records = recorder.records
+    return recorder
+
+
+class CheckRecorder:
+    """Resultados de un item; sink=None para los pasos de preparación (no se indexan)"""
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.records = []
+        self.start_time = datetime.now()
+
+    def add_result(self, test_name, status, duration, details="", screenshot_path=None, **fields):
+        if self.sink is not None:
+            record = self.sink.add_result(test_name, status, duration, details, screenshot_path, **fields)
+        else:
+            record = {'test': test_name, 'status': status, 'duration_ms': duration,
+                      'details': details, 'screenshot': screenshot_path}
+        self.records.append(record)
+        return record
+
+    def get_summary(self):
+        passed = sum(1 for r in self.records if r['status'] == 'PASSED')
+        failed = sum(1 for r in self.records if r['status'] == 'FAILED')
+        total = len(self.records)
+        return {
+            'total_tests': total,
+            'passed': passed,
+            'failed': failed,
+            'success_rate': round((passed / total * 100) if total > 0 else 0, 2),
+            'duration_seconds': round((datetime.now() - self.start_time).total_seconds(), 2)
+        }
+
+    def close(self, output_file=None, summary_fields=None, **report_fields):
+        # Bajo pytest el sink de la suite se cierra al final de la sesión y no se escriben JSON sueltos
+        return dict(self.get_summary(), **(summary_fields or {}))
+
+    @property
+    def results(self):
+        return list(self.records)
+
+
+# --- Checks de las suites existentes ---------------------------------------
+
+class PrerequisiteFailed(Exception):
+    pass
+
+
+def _run_steps(tester, recorder, steps):
+    """Pasos previos con un recorder descartable y el check final con el de la suite"""
+    value = None
+    for label, step in steps[:-1]:
+        tester.results = CheckRecorder()
+        with console_collector.step(label):
+            value = step(tester, value)
+        if not value:
+            raise PrerequisiteFailed(label)
+    tester.results = recorder
+    label, step = steps[-1]
+    with console_collector.step(label):
+        return step(tester, value)
+
+
+def _basic_checks(module):
+    def make(method, needs_home):
+        def check(driver, check_results):
+            tester = module.SeleniumBasicTests()
+            tester.driver = driver
+            steps = [(method, lambda t, _: getattr(t, method)())]
+            if needs_home:
+                steps.insert(0, ("carga de la página principal", lambda t, _: t.driver.get(Config.BASE_URL) or True))
+            return _run_steps(tester, check_results, steps)
+        return check
+
+    return [
+        ("TC-001", make("test_homepage_load", False)),
+        ("TC-002", make("test_navigation_elements", True)),
+        ("TC-003", make("test_responsive_design", True)),
+        ("TC-004", make("test_form_elements", True)),
+        ("TC-005", make("test_console_errors", True)),
+    ]
+
+
+def _shopping_cart_checks(module):
+    chain = [
+        ("TC-CART-001", lambda t, _: t.test_navigate_to_products()),
+        ("TC-CART-002", lambda t, _: t.test_find_products()),
+        ("TC-CART-003", lambda t, products: t.test_add_to_cart(products) and products),
+        ("TC-CART-004", lambda t, _: t.test_check_cart_icon()),
+        ("TC-CART-005", lambda t, cart_icon: t.test_open_cart(cart_icon)),
+    ]
+
+    def make(index):
+        def check(driver, check_results, session=None):
+            tester = module.ShoppingCartTests()
+            tester.driver = driver
+            tester.waits = Waits(driver)
+            return _run_steps(tester, check_results, chain[:index + 1])
+        # Desde TC-CART-003 el carrito es del usuario: la sesión ya está en el navegador
+        return _authenticated(check) if index >= 2 else check
+
+    return [(name, make(i)) for i, (name, _) in enumerate(chain)]
+
+
+def _login_checks(module):
+    def check(driver, check_results):
+        start_time = time.time()
+        test = module.TestLogin()
+        results = test.run_test(driver)
+        check_results.add_result(results['test_name'], results['status'],
+                                 round((time.time() - start_time) * 1000),
+                                 "; ".join(results['details']),
+                                 screenshots=results['screenshots'],
+                                 page_metrics=test.page_metrics)
+        return results['status'] == 'PASSED'
+    return [("TC-002", check)]
+
+
+def _flow_checks(function_name, item_name):
+    def checks(module):
+        def check(driver, check_results):
+            return getattr(module, function_name)(driver, check_results)
+        return [(item_name, check)]
+    return checks
+
+
+def _order_flow_checks(module):
+    def check(driver, check_results, session=None):
+        return module.test_complete_order_flow(driver, check_results, session=session)
+    # Con FAST_LOGIN la suite entra vía API: bajo pytest esa sesión la pone la fixture
+    return [("complete_order_flow", _authenticated(check) if Config.FAST_LOGIN else check)]
+
+
+SUITE_CHECKS = {
+    'basic_functionality': _basic_checks,
+    'shopping_cart_functionality': _shopping_cart_checks,
+    'login': _login_checks,
+    'shopping_cart_simple': _flow_checks('test_cart_functionality', 'cart_functionality'),
+    'complete_order_flow': _order_flow_checks,
+}
+
+
+def _authenticated(check):
+    """Marcar un check que arranca con la sesión de TEST_USER inyectada (fixture authenticated_user)"""
+    check.needs_session = True
+    return check
+
+
+def _as_test(check):
+    """Función con fixtures explícitas que falla según lo que registró el check"""
+    def run(driver, check_results, *session):
+        try:
+            outcome = check(driver, check_results, *session)
+        except PrerequisiteFailed as e:
+            pytest.skip(f"Falló la preparación: {e}")
+        failed = [r for r in check_results.records if r['status'] != 'PASSED']
+        if failed or not outcome:
+            details = "; ".join(f"{r['test']}: {r.get('details', '')}" for r in failed)
+            pytest.fail(details or "El check no se completó")
+
+    # pytest resuelve las fixtures por la firma: una variante por cada conjunto
+    if getattr(check, "needs_session", False):
+        def test(driver, check_results, authenticated_user):
+            run(driver, check_results, authenticated_user)
+    else:
+        def test(driver, check_results):
+            run(driver, check_results)
+    return test
+
+
+class SuiteModule(pytest.Module):
+    """Módulo de suite clásica: en lugar de la recolección normal, un item por check"""
+
+    def collect(self):
+        module = self.obj
+        for name, check in SUITE_CHECKS[module.SUITE](module):
+            yield pytest.Function.from_parent(self, name=name, callobj=_as_test(check))
+
+
+def _suite_name(path):
+    """Literal asignado a SUITE a nivel de módulo, sin importarlo (None si no hay)"""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, UnicodeDecodeError, SyntaxError):
+        return None  # La recolección normal reporta el error
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        if (any(isinstance(target, ast.Name) and target.id == "SUITE" for target in targets)
+                and isinstance(value, ast.Constant) and isinstance(value.value, str)):
+            return value.value
+    return None
+
+
+def pytest_pycollect_makemodule(module_path, parent):
+    if module_path.name.startswith("test_") and module_path.suffix == ".py":
+        if _suite_name(module_path) in SUITE_CHECKS:
+            return SuiteModule.from_parent(parent, path=module_path)
+    return None
+
+
+# --- Reporte ----------------------------------------------------------------
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    records = getattr(item, "qa_records", None)
+    if report.when != "call" or not records:
+        return
+
+    for record in records:
+        item.user_properties.append((record['test'], record['status']))
+    if pytest_html is not None and item.config.pluginmanager.hasplugin("html"):
+        extras = getattr(report, "extras", [])
+        for record in records:
+            extras.append(pytest_html.extras.text(f"{record['test']}: {record.get('details', '')}",
+                                                  name=record['status']))
+            if record.get('screenshot'):
+                extras.append(pytest_html.extras.image(record['screenshot']))
+        report.extras = extras
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Perfilador de planes de consulta SQLite para los repositorios del backend
+Extrae las sentencias SQL de backend/src/**/Sqlite*Repository.js (las que van
+entre backticks en Database.get/all/run), y contra BD sembradas de varios
+tamaños (data_generator.py) ejecuta EXPLAIN QUERY PLAN y mediciones repetidas:
+
+- SCAN de tabla completa (y si se debe a un LIKE con comodín inicial)
+- USE TEMP B-TREE (ORDER BY / DISTINCT / GROUP BY sin índice)
+- latencia p50/p95 por consulta; las que llevan OFFSET se miden también en la
+  última página, donde se paga el recorrido completo
+
+Los parámetros (?) se completan según la columna con la que se comparan
+(user_id de un usuario con carrito, product_id de su carrito, email existente,
+LIKE con --term, LIMIT 20...). Las sentencias con ${...} (filter) se omiten.
+UPDATE/DELETE se miden dentro de una transacción que se revierte.
+
+Con --check se compara contra query_plan_baseline.json y el proceso termina
+con código 1 si una consulta pasa a recorrer una tabla completa o a usar un
+B-tree temporal que antes no usaba (para CI). --update-baseline lo regenera.
+
+Uso:
+    python query_plan_profiler.py
+    python query_plan_profiler.py --sizes 1000 100000 --runs 50
+    python query_plan_profiler.py --db ../../backend/database/software_sales.db --check
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from config import Config
+from latency_histogram import LatencyHistogram
+import data_generator
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend", "src")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_plan_baseline.json")
+DEFAULT_WORK_DIR = os.path.join(Config.RESULTS_DIR, "query_plans")
+RESULTS_FILE = 'query_plan_results.json'
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_LIMIT = 20
+
+
+# --- Extracción ---------------------------------------------------------------
+
+def extract_statements(src_dir=BACKEND_SRC):
+    """[{'name', 'sql', 'file'}] de las consultas de cada repositorio SQLite"""
+    statements = []
+    pattern = os.path.join(src_dir, "**", "infrastructure", "repositories", "Sqlite*Repository.js")
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        class_name = re.search(r"class\s+(\w+)", source).group(1)
+        methods = [(m.start(), m.group(1)) for m in re.finditer(r"^\s+async\s+(\w+)\s*\(", source, re.M)]
+        seen = {}
+        for match in re.finditer(r"Database\.(?:get|all|run)\(\s*`(.*?)`", source, re.S):
+            method = next((name for start, name in reversed(methods) if start < match.start()), "?")
+            key = f"{class_name}.{method}"
+            seen[key] = seen.get(key, 0) + 1
+            statements.append({
+                'name': key if seen[key] == 1 else f"{key}#{seen[key]}",
+                'sql': " ".join(match.group(1).split()),
+                'file': os.path.relpath(path, src_dir)
+            })
+    return statements
+
+
+# --- Parámetros -----------------------------------------------------------------
+
+def _aliases(sql):
+    """alias -> tabla según FROM/JOIN ('ci' -> 'cart_items'); la tabla también se mapea a sí misma"""
+    aliases = {}
+    for table, alias in re.findall(r"(?:FROM|JOIN|UPDATE)\s+(\w+)(?:\s+(?!WHERE|SET|JOIN|ON|ORDER|LIMIT)(\w+))?", sql, re.I):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def sample_values(conn, term):
+    """Valores reales de la BD para completar los parámetros"""
+    one = lambda sql, default=None: (conn.execute(sql).fetchone() or [default])[0]
+    user_id = one("SELECT user_id FROM cart_items GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 1") \
+        or one("SELECT MAX(id) FROM users", 1)
+    # users.id y users.email del mismo usuario: el UPDATE de update() no choca con UNIQUE(email)
+    email_user = conn.execute("SELECT id, email FROM users ORDER BY email != ?, id LIMIT 1",
+                              (Config.TEST_USER['email'],)).fetchone() or (1, "")
+    return {
+        ('users', 'id'): email_user[0],
+        ('users', 'email'): email_user[1],
+        ('products', 'id'): one("SELECT MAX(id) / 2 FROM products", 1),
+        ('products', 'category'): one("SELECT category FROM products GROUP BY category ORDER BY COUNT(*) DESC LIMIT 1", ""),
+        ('products', 'price'): 0,
+        ('cart_items', 'id'): one(f"SELECT id FROM cart_items WHERE user_id = {int(user_id)} LIMIT 1", 1),
+        ('cart_items', 'user_id'): user_id,
+        ('cart_items', 'product_id'): one(f"SELECT product_id FROM cart_items WHERE user_id = {int(user_id)} LIMIT 1", 1),
+        'like': f"%{term}%",
+        'limit': DEFAULT_LIMIT
+    }
+
+
+def bind_parameters(sql, values, offset=0):
+    """Un valor por '?' según lo que tenga a la izquierda (columna comparada, LIMIT, OFFSET)"""
+    aliases = _aliases(sql)
+    main_table = next(iter(aliases.values()), None)
+    params = []
+    for match in re.finditer(r"\?", sql):
+        before = sql[:match.start()].rstrip()
+        if re.search(r"LIMIT$", before, re.I):
+            params.append(values['limit'])
+        elif re.search(r"OFFSET$", before, re.I):
+            params.append(offset)
+        elif re.search(r"LIKE$", before, re.I):
+            params.append(values['like'])
+        else:
+            column = re.search(r"(?:(\w+)\.)?(\w+)\s*(?:=|<=|>=|<|>)$", before)
+            if column:
+                table = aliases.get(column.group(1), main_table)
+                params.append(values.get((table, column.group(2)), 1))
+            else:
+                params.append(None)  # VALUES de un INSERT: no se ejecuta
+    return params
+
+
+# --- Perfil ------------------------------------------------------------------------
+
+def analyze_plan(conn, sql, params):
+    """Detalle de EXPLAIN QUERY PLAN con los recorridos completos y B-trees temporales"""
+    aliases = _aliases(sql)
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    scans, temp_btrees = [], []
+    for detail in details:
+        scan = re.match(r"SCAN (?:TABLE )?(\w+)(.*)", detail)
+        if scan and "INDEX" not in scan.group(2):
+            scans.append(aliases.get(scan.group(1), scan.group(1)))
+        temp = re.match(r"USE TEMP B-TREE FOR (.+)", detail)
+        if temp:
+            temp_btrees.append(temp.group(1))
+    return {
+        'plan': details,
+        'full_scans': sorted(set(scans)),
+        'temp_btrees': temp_btrees,
+        # Un índice no sirve para '%término%': el recorrido es inherente a la consulta
+        'leading_wildcard_like': bool(scans) and bool(re.search(r"LIKE\s+\?", sql, re.I))
+    }
+
+
+def time_query(conn, sql, params, runs):
+    """Latencias (ms) de 'runs' ejecuciones; las escrituras se revierten"""
+    histogram = LatencyHistogram()
+    is_write = not sql.lstrip().upper().startswith("SELECT")
+    rows = 0
+    for _ in range(runs):
+        if is_write:
+            conn.execute("BEGIN")
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        rows = len(cursor.fetchall()) if not is_write else cursor.rowcount
+        histogram.record((time.perf_counter() - start) * 1000)
+        if is_write:
+            conn.execute("ROLLBACK")
+    summary = histogram.summary()
+    return {'rows': rows, 'p50': summary['p50'], 'p95': summary['p95'], 'max': summary['max']}
+
+
+def matching_rows(conn, sql, params):
+    """Filas que cumplen el predicado de una consulta paginada: su COUNT sin ORDER BY/LIMIT/OFFSET"""
+    upper = sql.upper()
+    end = upper.rfind(" ORDER BY ")
+    if end < 0:
+        end = upper.rfind(" LIMIT ")
+    predicate = sql[:end]
+    return conn.execute(f"SELECT COUNT(*) FROM ({predicate})", params[:predicate.count("?")]).fetchone()[0]
+
+
+def profile_database(db_path, statements, runs, term):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        values = sample_values(conn, term)
+        table_rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("users", "products", "cart_items")}
+        results = []
+        for statement in statements:
+            sql = statement['sql']
+            if "${" in sql or sql.upper().startswith("INSERT"):
+                continue
+            variants = [(statement['name'], 0)]
+            if re.search(r"OFFSET\s+\?", sql, re.I):
+                # Última página de los resultados de esta consulta, no de la tabla completa
+                matches = matching_rows(conn, sql, bind_parameters(sql, values))
+                variants.append((f"{statement['name']}@última página", max(0, matches - DEFAULT_LIMIT)))
+            for name, offset in variants:
+                params = bind_parameters(sql, values, offset)
+                result = {'query': name, 'base_query': statement['name'], 'sql': sql, 'params': params}
+                result.update(analyze_plan(conn, sql, params))
+                result.update(time_query(conn, sql, params, runs))
+                results.append(result)
+        return {'db': db_path, 'tables': table_rows, 'queries': results}
+    finally:
+        conn.close()
+
+
+def seeded_database(size, work_dir, seed=42, reseed=False):
+    """BD sintética con 'size' productos y 'size' usuarios; se reutiliza si ya existe"""
+    path = os.path.join(work_dir, f"software_sales_{size}.db")
+    if not os.path.exists(path) or reseed:
+        args = argparse.Namespace(users=size, products=size, cart_ratio=0.3, cart_items=3,
+                                  unique_passwords=1, bcrypt_rounds=data_generator.BCRYPT_ROUNDS,
+                                  workers=1, db=path, from_db=data_generator.SOURCE_DB,
+                                  output_dir=work_dir, seed=seed)
+        data_generator.generate(args)
+    return path
+
+
+# --- Baseline y reporte --------------------------------------------------------------
+
+def plan_signature(profiles):
+    """Por consulta: tablas recorridas y B-trees temporales en cualquiera de los tamaños"""
+    signature = {}
+    for profile in profiles:
+        for query in profile['queries']:
+            entry = signature.setdefault(query['base_query'], {'full_scans': set(), 'temp_btrees': set()})
+            entry['full_scans'].update(query['full_scans'])
+            entry['temp_btrees'].update(query['temp_btrees'])
+    return {name: {key: sorted(value) for key, value in entry.items()} for name, entry in signature.items()}
+
+
+def find_regressions(signature, baseline):
+    regressions = []
+    for name, entry in signature.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue  # Consulta nueva: se incorpora con --update-baseline
+        for table in set(entry['full_scans']) - set(expected.get('full_scans', [])):
+            regressions.append(f"{name}: recorre completa la tabla {table}")
+        for reason in set(entry['temp_btrees']) - set(expected.get('temp_btrees', [])):
+            regressions.append(f"{name}: usa B-tree temporal para {reason}")
+    return regressions
+
+
+def print_report(profiles):
+    for profile in profiles:
+        tables = ", ".join(f"{table}={count:,}" for table, count in profile['tables'].items())
+        print("\n" + "=" * 70)
+        print(f"{os.path.basename(profile['db'])} ({tables})")
+        print("=" * 70)
+        print(f"{'consulta':<52} {'p50 ms':>8} {'p95 ms':>8}  plan")
+        for query in profile['queries']:
+            flags = []
+            if query['full_scans']:
+                flags.append("SCAN " + ",".join(query['full_scans'])
+                             + (" (LIKE '%...%')" if query['leading_wildcard_like'] else ""))
+            flags.extend(f"TEMP B-TREE {reason}" for reason in query['temp_btrees'])
+            print(f"{query['query'][:52]:<52} {query['p50']:>8} {query['p95']:>8}  {'; '.join(flags) or 'índices'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN y latencia de las consultas de los repositorios")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Productos (y usuarios) de cada BD sembrada")
+    parser.add_argument('--db', nargs='+', help="Perfilar estas BD en lugar de sembrar")
+    parser.add_argument('--runs', type=int, default=20, help="Ejecuciones medidas por consulta")
+    parser.add_argument('--term', default='office', help="Término para los LIKE")
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR)
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--check', action='store_true', help="Terminar con código 1 ante regresiones de plan")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    statements = extract_statements()
+    print(f"Sentencias extraídas: {len(statements)} (SQLite {sqlite3.sqlite_version})")
+
+    try:
+        if args.db:
+            databases = args.db
+        else:
+            os.makedirs(args.work_dir, exist_ok=True)
+            databases = [seeded_database(size, args.work_dir, args.seed, args.reseed) for size in sorted(args.sizes)]
+        profiles = [profile_database(db, statements, args.runs, args.term) for db in databases]
+    except (RuntimeError, OSError, sqlite3.Error) as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    print_report(profiles)
+    signature = plan_signature(profiles)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'sqlite_version': sqlite3.sqlite_version, 'profiles': profiles,
+                   'timestamp': datetime.now().isoformat()}, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(signature, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline actualizado: {args.baseline}")
+    elif args.check:
+        if not os.path.exists(args.baseline):
+            print(f"[ERROR] No existe el baseline {args.baseline} (generarlo con --update-baseline)")
+            return 1
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = find_regressions(signature, json.load(f))
+        if regressions:
+            print("\n[FAIL] Regresiones de plan:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\n[OK] Sin regresiones de plan respecto al baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Chequeos responsive en paralelo con emulación de dispositivo (CDP)
+set_window_size no sirve para medir viewports chicos: Chrome de escritorio no
+achica la ventana por debajo de ~500 px y el viewport resultante incluye o
+descuenta bordes y barras. Emulation.setDeviceMetricsOverride fija el viewport
+exacto (ancho, alto, devicePixelRatio, modo móvil).
+
+Cada dispositivo de Config.RESPONSIVE_DEVICES se abre en su propia ventana
+(Target.createTarget, mismo contexto: comparte sesión y localStorage), se
+emula, se carga la URL y se miden sus métricas de layout; todas las ventanas
+trabajan a la vez (hasta RESPONSIVE_MAX_WINDOWS), así que el costo total es
+el del dispositivo más lento y no la suma. Sin trio, o si la conexión CDP
+falla, se emula uno por uno en la pestaña actual.
+
+Con Chrome visible las ventanas quedan apiladas y Chrome pausa
+requestAnimationFrame y frena los timers de las tapadas: cada sesión emula el
+foco (Emulation.setFocusEmulationEnabled), Config.CHROME_OPTIONS desactiva el
+backgrounding de ventanas ocultas y la medición no espera frames más de 100 ms.
+Estas ventanas no pasan por la interceptación de network_cache.py ni por el
+colector de console_collector.py (ambos escuchan solo la pestaña del driver):
+cargan de la red real y sus errores de consola no cuentan en TC-005.
+"""
+
+import math
+import time
+from config import Config
+from network_cache import _cdp_endpoint
+from waits import script_timeout
+
+try:
+    import trio
+    from selenium.webdriver.common.bidi import cdp
+except ImportError:  # Sin trio: emulación secuencial vía execute_cdp_cmd
+    trio = None
+
+# Espera a que el DOM pase quietMs sin mutaciones (máximo timeoutMs) y dos frames
+# (o 100 ms si la ventana está en segundo plano y no hay frames); luego mide
+LAYOUT_METRICS_SCRIPT = """
+(function (quietMs, timeoutMs) {
+    return new Promise(function (resolve) {
+        var finished = false, timer = null;
+        function measure() {
+            var width = window.innerWidth, overflowing = 0;
+            var elements = document.body ? document.body.getElementsByTagName('*') : [];
+            for (var i = 0; i < elements.length && i < 5000; i++) {
+                var rect = elements[i].getBoundingClientRect();
+                if (rect.width > 0 && rect.right > width + 1) { overflowing++; }
+            }
+            return {
+                viewport_width: width,
+                viewport_height: window.innerHeight,
+                device_pixel_ratio: window.devicePixelRatio,
+                scroll_width: document.documentElement.scrollWidth,
+                content_height: document.documentElement.scrollHeight,
+                horizontal_overflow: document.documentElement.scrollWidth > width + 1,
+                overflowing_elements: overflowing,
+                touch: 'ontouchstart' in window || navigator.maxTouchPoints > 0
+            };
+        }
+        function finish() {
+            if (finished) { return; }
+            finished = true;
+            observer.disconnect();
+            var measured = false;
+            function done() {
+                if (measured) { return; }
+                measured = true;
+                resolve(measure());
+            }
+            requestAnimationFrame(function () { requestAnimationFrame(done); });
+            setTimeout(done, 100);
+        }
+        var observer = new MutationObserver(function () {
+            clearTimeout(timer);
+            timer = setTimeout(finish, quietMs);
+        });
+        observer.observe(document, {subtree: true, childList: true, attributes: true});
+        timer = setTimeout(finish, quietMs);
+        setTimeout(finish, timeoutMs);
+    });
+})(%d, %d)
+"""
+
+QUIET_MS = 300
+
+
+def _result(device, metrics, elapsed, mode):
+    result = {
+        'device': device['name'],
+        'requested': f"{device['width']}x{device['height']}",
+        'viewport': f"{metrics['viewport_width']}x{metrics['viewport_height']}",
+        'matches': (metrics['viewport_width'], metrics['viewport_height']) == (device['width'], device['height']),
+        'duration_ms': round(elapsed * 1000),
+        'mode': mode
+    }
+    result.update(metrics)
+    return result
+
+
+async def _check_device(conn, devtools, device, url, timeout, limiter):
+    async with limiter:
+        start = time.perf_counter()
+        target_id = await conn.execute(devtools.target.create_target("about:blank", new_window=True))
+        try:
+            async with conn.open_session(target_id) as session:
+                await session.execute(devtools.emulation.set_device_metrics_override(
+                    width=device['width'], height=device['height'],
+                    device_scale_factor=device.get('scale', 1), mobile=device.get('mobile', False)))
+                await session.execute(devtools.emulation.set_touch_emulation_enabled(device.get('mobile', False)))
+                # Ventana tapada por las demás: que se comporte como la enfocada
+                await session.execute(devtools.emulation.set_focus_emulation_enabled(True))
+                await session.execute(devtools.page.enable())
+                with trio.fail_after(timeout):
+                    async with session.wait_for(devtools.page.LoadEventFired, buffer_size=math.inf):
+                        await session.execute(devtools.page.navigate(url))
+                    value, exception = await session.execute(devtools.runtime.evaluate(
+                        LAYOUT_METRICS_SCRIPT % (QUIET_MS, int(timeout * 1000)),
+                        return_by_value=True, await_promise=True))
+                if exception is not None:
+                    raise RuntimeError(exception.text)
+                return _result(device, value.value, time.perf_counter() - start, 'parallel')
+        finally:
+            await conn.execute(devtools.target.close_target(target_id))
+
+
+async def _check_parallel(driver, url, devices, timeout):
+    ws_url, version = _cdp_endpoint(driver)
+    devtools = cdp.import_devtools(version)
+    results = [None] * len(devices)
+    limiter = trio.CapacityLimiter(Config.RESPONSIVE_MAX_WINDOWS)
+
+    async def run(index, device):
+        results[index] = await _check_device(conn, devtools, device, url, timeout, limiter)
+
+    async with cdp.open_cdp(ws_url) as conn:
+        async with trio.open_nursery() as nursery:
+            for index, device in enumerate(devices):
+                nursery.start_soon(run, index, device)
+    return results
+
+
+def _check_sequential(driver, devices, timeout):
+    """Emulación en la pestaña actual, un dispositivo tras otro"""
+    results = []
+    try:
+        for device in devices:
+            start = time.perf_counter()
+            driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                'width': device['width'], 'height': device['height'],
+                'deviceScaleFactor': device.get('scale', 1), 'mobile': device.get('mobile', False)})
+            script = (LAYOUT_METRICS_SCRIPT % (QUIET_MS, int(timeout * 1000))).strip()
+            with script_timeout(driver, timeout + 5):
+                metrics = driver.execute_async_script(f"var done = arguments[arguments.length - 1];\n{script}.then(done);")
+            results.append(_result(device, metrics, time.perf_counter() - start, 'sequential'))
+    finally:
+        driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+    return results
+
+
+def check_viewports(driver, url=None, devices=None, timeout=20):
+    """Métricas de layout de cada dispositivo de la matriz; en paralelo si hay CDP disponible"""
+    devices = devices or Config.RESPONSIVE_DEVICES
+    url = url or driver.current_url
+    if trio is not None and Config.RESPONSIVE_PARALLEL:
+        try:
+            return trio.run(_check_parallel, driver, url, devices, timeout)
+        except Exception as e:
+            print(f"[WARN] Emulación en paralelo no disponible, se emula uno por uno: {str(e)[:100]}")
+    return _check_sequential(driver, devices, timeout)
+
+
+def describe(result):
+    """'Mobile(375x667): viewport 375x667 @2x' más los problemas detectados"""
+    text = f"{result['device']}({result['requested']}): viewport {result['viewport']} @{result['device_pixel_ratio']:g}x"
+    if result['horizontal_overflow']:
+        text += f", desborde horizontal ({result['scroll_width']}px, {result['overflowing_elements']} elementos)"
+    return text
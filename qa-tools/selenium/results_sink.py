@@ -0,0 +1,265 @@
+"""
+Sink de resultados unificado
+Cada resultado se agrega como una línea JSONL en cuanto termina la prueba
+(results/runs/<run_id>.jsonl) y se indexa en SQLite (results/results.db) para
+consultar tendencias entre ejecuciones. El resumen se calcula con contadores
+incrementales: nada del run queda solo en memoria y un crash no pierde lo ya
+ejecutado.
+
+Todos los procesos de una misma ejecución (p. ej. los workers de
+run_parallel.py) comparten el run_id mediante la variable de entorno QA_RUN_ID
+y escriben en el mismo JSONL con appends bloqueados.
+
+Uso:
+    python results_sink.py                 # últimas ejecuciones indexadas
+    python results_sink.py --test "Login usuario"
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from config import Config
+import idle_time
+
+try:
+    import fcntl
+except ImportError:  # Windows: los appends de una sola escritura bastan en la práctica
+    fcntl = None
+
+RUN_ID_ENV = "QA_RUN_ID"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    duration_seconds REAL,
+    jsonl_path TEXT NOT NULL,
+    PRIMARY KEY (run_id, suite)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    test TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms INTEGER,
+    timestamp TEXT NOT NULL,
+    jsonl_offset INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results (run_id, suite);
+CREATE INDEX IF NOT EXISTS idx_results_test ON results (suite, test);
+"""
+
+
+def current_run_id():
+    """run_id compartido por todos los procesos de la ejecución actual"""
+    run_id = os.environ.get(RUN_ID_ENV)
+    if not run_id:
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def connect(db_path=None):
+    """Conexión a SQLite preparada para varios procesos escribiendo a la vez"""
+    db_path = db_path or Config.RESULTS_DB
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _append_line(path, line):
+    """Agregar una línea completa al JSONL; devuelve el offset donde quedó"""
+    data = (line + "\n").encode("utf-8")
+    with open(path, "ab") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    return offset
+
+
+class ResultsSink:
+    def __init__(self, suite, run_id=None, results_dir=None, db_path=None):
+        self.suite = suite
+        self.run_id = run_id or current_run_id()
+        self.results_dir = results_dir or Config.RESULTS_DIR
+        self.db_path = db_path or Config.RESULTS_DB
+        self.jsonl_path = os.path.join(self.results_dir, "runs", f"{self.run_id}.jsonl")
+        os.makedirs(os.path.dirname(self.jsonl_path), exist_ok=True)
+
+        self.start_time = datetime.now()
+        self.total = 0
+        self.passed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+        self.conn = None
+        self._index("""INSERT OR IGNORE INTO runs (run_id, suite, started_at, jsonl_path)
+                       VALUES (?, ?, ?, ?)""",
+                    (self.run_id, self.suite, self.start_time.isoformat(), self.jsonl_path))
+
+    def _index(self, sql, params):
+        """Escribir en el índice SQLite; un fallo aquí no debe tumbar las pruebas"""
+        try:
+            if self.conn is None:
+                self.conn = connect(self.db_path)
+            with self.conn:
+                self.conn.execute(sql, params)
+        except sqlite3.Error as e:
+            print(f"[WARN] No se pudo indexar el resultado en SQLite: {e}")
+
+    def add_result(self, test_name, status, duration, details="", screenshot_path=None, **fields):
+        """Registrar un resultado en cuanto termina (JSONL + índice + contadores)"""
+        record = {
+            'test': test_name,
+            'status': status,
+            'duration_ms': duration,
+            'details': details,
+            'timestamp': datetime.now().isoformat()
+        }
+        if screenshot_path is not None:
+            record['screenshot'] = screenshot_path
+        record.update(fields)
+        idle = idle_time.close_test(self.suite, test_name)
+        if idle:
+            record['idle_ms'] = idle
+        record['suite'] = self.suite
+        record['run_id'] = self.run_id
+
+        with self.lock:
+            offset = _append_line(self.jsonl_path, json.dumps(record, ensure_ascii=False, default=str))
+            self.total += 1
+            if status == 'PASSED':
+                self.passed += 1
+            elif status == 'FAILED':
+                self.failed += 1
+            self._index("""INSERT INTO results (run_id, suite, test, status, duration_ms, timestamp, jsonl_offset)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                        (self.run_id, self.suite, test_name, status, duration, record['timestamp'], offset))
+        return record
+
+    def get_summary(self):
+        return {
+            'total_tests': self.total,
+            'passed': self.passed,
+            'failed': self.failed,
+            'success_rate': round((self.passed / self.total * 100) if self.total > 0 else 0, 2),
+            'duration_seconds': round((datetime.now() - self.start_time).total_seconds(), 2)
+        }
+
+    def iter_results(self):
+        """Leer del JSONL los resultados de esta suite en este run, en orden"""
+        if not os.path.exists(self.jsonl_path):
+            return
+        with open(self.jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('suite') == self.suite and record.get('run_id') == self.run_id:
+                    yield record
+
+    @property
+    def results(self):
+        return list(self.iter_results())
+
+    def close(self, output_file=None, summary_fields=None, **report_fields):
+        """Cerrar el run de la suite y, si se pide, escribir el JSON de resumen clásico"""
+        summary = self.get_summary()
+        summary.update(summary_fields or {})
+        # Los totales salen del índice: varios procesos (p. ej. workers de pytest-xdist)
+        # pueden cerrar la misma suite del mismo run
+        self._index("""UPDATE runs SET finished_at = ?,
+                           total = (SELECT COUNT(*) FROM results r
+                                    WHERE r.run_id = runs.run_id AND r.suite = runs.suite),
+                           passed = (SELECT COUNT(*) FROM results r WHERE r.run_id = runs.run_id
+                                     AND r.suite = runs.suite AND r.status = 'PASSED'),
+                           failed = (SELECT COUNT(*) FROM results r WHERE r.run_id = runs.run_id
+                                     AND r.suite = runs.suite AND r.status = 'FAILED'),
+                           duration_seconds = MAX(COALESCE(duration_seconds, 0), ?)
+                       WHERE run_id = ? AND suite = ?""",
+                    (datetime.now().isoformat(), summary['duration_seconds'], self.run_id, self.suite))
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+        if output_file:
+            self._write_report(output_file, summary, report_fields)
+        return summary
+
+    def _write_report(self, output_file, summary, report_fields):
+        """JSON con el formato de siempre, escrito registro por registro desde el JSONL"""
+        tmp_path = f"{output_file}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write('{\n  "summary": ')
+            f.write(json.dumps(summary, ensure_ascii=False))
+            f.write(',\n  "results": [')
+            for i, record in enumerate(self.iter_results()):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n  ]")
+            for key, value in dict(report_fields, timestamp=datetime.now().isoformat()).items():
+                f.write(f",\n  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False, default=str)}")
+            f.write("\n}\n")
+        os.replace(tmp_path, output_file)
+
+
+def recent_runs(limit=20, db_path=None):
+    """Últimas ejecuciones indexadas, agregadas por run_id"""
+    conn = connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT run_id, MIN(started_at), SUM(total), SUM(passed), SUM(failed), GROUP_CONCAT(suite, ', ')
+            FROM runs GROUP BY run_id ORDER BY MIN(started_at) DESC LIMIT ?""", (limit,)).fetchall()
+    finally:
+        conn.close()
+
+
+def test_history(test_name, limit=20, db_path=None):
+    """Historial de estado y duración de una prueba entre ejecuciones"""
+    conn = connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT run_id, suite, status, duration_ms, timestamp FROM results
+            WHERE test = ? ORDER BY timestamp DESC LIMIT ?""", (test_name, limit)).fetchall()
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultar el índice de resultados")
+    parser.add_argument('--test', help="Historial de una prueba por nombre")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.test:
+        print(f"Historial de: {args.test}")
+        for run_id, suite, status, duration_ms, timestamp in test_history(args.test, args.limit):
+            print(f"  {timestamp}  {run_id}  {suite:<28} {status:<7} {duration_ms} ms")
+    else:
+        print("Últimas ejecuciones")
+        for run_id, started_at, total, passed, failed, suites in recent_runs(args.limit):
+            print(f"  {started_at}  {run_id}  {passed}/{total} exitosas, {failed} fallidas  [{suites}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
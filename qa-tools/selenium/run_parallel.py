@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Runner paralelo de las suites de Selenium
+Descubre los módulos test_*.py que exponen run_suite(driver) y los reparte
+entre N procesos worker, cada uno con su propio Chrome creado por
+BaseTest.setup_driver. Al final combina todos los resultados en un solo resumen.
+
+Uso:
+    python run_parallel.py --workers 8
+    python run_parallel.py --workers 4 --suites test_login test_cart_simple --headless
+    python run_parallel.py --workers 8 --headless --network-mode fast
+    python run_parallel.py --shard 2/3   # solo las suites del shard 2 de 3 (sharding.py)
+    python run_parallel.py --trace-spans  # trazas trace-event por worker (tracing.py)
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import queue
+import argparse
+import importlib
+import multiprocessing
+from datetime import datetime
+from base_test import BaseTest
+from driver_pool import get_pool
+from results_sink import current_run_id
+from screenshot_writer import flush_pending
+from console_collector import step
+from sharding import parse_shard, select_shard
+from config import Config
+import tracing
+import idle_time
+
+RESULTS_FILE = 'parallel_test_results.json'
+
+# Cada cuánto se revisa si algún worker murió mientras se esperan resultados
+POLL_SECONDS = 1
+
+
+def discover_suites(pattern='test_*.py', names=None):
+    """Buscar los módulos de prueba que exponen run_suite()"""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    suites = []
+    for path in sorted(glob.glob(os.path.join(base_dir, pattern))):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        if names and module_name not in names:
+            continue
+        module = importlib.import_module(module_name)
+        if callable(getattr(module, 'run_suite', None)):
+            suites.append(module_name)
+    return suites
+
+
+def summarize(results, duration_seconds):
+    """Calcular el resumen con el mismo formato que las suites individuales"""
+    total = len(results)
+    passed = len([r for r in results if r['status'] == 'PASSED'])
+    failed = total - passed
+
+    return {
+        'total_tests': total,
+        'passed': passed,
+        'failed': failed,
+        'success_rate': round((passed / total * 100) if total > 0 else 0, 2),
+        'duration_seconds': round(duration_seconds, 2)
+    }
+
+
+def _failed_outcome(module_name, start_time, message):
+    """Resultado sintético cuando una suite no pudo ejecutarse"""
+    return {
+        'suite': module_name,
+        'results': [{
+            'test': module_name,
+            'status': 'FAILED',
+            'duration_ms': round((time.time() - start_time) * 1000),
+            'details': message,
+            'timestamp': datetime.now().isoformat()
+        }]
+    }
+
+
+def _worker(worker_id, task_queue, result_queue, current, headless, network_mode, trace_spans):
+    """Proceso worker: un Chrome propio que ejecuta suites hasta recibir None"""
+    Config.HEADLESS = headless
+    Config.NETWORK_MODE = network_mode
+    if trace_spans:
+        tracing.enable()
+    idle_time.install()
+    tester = BaseTest()
+    driver_ready = tester.setup_driver()
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            # Memoria compartida, visible aunque el proceso muera sin vaciar result_queue
+            current[worker_id], module_name = task
+
+            start_time = time.time()
+            if not driver_ready:
+                outcome = _failed_outcome(module_name, start_time,
+                                          f"Worker {worker_id}: no se pudo configurar WebDriver")
+            else:
+                try:
+                    tester.reset_state()
+                    module = importlib.import_module(module_name)
+                    with tracing.span(module_name, "suite", worker=worker_id), step(module_name):
+                        outcome = module.run_suite(tester.driver)
+                except Exception as e:
+                    outcome = _failed_outcome(module_name, start_time, str(e))
+
+            outcome['module'] = module_name
+            outcome['worker'] = worker_id
+            outcome['duration_ms'] = round((time.time() - start_time) * 1000)
+            result_queue.put(outcome)
+    finally:
+        if driver_ready:
+            tester.teardown_driver()
+        # Los procesos de multiprocessing no ejecutan atexit: cerrar el pool
+        # y esperar los screenshots pendientes aquí
+        get_pool().close_all()
+        flush_pending()
+        tracing.export()
+        idle_time.export()
+
+
+def _dead_worker_outcome(module_name, worker_id, start_time, message):
+    outcome = _failed_outcome(module_name, start_time, message)
+    outcome.update(module=module_name, worker=worker_id,
+                   duration_ms=round((time.time() - start_time) * 1000))
+    return outcome
+
+
+def _collect_outcomes(result_queue, processes, current, suites, start_time):
+    """Un resultado por suite; la que tenía un worker muerto (Chrome caído, OOM) queda fallida"""
+    outcomes = []
+    pending = set(suites)
+    reported = set()
+    while pending:
+        try:
+            outcome = result_queue.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            for worker_id, process in enumerate(processes):
+                if process.is_alive() or process.exitcode == 0 or worker_id in reported:
+                    continue
+                reported.add(worker_id)
+                module_name = suites[current[worker_id]] if current[worker_id] >= 0 else None
+                print(f"[ERROR] Worker {worker_id} terminó inesperadamente (exitcode {process.exitcode})"
+                      + (f" durante {module_name}" if module_name else ""))
+                if module_name in pending:
+                    pending.discard(module_name)
+                    outcomes.append(_dead_worker_outcome(
+                        module_name, worker_id, start_time,
+                        f"Worker {worker_id} terminó inesperadamente (exitcode {process.exitcode})"))
+            if pending and not any(process.is_alive() for process in processes):
+                # Nadie queda para tomar las suites que siguen en la cola
+                for module_name in sorted(pending, key=suites.index):
+                    outcomes.append(_dead_worker_outcome(module_name, None, start_time,
+                                                         "No quedó ningún worker vivo para ejecutarla"))
+                pending.clear()
+            continue
+
+        if outcome['module'] in pending:
+            pending.discard(outcome['module'])
+            outcomes.append(outcome)
+    return outcomes
+
+
+def run_parallel(suites, workers):
+    """Ejecutar las suites en un pool de procesos y combinar los resultados"""
+    start_time = time.time()
+    workers = max(1, min(workers, len(suites)))
+    # Los workers heredan QA_RUN_ID: todos escriben en el mismo JSONL e índice
+    run_id = current_run_id()
+
+    task_queue = multiprocessing.Queue()
+    result_queue = multiprocessing.Queue()
+    for index, module_name in enumerate(suites):
+        task_queue.put((index, module_name))
+    for _ in range(workers):
+        task_queue.put(None)
+
+    # Índice de la suite que ejecuta cada worker (-1 = ninguna todavía)
+    current = multiprocessing.Array('i', [-1] * workers, lock=False)
+    processes = []
+    for worker_id in range(workers):
+        process = multiprocessing.Process(target=_worker, args=(worker_id, task_queue, result_queue, current,
+                                                                Config.HEADLESS, Config.NETWORK_MODE,
+                                                                tracing.enabled()))
+        process.start()
+        processes.append(process)
+
+    # Leer los resultados antes de join() para no bloquear la cola
+    outcomes = _collect_outcomes(result_queue, processes, current, suites, start_time)
+    for process in processes:
+        process.join()
+
+    outcomes.sort(key=lambda o: suites.index(o['module']))
+    results = []
+    for outcome in outcomes:
+        for result in outcome['results']:
+            result.setdefault('suite', outcome['suite'])
+            results.append(result)
+
+    return {
+        'summary': dict(summarize(results, time.time() - start_time), workers=workers),
+        'suites': [{
+            'module': o['module'],
+            'suite': o['suite'],
+            'worker': o['worker'],
+            'duration_ms': o['duration_ms'],
+            'summary': summarize(o['results'], o['duration_ms'] / 1000)
+        } for o in outcomes],
+        'results': results,
+        'run_id': run_id,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runner paralelo de suites Selenium")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Número de procesos worker (por defecto: núcleos disponibles)")
+    parser.add_argument('--suites', nargs='*',
+                        help="Módulos a ejecutar (por defecto: todos los test_*.py con run_suite)")
+    parser.add_argument('--headless', action='store_true', help="Ejecutar Chrome sin interfaz")
+    parser.add_argument('--network-mode', choices=['perf', 'cache', 'fast'],
+                        help="Interceptación de red: perf (red real), cache o fast (ver network_cache.py)")
+    parser.add_argument('--output', default=RESULTS_FILE, help="Archivo JSON con el resumen combinado")
+    parser.add_argument('--trace-spans', action='store_true',
+                        help="Guardar spans por paso y comando WebDriver para Perfetto (tracing.py)")
+    parser.add_argument('--shard', help="Ejecutar solo el shard i de N (p. ej. 2/3), repartido por duración histórica")
+    parser.add_argument('--history', help="Historial de duraciones compartido por los shards "
+                                          "(por defecto: Config.SHARD_HISTORY_FILE)")
+    args = parser.parse_args()
+
+    if args.headless:
+        Config.HEADLESS = True
+    if args.network_mode:
+        Config.NETWORK_MODE = args.network_mode
+    if args.trace_spans:
+        tracing.enable()
+
+    suites = discover_suites(names=args.suites)
+    if not suites:
+        print("[ERROR] No se encontraron suites para ejecutar")
+        return 1
+
+    if args.shard:
+        try:
+            shard_index, shard_total = parse_shard(args.shard)
+            suites, plan = select_shard(suites, shard_index, shard_total, args.history)
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+            return 1
+        print("PLAN DE SHARDS (LPT por duración histórica)")
+        for shard in plan:
+            marker = "->" if shard['index'] == shard_index else "  "
+            print(f" {marker} {shard['index']}/{shard_total}: ~{round(shard['estimated_ms'] / 1000)} s "
+                  f"[{', '.join(shard['modules']) or '-'}]")
+        if not suites:
+            print(f"[INFO] El shard {args.shard} no tiene suites asignadas")
+            return 0
+
+    print("="*60)
+    print("EJECUCIÓN PARALELA DE PRUEBAS SELENIUM")
+    print(f"Suites: {', '.join(suites)}")
+    print(f"Workers: {min(args.workers, len(suites))}")
+    print("="*60)
+
+    report = run_parallel(suites, args.workers)
+    summary = report['summary']
+
+    print("\n" + "="*60)
+    print("RESUMEN COMBINADO")
+    print("="*60)
+    for suite in report['suites']:
+        print(f"  {suite['module']}: {suite['summary']['passed']}/{suite['summary']['total_tests']} "
+              f"({suite['duration_ms']} ms, worker {suite['worker']})")
+    print(f"Total de Pruebas: {summary['total_tests']}")
+    print(f"Pruebas Exitosas: {summary['passed']}")
+    print(f"Pruebas Fallidas: {summary['failed']}")
+    print(f"Tasa de Éxito: {summary['success_rate']}%")
+    print(f"Duración Total: {summary['duration_seconds']} segundos")
+    print("="*60)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en: {args.output}")
+    print(f"Ejecución indexada en {Config.RESULTS_DB} (run_id: {report['run_id']})")
+    print(f"Tiempo ocioso por línea: python idle_time.py --run {report['run_id']}")
+
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
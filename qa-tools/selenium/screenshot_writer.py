@@ -0,0 +1,176 @@
+"""
+Escritor de screenshots en segundo plano
+La prueba solo paga la captura del navegador (Page.captureScreenshot, con
+compresión JPEG opcional hecha por Chrome); hashear, deduplicar y escribir a
+disco lo hace un hilo de fondo alimentado por una cola acotada.
+
+Almacenamiento direccionado por contenido: screenshots/objects/<sha256>.<ext>.
+Solo las capturas idénticas byte a byte comparten archivo: el objeto siempre
+tiene el hash de su nombre. Si Pillow está instalado, las perceptualmente
+parecidas (dHash a distancia <= SCREENSHOT_PHASH_DISTANCE) se guardan igual y
+el índice anota a cuál se parecen ('similar_to'): una página con y sin un
+banner de error puede quedar a pocos bits y las dos son evidencia.
+Cada captura queda registrada con su nombre lógico en screenshots/index.jsonl.
+"""
+
+import io
+import os
+import json
+import queue
+import atexit
+import base64
+import hashlib
+import threading
+from datetime import datetime
+from config import Config
+
+try:
+    from PIL import Image
+except ImportError:  # Sin Pillow no se anotan capturas parecidas
+    Image = None
+
+
+def _dhash(data):
+    """Hash perceptual de diferencia (64 bits) o None si Pillow no está disponible"""
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(data)) as image:
+        pixels = list(image.convert("L").resize((9, 8)).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+class ScreenshotWriter:
+    def __init__(self, base_dir=None, queue_size=None, phash_distance=None):
+        self.base_dir = base_dir or Config.SCREENSHOTS_DIR
+        self.objects_dir = os.path.join(self.base_dir, "objects")
+        self.index_path = os.path.join(self.base_dir, "index.jsonl")
+        self.phash_distance = (Config.SCREENSHOT_PHASH_DISTANCE
+                               if phash_distance is None else phash_distance)
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.queue = queue.Queue(maxsize=queue_size or Config.SCREENSHOT_QUEUE_SIZE)
+        self.known = self._load_index()
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self.thread.start()
+
+    def _load_index(self):
+        """Hashes perceptuales de los objetos ya guardados: {phash: ruta del primero}"""
+        known = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry.get("phash") is not None and not entry.get("alias_of"):
+                        known.setdefault(entry["phash"], entry["object"])
+        except (OSError, ValueError):
+            pass
+        return known
+
+    def capture(self, driver, name):
+        """Capturar y encolar; devuelve la ruta donde quedará la imagen (o None)"""
+        data, ext = self._grab(driver)
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.objects_dir, f"{digest}.{ext}")
+        try:
+            self.queue.put_nowait((name, path, data))
+        except queue.Full:
+            # Nunca bloquear la prueba: se pierde la captura y se avisa
+            self.dropped += 1
+            print(f"[WARN] Cola de screenshots llena, se descarta: {name}")
+            return None
+        return path
+
+    def _grab(self, driver):
+        """Bytes de la captura; JPEG comprimido por Chrome si así se configuró"""
+        if Config.SCREENSHOT_FORMAT == "jpeg":
+            try:
+                result = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "jpeg", "quality": Config.SCREENSHOT_QUALITY
+                })
+                return base64.b64decode(result["data"]), "jpg"
+            except AttributeError:
+                pass  # Driver sin CDP: PNG de WebDriver
+        return driver.get_screenshot_as_png(), "png"
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._store(*item)
+            except Exception as e:
+                print(f"[WARN] Error guardando screenshot: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _store(self, name, path, data):
+        entry = {"name": name, "object": path, "timestamp": datetime.now().isoformat()}
+        if os.path.exists(path):
+            entry["alias_of"] = path  # Captura idéntica: el objeto ya existe
+        else:
+            phash = _dhash(data)
+            entry["phash"] = phash
+            similar = self._similar(phash)
+            if similar:
+                entry["similar_to"] = similar  # Solo metadato: el objeto se guarda igual
+            self._write(path, data)
+            if phash is not None:
+                self.known.setdefault(phash, path)
+
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _similar(self, phash):
+        if phash is None:
+            return None
+        for known_hash, known_path in self.known.items():
+            if bin(known_hash ^ phash).count("1") <= self.phash_distance:
+                return known_path
+        return None
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def flush(self):
+        """Esperar a que se escriban las capturas pendientes"""
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Escritor compartido del proceso (se vacía automáticamente al salir)"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScreenshotWriter()
+            atexit.register(_writer.flush)
+    return _writer
+
+
+def flush_pending():
+    """Vaciar la cola si el proceso llegó a usar el escritor (workers sin atexit)"""
+    if _writer is not None:
+        _writer.flush()
+
+
+def capture_screenshot(driver, name):
+    """Atajo usado por las suites: captura en la prueba, escritura en segundo plano"""
+    return get_writer().capture(driver, name)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark de /api/products/search por tamaño de catálogo
+SqliteProductRepository.search hace cinco LIKE '%término%' más un CASE para
+ordenar y un COUNT aparte con los mismos predicados: ningún índice ayuda y el
+costo crece con el catálogo. Este benchmark lo mide:
+
+1. Copia backend/database/software_sales.db y la completa hasta N productos
+   (1k, 10k, 100k, 1M por defecto) con el catálogo sintético de stub_backend.py.
+   Las copias quedan en --work-dir y se reutilizan entre ejecuciones.
+2. Levanta node server.js contra cada copia (DB_PATH, puerto libre).
+3. Repite los searchTerm de jmeter/test-data/products.csv con concurrencia
+   creciente (usuarios cerrados, conexiones keep-alive de load_test.py).
+4. Reporta throughput y percentiles por tamaño y concurrencia, y la
+   concurrencia a partir de la cual el throughput deja de crecer.
+
+Uso:
+    python search_benchmark.py
+    python search_benchmark.py --sizes 1000 100000 --concurrency 1 8 32 --duration 20
+    python search_benchmark.py --backend stub --sizes 1000 10000   # probar el harness sin Node
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import asyncio
+import sqlite3
+import argparse
+import subprocess
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlparse, urlencode
+from config import Config
+from latency_histogram import LatencyHistogram
+from load_test import Connection, HTTPError, load_test_data, _event_loop_policy
+from stub_backend import StubBackend
+from data_generator import insert_products
+
+RESULTS_FILE = 'search_benchmark_results.json'
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend")
+SOURCE_DB = os.path.join(BACKEND_DIR, "database", "software_sales.db")
+DEFAULT_WORK_DIR = os.path.join(Config.RESULTS_DIR, "search_benchmark")
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+# Ganancia mínima de throughput para considerar que la concurrencia todavía escala
+SCALING_THRESHOLD = 1.10
+
+
+def seed_database(size, work_dir, source_db=SOURCE_DB, seed=42, reseed=False):
+    """Copia de la BD con 'size' productos; se reutiliza si ya existe"""
+    os.makedirs(work_dir, exist_ok=True)
+    path = os.path.join(work_dir, f"software_sales_{size}.db")
+    if os.path.exists(path) and not reseed:
+        return path, 0.0
+
+    start_time = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    shutil.copyfile(source_db, tmp_path)
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        existing = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        insert_products(conn, size, seed, skip=existing)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path, round(time.perf_counter() - start_time, 2)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(base_url, process=None, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"El backend terminó al arrancar (código {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"El backend no respondió en {base_url}/health")
+
+
+class NodeBackend:
+    """node server.js contra una copia de la BD, en un puerto libre"""
+
+    def __init__(self, db_path, backend_dir=BACKEND_DIR):
+        self.db_path = os.path.abspath(db_path)
+        self.log_path = f"{os.path.splitext(self.db_path)[0]}.log"
+        self.backend_dir = backend_dir
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def __enter__(self):
+        env = dict(os.environ, DB_PATH=self.db_path, PORT=str(self.port), NODE_ENV="production")
+        # La salida de morgan va a un archivo: un pipe sin leer terminaría bloqueando a node
+        with open(self.log_path, "wb") as log:
+            self.process = subprocess.Popen(["node", "server.js"], cwd=self.backend_dir, env=env,
+                                            stdout=log, stderr=subprocess.STDOUT)
+        try:
+            _wait_healthy(self.base_url, self.process)
+        except Exception as e:
+            self.__exit__(None, None, None)
+            raise RuntimeError(f"{e} (ver {self.log_path})")
+        return self
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+async def _search(connection, term):
+    start = time.perf_counter()
+    status, body = await connection.request('GET', f"/api/products/search?{urlencode({'q': term})}")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if status != 200:
+        raise HTTPError(f"HTTP {status}")
+    return elapsed_ms, body
+
+
+async def match_counts(base_url, terms, timeout):
+    """Resultados totales por término (y de paso calienta caché y conexiones)"""
+    url = urlparse(base_url)
+    connection = Connection(url.hostname, url.port, timeout)
+    counts = {}
+    try:
+        for term in terms:
+            _, body = await _search(connection, term)
+            counts[term] = json.loads(body)['data']['total']
+    finally:
+        connection.close()
+    return counts
+
+
+async def run_level(base_url, terms, concurrency, duration, timeout):
+    """Usuarios cerrados: cada uno recorre los términos sin pausa hasta el deadline"""
+    url = urlparse(base_url)
+    histogram = LatencyHistogram()
+    errors = []
+    deadline = time.perf_counter() + duration
+
+    async def user(index):
+        connection = Connection(url.hostname, url.port, timeout)
+        position = index
+        try:
+            while time.perf_counter() < deadline:
+                term = terms[position % len(terms)]
+                position += 1
+                try:
+                    elapsed_ms, _ = await _search(connection, term)
+                    histogram.record(elapsed_ms)
+                except (HTTPError, OSError, asyncio.TimeoutError) as e:
+                    errors.append(str(e) or e.__class__.__name__)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    summary = histogram.summary()
+    return dict(summary, concurrency=concurrency, errors=len(errors),
+                error_sample=errors[:3], rps=round(summary['count'] / elapsed, 1),
+                histogram=histogram.encode())
+
+
+def saturation_point(levels):
+    """Primera concurrencia cuyo throughput no supera al nivel anterior en SCALING_THRESHOLD"""
+    for previous, current in zip(levels, levels[1:]):
+        if current['rps'] < previous['rps'] * SCALING_THRESHOLD:
+            return previous['concurrency']
+    return None
+
+
+def benchmark_size(size, args, terms):
+    print(f"\n=== Catálogo de {size:,} productos ===")
+    if args.backend == 'stub':
+        backend, seed_seconds, db_bytes = StubBackend(products=size, seed=args.seed), 0.0, None
+    else:
+        db_path, seed_seconds = seed_database(size, args.work_dir, args.source_db, args.seed, args.reseed)
+        db_bytes = os.path.getsize(db_path)
+        print(f"BD: {db_path} ({round(db_bytes / 1024 / 1024, 1)} MB"
+              f"{f', sembrada en {seed_seconds} s' if seed_seconds else ', reutilizada'})")
+        backend = NodeBackend(db_path, args.backend_dir)
+
+    with backend:
+        counts = asyncio.run(match_counts(backend.base_url, terms, args.timeout))
+        levels = []
+        for concurrency in args.concurrency:
+            level = asyncio.run(run_level(backend.base_url, terms, concurrency, args.duration, args.timeout))
+            levels.append(level)
+            print(f"  c={concurrency:<4} {level['rps']:>9} req/s  p50={level['p50']:>9} ms  "
+                  f"p95={level['p95']:>9} ms  p99={level['p99']:>9} ms  errores={level['errors']}")
+
+    knee = saturation_point(levels)
+    if knee:
+        print(f"  El throughput deja de crecer a partir de c={knee}")
+    return {
+        'size': size,
+        'seed_seconds': seed_seconds,
+        'db_bytes': db_bytes,
+        'matches': counts,
+        'levels': levels,
+        'saturation_concurrency': knee
+    }
+
+
+def print_curves(results, concurrency):
+    print("\n" + "=" * 70)
+    print("CURVAS DE LATENCIA p95 (ms) POR TAMAÑO DE CATÁLOGO")
+    print("=" * 70)
+    print(f"{'productos':>10} " + " ".join(f"{f'c={c}':>10}" for c in concurrency) + f" {'req/s máx':>10}")
+    for result in results:
+        p95 = {level['concurrency']: level['p95'] for level in result['levels']}
+        best = max((level['rps'] for level in result['levels']), default=0)
+        print(f"{result['size']:>10,} " + " ".join(f"{p95.get(c, '-'):>10}" for c in concurrency)
+              + f" {best:>10}")
+
+    # Escalado con el tamaño: latencia sin contención (primer nivel) relativa al catálogo más chico
+    base = results[0]['levels'][0]['p50'] if results and results[0]['levels'] else None
+    if base:
+        print("\nLatencia p50 sin contención relativa al catálogo más chico:")
+        for result in results:
+            print(f"  {result['size']:>10,}: x{round(result['levels'][0]['p50'] / base, 1)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de productos por tamaño de catálogo")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--duration', type=float, default=10, help="Segundos por nivel de concurrencia")
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--backend', choices=['node', 'stub'], default='node')
+    parser.add_argument('--backend-dir', default=BACKEND_DIR)
+    parser.add_argument('--source-db', default=SOURCE_DB)
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR, help="Dónde se guardan las BD sembradas")
+    parser.add_argument('--reseed', action='store_true', help="Regenerar las BD aunque existan")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=None)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    _, products = load_test_data(args.data_dir)
+    terms = list(dict.fromkeys(row['searchTerm'] for row in products if row.get('searchTerm')))
+    print(f"Términos de búsqueda: {len(terms)} ({', '.join(terms[:5])}, ...)")
+    print(f"Concurrencia: {args.concurrency}, {args.duration} s por nivel, event loop: {_event_loop_policy()}")
+
+    results = []
+    for size in sorted(args.sizes):
+        try:
+            results.append(benchmark_size(size, args, terms))
+        except (RuntimeError, OSError, sqlite3.Error) as e:
+            print(f"[ERROR] Catálogo de {size}: {e}")
+            return 1
+
+    print_curves(results, args.concurrency)
+    report = {
+        'backend': args.backend,
+        'terms': terms,
+        'duration_per_level': args.duration,
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Resolución de selectores alternativos en un solo round-trip
+Evalúa toda la lista ordenada de candidatos (CSS o XPath) dentro de un único
+execute_script y devuelve el primer elemento visible y habilitado (find) o
+todos en orden de prioridad (find_all, para pasar al siguiente si el click
+falla). El selector ganador se guarda por ruta en disco para que las
+siguientes ejecuciones lo prueben primero.
+"""
+
+import os
+import json
+import time
+import threading
+from urllib.parse import urlparse
+from selenium.common.exceptions import WebDriverException
+from config import Config
+from tracing import span
+from idle_time import waiting
+from dom_snapshot import QUERY_HELPERS
+
+POLL_FREQUENCY = 0.05
+MAX_MATCHES = 10  # find_all: candidatos devueltos como máximo
+
+RESOLVE_SCRIPT = QUERY_HELPERS + """
+var candidates = arguments[0], opts = arguments[1], root = arguments[2] || document;
+function isEnabled(el) { return !el.disabled && el.getAttribute('aria-disabled') !== 'true'; }
+var matches = [], seen = [];
+for (var i = 0; i < candidates.length; i++) {
+    var elements = query(candidates[i], root);
+    for (var j = 0; j < elements.length; j++) {
+        var el = elements[j];
+        if (opts.visible && !isVisible(el)) { continue; }
+        if (opts.enabled && !isEnabled(el)) { continue; }
+        if (opts.exclude.length) {
+            var text = (el.innerText || el.value || '').trim().toLowerCase();
+            if (opts.exclude.some(function (word) { return text.indexOf(word) !== -1; })) { continue; }
+        }
+        if (seen.indexOf(el) !== -1) { continue; }  // ya lo encontró un candidato anterior
+        seen.push(el);
+        matches.push([i, el]);
+        if (matches.length >= opts.limit) { return matches; }
+    }
+}
+return matches;
+"""
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _cache_path():
+    return Config.SELECTOR_CACHE_FILE
+
+
+def _load_cache():
+    """Cargar el caché de selectores ganadores (una vez por proceso)"""
+    global _cache
+    if _cache is None:
+        try:
+            with open(_cache_path(), 'r', encoding='utf-8') as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _save_cache(key, selector):
+    """Guardar el ganador fusionando con lo que otros procesos hayan escrito"""
+    with _cache_lock:
+        cache = _load_cache()
+        cache[key] = selector
+        try:
+            with open(_cache_path(), 'r', encoding='utf-8') as f:
+                on_disk = json.load(f)
+        except (OSError, ValueError):
+            on_disk = {}
+        on_disk.update(cache)
+        cache.update(on_disk)
+
+        # Escritura atómica: nunca dejar un JSON a medias para otros workers
+        tmp_path = f"{_cache_path()}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(on_disk, f, indent=2, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, _cache_path())
+        except OSError as e:
+            print(f"[WARN] No se pudo guardar el caché de selectores: {e}")
+
+
+class SelectorResolver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.last_selector = None
+        self._keys = {}  # nombre -> clave de caché de la última resolución (ruta de ese momento)
+
+    def _cache_key(self, name):
+        """Clave por ruta de la página y nombre lógico del elemento"""
+        try:
+            route = urlparse(self.driver.current_url).path or "/"
+        except WebDriverException:
+            route = "/"
+        return f"{route}::{name}"
+
+    def find(self, name, candidates, timeout=0, root=None, visible=True, enabled=True, exclude=None):
+        """Primer elemento que cumple entre los candidatos; None si no aparece en 'timeout' segundos"""
+        with span("SelectorResolver.find", "wait", element=name) as info:
+            matches = self._resolve(name, candidates, timeout, root, visible, enabled, exclude, 1)
+            if matches:
+                self.remember(name, matches[0][0])
+            else:
+                self.last_selector = None
+            info['selector'] = self.last_selector
+            return matches[0][1] if matches else None
+
+    def find_all(self, name, candidates, timeout=0, root=None, visible=True, enabled=True, exclude=None,
+                 limit=MAX_MATCHES):
+        """[(selector, elemento)] que cumplen, en orden de prioridad y sin repetidos; [] si no aparece ninguno
+
+        No guarda ganador: el que llama prueba cada elemento y llama a remember()
+        con el selector del que funcionó.
+        """
+        with span("SelectorResolver.find_all", "wait", element=name) as info:
+            matches = self._resolve(name, candidates, timeout, root, visible, enabled, exclude, limit)
+            info['matches'] = len(matches)
+            return matches
+
+    def remember(self, name, selector):
+        """Registrar el selector que funcionó para que se pruebe primero la próxima vez
+
+        Usa la ruta de la resolución, no la actual: el click puede haber navegado.
+        """
+        self.last_selector = selector
+        key = self._keys.get(name) or self._cache_key(name)
+        if _load_cache().get(key) != selector:
+            _save_cache(key, selector)
+
+    def _resolve(self, name, candidates, timeout, root, visible, enabled, exclude, limit):
+        key = self._keys[name] = self._cache_key(name)
+        cached = _load_cache().get(key)
+        ordered = list(candidates)
+        if cached in ordered:
+            ordered.remove(cached)
+            ordered.insert(0, cached)
+
+        options = {
+            'visible': visible,
+            'enabled': enabled,
+            'exclude': [word.lower() for word in (exclude or [])],
+            'limit': limit
+        }
+        deadline = time.time() + timeout
+
+        # El sondeo no es tiempo ocioso salvo que termine en timeout (idle_time.py)
+        with waiting() as wait:
+            while True:
+                matches = self.driver.execute_script(RESOLVE_SCRIPT, ordered, options, root)
+                if matches:
+                    return [(ordered[index], element) for index, element in matches]
+                if time.time() >= deadline:
+                    wait['timed_out'] = timeout > 0
+                    return []
+                time.sleep(POLL_FREQUENCY)
@@ -0,0 +1,101 @@
+"""
+Arranque de sesión autenticada vía API
+Obtiene el JWT con POST /api/auth/login (requests) y lo inyecta en el
+localStorage de la aplicación ('authToken' y 'user', igual que AuthContext)
+antes de que cargue React, de modo que el navegador aterriza ya autenticado
+sin pasar por el formulario de login. Solo test_login.py usa el formulario real.
+"""
+
+import json
+import time
+import base64
+import requests
+from urllib.parse import urlparse
+from config import Config
+
+LOGIN_ENDPOINT = "/api/auth/login"
+
+# Tokens ya emitidos por email: evita repetir el bcrypt del backend en cada test
+_token_cache = {}
+
+INJECT_SCRIPT = """
+if (window.location.origin === %(origin)s) {
+    window.localStorage.setItem('authToken', %(token)s);
+    window.localStorage.setItem('user', %(user)s);
+}
+"""
+
+
+def _token_expiry(token):
+    """Leer el claim 'exp' del JWT (sin verificar firma); 0 si no se puede"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0)
+    except (IndexError, ValueError):
+        return 0
+
+
+def api_login(email=None, password=None, use_cache=True):
+    """Login contra la API; devuelve {'token', 'user'} o None si falla"""
+    email = email or Config.TEST_USER["email"]
+    password = password or Config.TEST_USER["password"]
+
+    cached = _token_cache.get(email)
+    if use_cache and cached and _token_expiry(cached["token"]) > time.time() + 60:
+        return cached
+
+    try:
+        response = requests.post(
+            f"{Config.API_BASE_URL}{LOGIN_ENDPOINT}",
+            json={"email": email, "password": password},
+            timeout=Config.EXPLICIT_WAIT
+        )
+        if response.status_code != 200:
+            print(f"[ERROR] Login vía API falló ({response.status_code}): {response.text[:100]}")
+            return None
+
+        data = response.json()["data"]
+        session = {"token": data["token"], "user": data["user"]}
+        _token_cache[email] = session
+        return session
+
+    except (requests.RequestException, KeyError, ValueError) as e:
+        print(f"[ERROR] Login vía API: {str(e)}")
+        return None
+
+
+def inject_session(driver, session, landing="/"):
+    """Cargar 'landing' con la sesión ya presente en localStorage"""
+    origin = "{0.scheme}://{0.netloc}".format(urlparse(Config.BASE_URL))
+    source = INJECT_SCRIPT % {
+        "origin": json.dumps(origin),
+        "token": json.dumps(session["token"]),
+        "user": json.dumps(json.dumps(session["user"]))
+    }
+    url = f"{Config.BASE_URL}{landing}"
+
+    try:
+        # Chrome: el script corre antes que la app, así basta una sola navegación
+        script = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+        try:
+            driver.get(url)
+        finally:
+            driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                                   {"identifier": script["identifier"]})
+    except AttributeError:
+        # Drivers sin CDP: abrir el origen, escribir el storage y recargar
+        driver.get(url)
+        driver.execute_script(source)
+        driver.get(url)
+
+
+def bootstrap_session(driver, email=None, password=None, landing="/"):
+    """Dejar el navegador autenticado en 'landing' sin usar el formulario"""
+    session = api_login(email, password)
+    if not session:
+        return False
+
+    inject_session(driver, session, landing)
+    print(f"[OK] Sesión iniciada vía API como {session['user'].get('email')}")
+    return True
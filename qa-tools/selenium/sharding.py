@@ -0,0 +1,172 @@
+"""
+Reparto de suites entre máquinas según su duración histórica
+Estima cuánto tarda cada suite con la mediana de sus últimas duraciones y las
+asigna a N shards con LPT (la más larga primero, siempre al shard con menos
+carga), de modo que todos terminen más o menos a la vez.
+
+Todos los runners deben calcular el mismo plan, así que el historial es una
+sola entrada explícita: shard_durations.json (Config.SHARD_HISTORY_FILE,
+versionado en el repositorio) o el archivo que se pase con --history, p. ej.
+un artefacto de CI. Nunca se lee el results.db ni los JSON locales de cada
+máquina: cada runner solo tendría el historial de su propio shard. Ese
+archivo se regenera desde el índice SQLite de una ejecución completa con
+--update (solo el índice: los JSON combinados repiten las mismas ejecuciones).
+
+Uso (a través de run_parallel.py):
+    python run_parallel.py --shard 1/3
+    python run_parallel.py --shard 2/3 --workers 2 --history artefactos/shard_durations.json
+    python sharding.py --update        # después de una ejecución completa, y versionar el archivo
+"""
+
+import os
+import sys
+import json
+import heapq
+import sqlite3
+import argparse
+import statistics
+import importlib
+from datetime import datetime
+from config import Config
+
+# Cuántas ejecuciones recientes por suite se guardan para la mediana
+HISTORY_RUNS = 10
+
+
+def parse_shard(value):
+    """'2/3' -> (2, 3); los shards se numeran desde 1"""
+    try:
+        index, total = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Formato de shard inválido: '{value}' (se espera i/N)")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Shard fuera de rango: '{value}'")
+    return index, total
+
+
+def _read_runs(path):
+    """{suite: [{'run_id', 'duration_ms'}, ...]} tal como está en el archivo"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('suites', {})
+
+
+def load_history(path=None):
+    """{suite: [ms, ...]} del historial compartido ({} si el archivo no existe)"""
+    path = path or Config.SHARD_HISTORY_FILE
+    try:
+        runs = _read_runs(path)
+    except FileNotFoundError:
+        print(f"[WARN] Sin historial de duraciones en {path}: se estima por tamaño de archivo")
+        return {}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Historial de duraciones ilegible ({path}): {e}")
+    return {suite: [run['duration_ms'] for run in suite_runs] for suite, suite_runs in runs.items()}
+
+
+def history_from_index(db_path=None):
+    """{suite: [{'run_id', 'duration_ms'}, ...]} desde el índice SQLite, de la más reciente a la más vieja"""
+    runs = {}
+    conn = sqlite3.connect(db_path or Config.RESULTS_DB, timeout=30)
+    try:
+        rows = conn.execute("""
+            SELECT suite, run_id, SUM(duration_ms) FROM results
+            GROUP BY run_id, suite ORDER BY MAX(timestamp) DESC""").fetchall()
+    finally:
+        conn.close()
+    for suite, run_id, duration_ms in rows:
+        if suite and duration_ms:
+            runs.setdefault(suite, []).append({'run_id': run_id, 'duration_ms': duration_ms})
+    return runs
+
+
+def update_history(path=None, db_path=None):
+    """Fusionar el índice local en el historial compartido; cada run_id cuenta una sola vez"""
+    path = path or Config.SHARD_HISTORY_FILE
+    try:
+        suites = _read_runs(path)
+    except FileNotFoundError:
+        suites = {}
+    for suite, new_runs in history_from_index(db_path).items():
+        seen = {run['run_id'] for run in new_runs}
+        merged = new_runs + [run for run in suites.get(suite, []) if run['run_id'] not in seen]
+        suites[suite] = merged[:HISTORY_RUNS]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'updated': datetime.now().isoformat(timespec='seconds'), 'history_runs': HISTORY_RUNS,
+                   'suites': dict(sorted(suites.items()))}, f, indent=2)
+        f.write("\n")
+    return {suite: [run['duration_ms'] for run in suite_runs] for suite, suite_runs in suites.items()}
+
+
+def estimate_durations(modules, history_path=None, base_dir=None):
+    """{módulo: ms estimados}; sin historial se estima por tamaño del archivo"""
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    samples = load_history(history_path)
+
+    known, unknown = {}, []
+    for module_name in modules:
+        suite = getattr(importlib.import_module(module_name), 'SUITE', module_name)
+        if samples.get(suite):
+            known[module_name] = statistics.median(samples[suite])
+        else:
+            unknown.append(module_name)
+
+    # Sin historial: milisegundos por línea de código según las suites conocidas
+    lines = {name: _line_count(os.path.join(base_dir, f"{name}.py")) for name in modules}
+    known_lines = sum(lines[name] for name in known)
+    ms_per_line = (sum(known.values()) / known_lines) if known and known_lines else 1
+    estimates = dict(known)
+    for module_name in unknown:
+        estimates[module_name] = lines[module_name] * ms_per_line
+    return estimates
+
+
+def _line_count(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 1
+
+
+def plan_shards(estimates, total):
+    """LPT: de la más larga a la más corta, cada suite al shard con menos carga"""
+    shards = [{'index': i + 1, 'modules': [], 'estimated_ms': 0} for i in range(total)]
+    heap = [(0, i) for i in range(total)]
+    for module_name, duration in sorted(estimates.items(), key=lambda item: (-item[1], item[0])):
+        load, i = heapq.heappop(heap)
+        shards[i]['modules'].append(module_name)
+        shards[i]['estimated_ms'] = round(load + duration)
+        heapq.heappush(heap, (load + duration, i))
+    return shards
+
+
+def select_shard(modules, index, total, history_path=None, base_dir=None):
+    """Suites del shard 'index' de 'total' y el plan completo (para el log)"""
+    plan = plan_shards(estimate_durations(modules, history_path, base_dir), total)
+    return plan[index - 1]['modules'], plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historial de duraciones para repartir suites en shards")
+    parser.add_argument('--update', action='store_true',
+                        help="Agregar al historial las ejecuciones del índice SQLite local")
+    parser.add_argument('--history', default=None, help="Archivo de historial (por defecto: Config.SHARD_HISTORY_FILE)")
+    parser.add_argument('--db', default=None, help="Índice SQLite de origen (por defecto: Config.RESULTS_DB)")
+    args = parser.parse_args()
+
+    if args.update:
+        try:
+            suites = update_history(args.history, args.db)
+        except sqlite3.Error as e:
+            print(f"[ERROR] No se pudo leer el índice SQLite: {e}")
+            return 1
+        print(f"Historial actualizado: {args.history or Config.SHARD_HISTORY_FILE}")
+    else:
+        suites = load_history(args.history)
+    for suite, durations in sorted(suites.items()):
+        print(f"  {suite:<30} mediana {round(statistics.median(durations) / 1000, 1):>7} s  ({len(durations)} ejecuciones)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
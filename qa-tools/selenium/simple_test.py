@@ -9,7 +9,7 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from driver_resolver import chrome_binary, chromedriver_path
 import time
 
 def test_selenium_basic():
@@ -21,12 +21,13 @@ def test_selenium_basic():
         
         # Opciones de Chrome
         chrome_options = Options()
-        chrome_options.binary_location = r"C:\Users\eddyr\OneDrive\Escritorio\chrome-win64\chrome.exe"
+        if chrome_binary():
+            chrome_options.binary_location = chrome_binary()
         chrome_options.add_argument("--window-size=1920,1080")
         
-        # Usar webdriver-manager
-        print("Descargando ChromeDriver compatible...")
-        service = Service(ChromeDriverManager().install())
+        # chromedriver local de la misma versión que Chrome (sin red)
+        print("Resolviendo ChromeDriver compatible...")
+        service = Service(chromedriver_path())
         
         print("Iniciando Chrome...")
         driver = webdriver.Chrome(service=service, options=chrome_options)
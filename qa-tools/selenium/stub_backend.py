@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Backend stub en proceso para corridas de UI herméticas
+Implementa en memoria las rutas de backend/server.js (auth login/profile,
+productos, carrito) con las mismas formas de respuesta ({success, data} y
+{error, code}), para que el frontend de Vite funcione sin Node ni SQLite.
+El catálogo se genera de cualquier tamaño (los primeros productos son los de
+jmeter/test-data/products.csv, con los mismos ids) y cada ruta puede tener
+una latencia configurable. Arranca en milisegundos.
+
+El navegador no llama a Config.API_BASE_URL: el frontend pide /api/* a Vite y
+su proxy (frontend/vite.config.js) lo reenvía siempre a localhost:3000. Para
+que una corrida de UI sea hermética el stub tiene que escuchar en el puerto
+3000 (con el backend real detenido). Un puerto libre (port=0) solo sirve para
+clientes que van directo a la API: load_test.py, session_bootstrap.py, ...
+
+Uso:
+    python stub_backend.py --port 3000 --products 10000
+    python stub_backend.py --latency "GET /api/products/search=150" --latency "*=20"
+
+    with StubBackend(port=3000, products=5000):      # UI: el destino del proxy de Vite
+        ...
+    with StubBackend(products=5000) as api:           # Solo API, en un puerto libre
+        Config.API_BASE_URL = api.base_url
+"""
+
+import os
+import re
+import csv
+import sys
+import hmac
+import json
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from config import Config
+
+JWT_SECRET = b"stub-backend-secret"
+TOKEN_TTL = timedelta(days=7)  # Igual que JWT_EXPIRES_IN del backend
+
+CATEGORIES = [
+    "Productividad", "Diseño", "Desarrollo", "Sistema Operativo", "Juegos",
+    "Seguridad", "Base de Datos", "Virtualización", "Comunicación", "Gestión", "Documentación"
+]
+VENDORS = ["Micro", "Nova", "Terra", "Quantum", "Blue", "Open", "Hyper", "Pixel", "Cloud", "Data"]
+PRODUCT_KINDS = ["Studio", "Suite", "Pro", "Server", "Manager", "Designer", "Shield", "Office", "Engine", "Desk"]
+COMPATIBILITY = ["Windows", "Windows, macOS", "Windows, macOS, Linux", "PC compatible", "Web"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, code):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+
+def _iso(moment):
+    return moment.isoformat(timespec="milliseconds") + "Z"
+
+
+def _product(product_id, name, category, price, created_at, rng):
+    return {
+        'id': product_id,
+        'name': name,
+        'description': f"{name}: software de {category.lower()} para equipos de trabajo",
+        'price': price,
+        'formattedPrice': f"${price:.2f}",
+        'category': category,
+        'version': str(rng.choice(["2023", "2024", "2025", "1.85", "23H2"])),
+        'compatibility': rng.choice(COMPATIBILITY),
+        'imageUrl': f"/images/product-{product_id % 12}.jpg",
+        'isFree': price == 0,
+        'createdAt': _iso(created_at),
+        'updatedAt': _iso(created_at)
+    }
+
+
+def iter_catalog(size, seed=42, data_dir=None):
+    """Catálogo determinista producto a producto: products.csv primero, luego sintéticos"""
+    rng = random.Random(seed)
+    base_time = datetime(2025, 1, 1)
+
+    try:
+        with open(os.path.join(data_dir or Config.LOAD_TEST_DATA_DIR, 'products.csv'),
+                  newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+    except OSError:
+        rows = []
+
+    for row in rows[:size]:
+        yield _product(int(row['productId']), row['productName'], row['category'],
+                       round(rng.uniform(0, 500), 2), base_time, rng)
+
+    next_id = max([int(row['productId']) for row in rows[:size]], default=0) + 1
+    for _ in range(size - min(size, len(rows))):
+        name = f"{rng.choice(VENDORS)}{rng.choice(PRODUCT_KINDS)} {rng.randint(1, 999)}"
+        price = 0.0 if rng.random() < 0.1 else round(rng.uniform(5, 2000), 2)
+        created_at = base_time + timedelta(minutes=next_id)
+        yield _product(next_id, name, rng.choice(CATEGORIES), price, created_at, rng)
+        next_id += 1
+
+
+def generate_catalog(size, seed=42, data_dir=None):
+    """Catálogo completo en memoria (ver iter_catalog)"""
+    return list(iter_catalog(size, seed, data_dir))
+
+
+def _load_users(data_dir=None):
+    users = {Config.TEST_USER['email']: {'name': Config.TEST_USER['name'],
+                                          'password': Config.TEST_USER['password']}}
+    try:
+        with open(os.path.join(data_dir or Config.LOAD_TEST_DATA_DIR, 'users.csv'),
+                  newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                users.setdefault(row['email'], {'name': f"{row['firstName']} {row['lastName']}",
+                                                'password': row['password']})
+    except OSError:
+        pass
+    created_at = _iso(datetime(2025, 1, 1))
+    return {email: dict(data, id=i + 1, email=email, createdAt=created_at, updatedAt=created_at)
+            for i, (email, data) in enumerate(users.items())}
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class StubState:
+    """Datos en memoria compartidos por todos los hilos del servidor"""
+
+    def __init__(self, products=1000, seed=42):
+        self.products = generate_catalog(products, seed)
+        self.by_id = {p['id']: p for p in self.products}
+        # Mismo orden que findAll (created_at DESC)
+        self.newest_first = sorted(self.products, key=lambda p: p['createdAt'], reverse=True)
+        self.categories = sorted({p['category'] for p in self.products})
+        prices = [p['price'] for p in self.products]
+        self.price_range = {'min': min(prices, default=0), 'max': max(prices, default=0)}
+        self.users = _load_users()
+        self.users_by_id = {u['id']: u for u in self.users.values()}
+        self.carts = {}  # user_id -> {item_id: item}
+        self.next_item_id = 1
+        self.lock = threading.Lock()
+
+    # --- Auth ---------------------------------------------------------------
+
+    def issue_token(self, user):
+        header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        now = int(time.time())
+        payload = _b64(json.dumps({"id": user['id'], "email": user['email'], "iat": now,
+                                   "exp": now + int(TOKEN_TTL.total_seconds())}).encode())
+        signature = _b64(hmac.new(JWT_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+        return f"{header}.{payload}.{signature}"
+
+    def authenticate(self, authorization):
+        if not authorization or not authorization.startswith("Bearer "):
+            raise ApiError(401, "Token de acceso requerido", "MISSING_TOKEN")
+        try:
+            header, payload, signature = authorization[7:].split(".")
+            expected = _b64(hmac.new(JWT_SECRET, f"{header}.{payload}".encode(), hashlib.sha256).digest())
+            claims = json.loads(_unb64(payload))
+        except ValueError:
+            raise ApiError(401, "Token inválido", "INVALID_TOKEN")
+        if not hmac.compare_digest(signature, expected) or claims.get("exp", 0) < time.time():
+            raise ApiError(401, "Token inválido o expirado", "INVALID_TOKEN")
+        user = self.users_by_id.get(claims.get("id"))
+        if not user:
+            raise ApiError(401, "Usuario no encontrado", "INVALID_TOKEN")
+        return user
+
+    def login(self, body):
+        email, password = body.get('email'), body.get('password')
+        if not email or not password:
+            raise ApiError(400, "Email y contraseña son requeridos", "VALIDATION_ERROR")
+        user = self.users.get(email.strip().lower())
+        if not user or user['password'] != password:
+            raise ApiError(400, "Credenciales inválidas", "BUSINESS_RULE_ERROR")
+        return {'user': {'id': user['id'], 'name': user['name'], 'email': user['email']},
+                'token': self.issue_token(user), 'message': 'Inicio de sesión exitoso'}
+
+    @staticmethod
+    def public_user(user):
+        return {key: user[key] for key in ('id', 'name', 'email', 'createdAt', 'updatedAt')}
+
+    # --- Productos ----------------------------------------------------------
+
+    @staticmethod
+    def paginate(items, page, limit, **extra):
+        if page < 1:
+            raise ApiError(500, "El número de página debe ser mayor a 0", "INTERNAL_SERVER_ERROR")
+        if limit < 1 or limit > 100:
+            raise ApiError(500, "El límite debe estar entre 1 y 100", "INTERNAL_SERVER_ERROR")
+        total = len(items)
+        total_pages = -(-total // limit)
+        result = {
+            'products': items[(page - 1) * limit:page * limit],
+            'total': total,
+            'totalPages': total_pages,
+            'currentPage': page,
+            'hasNextPage': page < total_pages,
+            'hasPrevPage': page > 1
+        }
+        result.update(extra)
+        return result
+
+    def search(self, term):
+        """Misma semántica que el LIKE %term% del repositorio, nombre y categoría primero"""
+        needle = term.lower()
+        ranked = []
+        for product in self.newest_first:
+            if needle in product['name'].lower():
+                ranked.append((1, product))
+            elif needle in product['category'].lower():
+                ranked.append((2, product))
+            elif any(needle in product[field].lower() for field in ('description', 'version', 'compatibility')):
+                ranked.append((3, product))
+        ranked.sort(key=lambda pair: pair[0])  # sort estable: conserva created_at DESC
+        return [product for _, product in ranked]
+
+    # --- Carrito ------------------------------------------------------------
+
+    def cart(self, user_id):
+        items = sorted(self.carts.get(user_id, {}).values(), key=lambda item: item['createdAt'], reverse=True)
+        total = round(sum(item['subtotal'] for item in items), 2)
+        return {
+            'userId': user_id,
+            'items': items,
+            'totalItems': sum(item['quantity'] for item in items),
+            'total': total,
+            'formattedTotal': f"${total:.2f}",
+            'isEmpty': not items
+        }
+
+    @staticmethod
+    def _set_quantity(item, quantity):
+        item['quantity'] = quantity
+        item['subtotal'] = round(item['product']['price'] * quantity, 2)
+        item['formattedSubtotal'] = f"${item['subtotal']:.2f}"
+        return item
+
+    def add_item(self, user_id, product_id, quantity):
+        if quantity < 1:
+            raise ApiError(500, "La cantidad debe ser mayor a 0", "INTERNAL_SERVER_ERROR")
+        if quantity > 99:
+            raise ApiError(500, "La cantidad no puede exceder 99 unidades", "INTERNAL_SERVER_ERROR")
+        product = self.by_id.get(product_id)
+        if not product:
+            raise ApiError(500, "Producto no encontrado", "INTERNAL_SERVER_ERROR")
+        with self.lock:
+            items = self.carts.setdefault(user_id, {})
+            existing = next((i for i in items.values() if i['productId'] == product_id), None)
+            if existing:
+                return self._set_quantity(existing, existing['quantity'] + quantity)
+            item = {'id': self.next_item_id, 'userId': user_id, 'productId': product_id,
+                    'product': product, 'createdAt': _iso(datetime.now(timezone.utc).replace(tzinfo=None))}
+            self.next_item_id += 1
+            items[item['id']] = self._set_quantity(item, quantity)
+            return item
+
+    def find_item(self, user_id, item_id):
+        item = self.carts.get(user_id, {}).get(item_id)
+        if not item:
+            raise ApiError(500, "Item no encontrado en el carrito", "INTERNAL_SERVER_ERROR")
+        return item
+
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive como Express
+    server_version = "StubBackend/1.0"
+    # Cabeceras y cuerpo en un solo segmento TCP: sin esto Nagle + ACK diferido suman ~40 ms
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    # (método, patrón, nombre de la ruta para latencias, función)
+    ROUTES = []
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        origin = self.headers.get("Origin")
+        if origin:
+            self.send_header("Access-Control-Allow-Origin", origin)
+            self.send_header("Access-Control-Allow-Credentials", "true")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        if not self.raw_body:
+            return {}
+        try:
+            return json.loads(self.raw_body)
+        except ValueError:
+            raise ApiError(400, "JSON inválido", "VALIDATION_ERROR")
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin", "*"))
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        self.send_header("Access-Control-Allow-Credentials", "true")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _dispatch(self):
+        # Consumir siempre el cuerpo para no desincronizar la conexión keep-alive
+        self.raw_body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        for method, pattern, label, handler in self.ROUTES:
+            if method != self.command:
+                continue
+            match = pattern.fullmatch(parsed.path)
+            if match:
+                self.server.delay(label)
+                try:
+                    status, data = handler(self, self.server.state, query, *match.groups())
+                    self._send(status, {'success': True, 'data': data})
+                except ApiError as e:
+                    self._send(e.status, {'error': str(e), 'code': e.code})
+                return
+        self._send(404, {'error': f"Ruta {self.command} {parsed.path} no encontrada", 'code': 'ROUTE_NOT_FOUND'})
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch
+
+    # --- Handlers -----------------------------------------------------------
+
+    def login(self, state, query):
+        return 200, state.login(self._body())
+
+    def logout(self, state, query):
+        state.authenticate(self.headers.get("Authorization"))
+        return 200, {'message': 'Sesión cerrada exitosamente'}
+
+    def profile(self, state, query):
+        user = state.authenticate(self.headers.get("Authorization"))
+        return 200, {'user': state.public_user(user)}
+
+    def products(self, state, query):
+        result = state.paginate(state.newest_first, _int(query.get('page'), 1), _int(query.get('limit'), 20))
+        result['message'] = f"Se encontraron {result['total']} productos en total"
+        return 200, result
+
+    def search(self, state, query):
+        term = (query.get('q') or '').strip()
+        page, limit = _int(query.get('page'), 1), _int(query.get('limit'), 20)
+        if not term:
+            return 200, state.paginate(state.newest_first, page, limit)
+        result = state.paginate(state.search(term), page, limit, searchTerm=term)
+        result['message'] = (f"Se encontraron {result['total']} productos" if result['total']
+                             else 'No se encontraron productos que coincidan con la búsqueda')
+        return 200, result
+
+    def categories(self, state, query):
+        return 200, {'categories': state.categories, 'total': len(state.categories),
+                     'message': f"Se encontraron {len(state.categories)} categorías disponibles"}
+
+    def price_range(self, state, query):
+        return 200, {'priceRange': state.price_range, 'message': 'Rango de precios obtenido exitosamente'}
+
+    def product(self, state, query, product_id):
+        product = state.by_id.get(_int(product_id, 0))
+        if not product:
+            raise ApiError(500, "Producto no encontrado", "INTERNAL_SERVER_ERROR")
+        return 200, {'product': product, 'message': 'Producto encontrado exitosamente'}
+
+    def get_cart(self, state, query):
+        user = state.authenticate(self.headers.get("Authorization"))
+        with state.lock:
+            cart = state.cart(user['id'])
+        return 200, {'cart': cart, 'message': ('El carrito está vacío' if cart['isEmpty']
+                                               else f"Carrito con {cart['totalItems']} productos")}
+
+    def add_item(self, state, query):
+        user = state.authenticate(self.headers.get("Authorization"))
+        body = self._body()
+        if not body.get('productId'):
+            raise ApiError(400, "El ID del producto es requerido", "MISSING_PRODUCT_ID")
+        item = state.add_item(user['id'], _int(body['productId'], 0), _int(body.get('quantity', 1), 0))
+        return 201, {'item': item, 'message': 'Producto agregado al carrito exitosamente'}
+
+    def update_item(self, state, query, item_id):
+        user = state.authenticate(self.headers.get("Authorization"))
+        quantity = _int(self._body().get('quantity'), 0)
+        if not quantity:
+            raise ApiError(400, "La cantidad es requerida", "MISSING_QUANTITY")
+        if quantity > 99:
+            raise ApiError(500, "La cantidad no puede exceder 99 unidades", "INTERNAL_SERVER_ERROR")
+        with state.lock:
+            item = state._set_quantity(state.find_item(user['id'], _int(item_id, 0)), quantity)
+        return 200, {'item': item, 'message': 'Cantidad actualizada exitosamente'}
+
+    def remove_item(self, state, query, item_id):
+        user = state.authenticate(self.headers.get("Authorization"))
+        with state.lock:
+            state.find_item(user['id'], _int(item_id, 0))
+            del state.carts[user['id']][_int(item_id, 0)]
+        return 200, {'message': 'Producto eliminado del carrito exitosamente'}
+
+    def clear_cart(self, state, query):
+        user = state.authenticate(self.headers.get("Authorization"))
+        with state.lock:
+            state.carts.pop(user['id'], None)
+        return 200, {'message': 'Carrito vaciado exitosamente'}
+
+    def health(self, state, query):
+        return 200, {'status': 'OK', 'stub': True, 'products': len(state.products)}
+
+
+StubRequestHandler.ROUTES = [
+    (method, re.compile(path), f"{method} {label}", handler)
+    for method, path, label, handler in [
+        ("POST", r"/api/auth/login", "/api/auth/login", StubRequestHandler.login),
+        ("POST", r"/api/auth/logout", "/api/auth/logout", StubRequestHandler.logout),
+        ("GET", r"/api/auth/profile", "/api/auth/profile", StubRequestHandler.profile),
+        ("GET", r"/api/products", "/api/products", StubRequestHandler.products),
+        ("GET", r"/api/products/search", "/api/products/search", StubRequestHandler.search),
+        ("GET", r"/api/products/categories", "/api/products/categories", StubRequestHandler.categories),
+        ("GET", r"/api/products/price-range", "/api/products/price-range", StubRequestHandler.price_range),
+        ("GET", r"/api/products/([^/]+)", "/api/products/:id", StubRequestHandler.product),
+        ("GET", r"/api/cart", "/api/cart", StubRequestHandler.get_cart),
+        ("POST", r"/api/cart/items", "/api/cart/items", StubRequestHandler.add_item),
+        ("PUT", r"/api/cart/items/([^/]+)", "/api/cart/items/:id", StubRequestHandler.update_item),
+        ("DELETE", r"/api/cart/items/([^/]+)", "/api/cart/items/:id", StubRequestHandler.remove_item),
+        ("DELETE", r"/api/cart", "/api/cart", StubRequestHandler.clear_cart),
+        ("GET", r"/health", "/health", StubRequestHandler.health),
+    ]
+]
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, state, latency=None, verbose=False):
+        super().__init__(address, StubRequestHandler)
+        self.state = state
+        self.latency = dict(latency or {})
+        self.verbose = verbose
+
+    def delay(self, label):
+        """Latencia configurada para la ruta ('GET /api/products/:id') o la de '*'"""
+        delay_ms = self.latency.get(label, self.latency.get('*', 0))
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+
+class StubBackend:
+    """Servidor stub en un hilo de fondo; port=0 elige un puerto libre"""
+
+    def __init__(self, port=0, host="127.0.0.1", products=1000, latency=None, seed=42, verbose=False):
+        self.state = StubState(products, seed)
+        self.server = StubServer((host, port), self.state, latency, verbose)
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_latency(self, label, delay_ms):
+        """Cambiar la latencia de una ruta en caliente (p. ej. 'GET /api/cart')"""
+        self.server.latency[label] = delay_ms
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-backend", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_latency(values):
+    """['GET /api/products/search=150', '*=20'] -> {ruta: ms}"""
+    latency = {}
+    for value in values or []:
+        label, _, delay_ms = value.rpartition("=")
+        latency[label.strip()] = float(delay_ms)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend stub en memoria con las rutas de server.js")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=urlparse(Config.API_BASE_URL).port or 3000)
+    parser.add_argument('--products', type=int, default=1000, help="Tamaño del catálogo generado")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla del catálogo")
+    parser.add_argument('--latency', action='append',
+                        help="Latencia por ruta en ms, p. ej. 'GET /api/products/search=150' o '*=20'")
+    parser.add_argument('--verbose', action='store_true', help="Registrar cada request")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    backend = StubBackend(args.port, args.host, args.products, parse_latency(args.latency),
+                          args.seed, args.verbose)
+    print(f"Backend stub en {backend.base_url} ({args.products} productos, "
+          f"{len(backend.state.users)} usuarios) listo en {round((time.time() - start_time) * 1000)} ms")
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,44 +17,31 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from config import Config
+from waits import Waits, pause
+from dom_snapshot import count
+from responsive import check_viewports, describe
+from results_sink import ResultsSink
+import idle_time
+from page_metrics import navigate_with_metrics, format_metrics
+from driver_resolver import chrome_binary, chromedriver_path
+from network_cache import attach_interceptor
+from console_collector import attach_console_collector, get_console_collector, current_scope, step
 
-class SeleniumTestResults:
-    def __init__(self):
-        self.results = []
-        self.start_time = datetime.now()
-        
-    def add_result(self, test_name, status, duration, details=""):
-        self.results.append({
-            'test': test_name,
-            'status': status,
-            'duration_ms': duration,
-            'details': details,
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    def get_summary(self):
-        total = len(self.results)
-        passed = len([r for r in self.results if r['status'] == 'PASSED'])
-        failed = len([r for r in self.results if r['status'] == 'FAILED'])
-        
-        return {
-            'total_tests': total,
-            'passed': passed,
-            'failed': failed,
-            'success_rate': round((passed / total * 100) if total > 0 else 0, 2),
-            'duration_seconds': round((datetime.now() - self.start_time).total_seconds(), 2)
-        }
+# Nombre de la suite en los resultados (results_sink.py, sharding.py)
+SUITE = 'basic_functionality'
 
 class SeleniumBasicTests:
     def __init__(self):
         self.driver = None
-        self.results = SeleniumTestResults()
+        self.results = ResultsSink(SUITE)
     
     def setup_driver(self):
         """Configurar Chrome WebDriver"""
+        idle_time.install()
         try:
             chrome_options = Options()
-            chrome_options.binary_location = Config.CHROME_BINARY_PATH
+            if chrome_binary():
+                chrome_options.binary_location = chrome_binary()
             
             # Agregar opciones de Chrome
             for option in Config.CHROME_OPTIONS:
@@ -64,8 +51,11 @@ class SeleniumBasicTests:
                 chrome_options.add_argument('--headless')
             
             # Usar Chrome binario sin ChromeDriver separado
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
             self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
+            self.driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+            attach_interceptor(self.driver)
+            attach_console_collector(self.driver)
             
             print(f"[OK] Chrome WebDriver configurado exitosamente")
             return True
@@ -80,7 +70,7 @@ class SeleniumBasicTests:
         start_time = time.time()
         
         try:
-            self.driver.get(Config.BASE_URL)
+            metrics = navigate_with_metrics(self.driver, Config.BASE_URL)
             
             # Verificar título de la página
             WebDriverWait(self.driver, 10).until(
@@ -94,13 +84,15 @@ class SeleniumBasicTests:
             if "CISNET" in title or current_url == Config.BASE_URL:
                 duration = round((time.time() - start_time) * 1000)
                 self.results.add_result(test_name, 'PASSED', duration, 
-                                      f"Título: '{title}', URL: {current_url}")
-                print(f"[PASS] {test_name}")
+                                      f"Título: '{title}', URL: {current_url}",
+                                      page_metrics=metrics)
+                print(f"[PASS] {test_name} ({format_metrics(metrics)})")
                 return True
             else:
                 duration = round((time.time() - start_time) * 1000)
                 self.results.add_result(test_name, 'FAILED', duration,
-                                      f"Título inesperado: '{title}', URL: {current_url}")
+                                      f"Título inesperado: '{title}', URL: {current_url}",
+                                      page_metrics=metrics)
                 print(f"[FAIL] {test_name}")
                 return False
                 
@@ -129,13 +121,11 @@ class SeleniumBasicTests:
                 ("a", "Enlaces de navegación")
             ]
             
+            # Un solo round-trip para todos los selectores (sin esperas implícitas por fallo)
+            counts = count(self.driver, [selector for selector, _ in selectors_to_try])
             for selector, description in selectors_to_try:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        navigation_elements.append(f"{description}: {len(elements)} elementos")
-                except:
-                    continue
+                if counts.get(selector):
+                    navigation_elements.append(f"{description}: {counts[selector]} elementos")
             
             if navigation_elements:
                 duration = round((time.time() - start_time) * 1000)
@@ -162,29 +152,20 @@ class SeleniumBasicTests:
         start_time = time.time()
         
         try:
-            # Probar diferentes resoluciones
-            resolutions = [
-                (1920, 1080, "Desktop"),
-                (768, 1024, "Tablet"),
-                (375, 667, "Mobile")
-            ]
-            
-            responsive_results = []
-            
-            for width, height, device_type in resolutions:
-                self.driver.set_window_size(width, height)
-                time.sleep(1)  # Esperar a que se ajuste el layout
-                
-                # Verificar que el contenido se ajusta
-                body = self.driver.find_element(By.TAG_NAME, "body")
-                viewport_width = self.driver.execute_script("return window.innerWidth;")
-                viewport_height = self.driver.execute_script("return window.innerHeight;")
-                
-                responsive_results.append(f"{device_type}({width}x{height}): viewport {viewport_width}x{viewport_height}")
+            # Matriz de dispositivos emulada en paralelo (viewport exacto, no el tamaño de ventana)
+            viewports = check_viewports(self.driver)
+            details = "; ".join(describe(viewport) for viewport in viewports)
+            mismatched = [viewport['device'] for viewport in viewports if not viewport['matches']]
             
             duration = round((time.time() - start_time) * 1000)
-            details = "; ".join(responsive_results)
-            self.results.add_result(test_name, 'PASSED', duration, details)
+            if mismatched:
+                self.results.add_result(test_name, 'FAILED', duration,
+                                        f"Viewport distinto al emulado en: {', '.join(mismatched)}; {details}",
+                                        viewports=viewports)
+                print(f"[FAIL] {test_name}: viewport incorrecto en {', '.join(mismatched)}")
+                return False
+            
+            self.results.add_result(test_name, 'PASSED', duration, details, viewports=viewports)
             print(f"[PASS] {test_name}")
             return True
             
@@ -201,17 +182,16 @@ class SeleniumBasicTests:
         
         try:
             # Buscar formularios en la página
-            forms = self.driver.find_elements(By.TAG_NAME, "form")
-            inputs = self.driver.find_elements(By.TAG_NAME, "input")
-            buttons = self.driver.find_elements(By.TAG_NAME, "button")
+            counts = count(self.driver, ["form", "input", "button"])
+            forms, inputs, buttons = counts.get("form", 0), counts.get("input", 0), counts.get("button", 0)
             
             form_details = []
             if forms:
-                form_details.append(f"Formularios: {len(forms)}")
+                form_details.append(f"Formularios: {forms}")
             if inputs:
-                form_details.append(f"Inputs: {len(inputs)}")
+                form_details.append(f"Inputs: {inputs}")
             if buttons:
-                form_details.append(f"Botones: {len(buttons)}")
+                form_details.append(f"Botones: {buttons}")
             
             if form_details:
                 duration = round((time.time() - start_time) * 1000)
@@ -238,25 +218,37 @@ class SeleniumBasicTests:
         start_time = time.time()
         
         try:
-            # Obtener logs de la consola
-            logs = self.driver.get_log('browser')
-            
-            # Filtrar solo errores
-            errors = [log for log in logs if log['level'] == 'SEVERE']
-            warnings = [log for log in logs if log['level'] == 'WARNING']
+            collector = get_console_collector(self.driver)
+            if collector is not None:
+                # Todo lo ocurrido en el ámbito en curso (la suite o el item de pytest; sin
+                # ámbito, la sesión completa), ya contado por paso y sin comandos WebDriver
+                scope = current_scope()
+                by_step = collector.counts_by_step(scope)
+                counts = collector.counts(scope=scope)
+                errors = counts.get('error', 0)
+                warnings = counts.get('warning', 0)
+                error_messages = [f"{group['text'][:100]} (x{group['scopes'][scope] if scope else group['count']}, "
+                                  f"{group['first_step']})"
+                                  for group in collector.groups(level='error', scope=scope)][:3]
+            else:
+                # Sin colector: solo lo que sigue en el buffer de chromedriver
+                logs = self.driver.get_log('browser')
+                by_step = None
+                errors = len([log for log in logs if log['level'] == 'SEVERE'])
+                warnings = len([log for log in logs if log['level'] == 'WARNING'])
+                error_messages = [log['message'][:100] for log in logs if log['level'] == 'SEVERE'][:3]
             
-            details = f"Errores: {len(errors)}, Advertencias: {len(warnings)}"
+            details = f"Errores: {errors}, Advertencias: {warnings}"
             
-            if len(errors) == 0:
+            if errors == 0:
                 duration = round((time.time() - start_time) * 1000)
-                self.results.add_result(test_name, 'PASSED', duration, details)
+                self.results.add_result(test_name, 'PASSED', duration, details, console=by_step)
                 print(f"[PASS] {test_name}")
                 return True
             else:
                 duration = round((time.time() - start_time) * 1000)
-                error_messages = [err['message'][:100] for err in errors[:3]]
                 details += f". Errores: {'; '.join(error_messages)}"
-                self.results.add_result(test_name, 'FAILED', duration, details)
+                self.results.add_result(test_name, 'FAILED', duration, details, console=by_step)
                 print(f"[FAIL] {test_name}")
                 return False
                 
@@ -266,8 +258,8 @@ class SeleniumBasicTests:
             print(f"[FAIL] {test_name}: {str(e)}")
             return False
     
-    def run_all_tests(self):
-        """Ejecutar todas las pruebas"""
+    def run_all_tests(self, driver=None):
+        """Ejecutar todas las pruebas (driver opcional para reutilizar uno existente)"""
         print("="*60)
         print("INICIANDO PRUEBAS AUTOMATIZADAS CON SELENIUM")
         print("Sistema: CISNET - Software Sales System")
@@ -275,7 +267,10 @@ class SeleniumBasicTests:
         print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*60)
         
-        if not self.setup_driver():
+        owns_driver = driver is None
+        if driver is not None:
+            self.driver = driver
+        elif not self.setup_driver():
             return False
         
         try:
@@ -288,15 +283,17 @@ class SeleniumBasicTests:
                 self.test_console_errors
             ]
             
-            for test_method in test_methods:
-                try:
-                    test_method()
-                    time.sleep(1)  # Pausa entre pruebas
-                except Exception as e:
-                    print(f"[ERROR] Error ejecutando {test_method.__name__}: {str(e)}")
+            with step(SUITE):
+                for test_method in test_methods:
+                    try:
+                        with step(test_method.__name__):
+                            test_method()
+                        pause(1, "pausa entre pruebas")
+                    except Exception as e:
+                        print(f"[ERROR] Error ejecutando {test_method.__name__}: {str(e)}")
             
-            # Mostrar resumen
-            summary = self.results.get_summary()
+            # Mostrar resumen (los resultados ya están en el JSONL de la ejecución)
+            summary = self.results.close('selenium_test_results.json')
             print("\n" + "="*60)
             print("RESUMEN DE RESULTADOS")
             print("="*60)
@@ -307,23 +304,24 @@ class SeleniumBasicTests:
             print(f"Duración Total: {summary['duration_seconds']} segundos")
             print("="*60)
             
-            # Guardar resultados en archivo JSON
-            with open('selenium_test_results.json', 'w', encoding='utf-8') as f:
-                json.dump({
-                    'summary': summary,
-                    'results': self.results.results,
-                    'timestamp': datetime.now().isoformat()
-                }, f, indent=2, ensure_ascii=False)
-            
             print(f"Resultados guardados en: selenium_test_results.json")
             
             return summary['success_rate'] > 0
             
         finally:
-            if self.driver:
+            if self.driver and owns_driver:
                 self.driver.quit()
                 print("WebDriver cerrado correctamente")
 
+def run_suite(driver=None):
+    """Punto de entrada común usado por run_parallel.py"""
+    tester = SeleniumBasicTests()
+    tester.run_all_tests(driver)
+    return {
+        'suite': SUITE,
+        'results': tester.results.results
+    }
+
 if __name__ == "__main__":
     tester = SeleniumBasicTests()
     success = tester.run_all_tests()
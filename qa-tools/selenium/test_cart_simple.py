@@ -11,17 +11,30 @@ import json
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from config import Config
+from waits import Waits
+from selector_resolver import SelectorResolver
+from dom_snapshot import snapshot, count
+from results_sink import ResultsSink
+import idle_time
+from driver_resolver import chrome_binary, chromedriver_path
+from network_cache import attach_interceptor
+
+# Nombre de la suite en los resultados (results_sink.py, sharding.py)
+SUITE = 'shopping_cart_simple'
 
 def setup_driver():
     """Configurar Chrome WebDriver con pantalla completa"""
+    idle_time.install()
     try:
         chrome_options = Options()
-        chrome_options.binary_location = Config.CHROME_BINARY_PATH
+        if chrome_binary():
+            chrome_options.binary_location = chrome_binary()
         
         # Opciones para test optimizado
         chrome_options.add_argument('--no-sandbox')
@@ -35,8 +48,10 @@ def setup_driver():
         chrome_options.add_argument('--disable-web-security')
         chrome_options.add_argument('--allow-running-insecure-content')
         
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
         driver.implicitly_wait(10)  # Timeout más generoso
+        driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+        attach_interceptor(driver)
         driver.maximize_window()  # Asegurar pantalla completa
         
         return driver
@@ -44,10 +59,12 @@ def setup_driver():
         print(f"[ERROR] Setup driver: {str(e)}")
         return None
 
-def test_cart_functionality():
-    """Test principal del carrito"""
-    results = []
-    driver = setup_driver()
+def test_cart_functionality(driver=None, results=None):
+    """Test principal del carrito (driver y sink de resultados opcionales)"""
+    results = ResultsSink(SUITE) if results is None else results
+    owns_driver = driver is None
+    if owns_driver:
+        driver = setup_driver()
     
     if not driver:
         return False
@@ -65,24 +82,22 @@ def test_cart_functionality():
         
         # Esperar que cargue completamente
         wait = WebDriverWait(driver, 15)
+        waits = Waits(driver, 15)
         wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+        waits.document_ready()
         
         title = driver.title
         print(f"[OK] Página cargada: {title}")
-        results.append({
-            'test': 'Carga de página',
-            'status': 'PASSED',
-            'duration_ms': round((time.time() - start) * 1000),
-            'details': f"Título: {title}"
-        })
+        results.add_result('Carga de página', 'PASSED',
+                           round((time.time() - start) * 1000),
+                           f"Título: {title}")
         
         # Test 2: Buscar elementos de productos
         print("\n[2/4] Buscando productos en la página...")
         start = time.time()
         
-        # Esperar un poco más para que los elementos dinámicos carguen
-        time.sleep(2)
+        # Esperar a que los elementos dinámicos terminen de renderizar
+        waits.dom_settled()
         
         # Selectores comunes para productos
         product_selectors = [
@@ -93,35 +108,28 @@ def test_cart_functionality():
             "[data-testid*='product']"
         ]
         
+        def any_product_counts(d):
+            counts = count(d, product_selectors)
+            return counts if any(counts.values()) else False
+        
+        # Espera explícita sobre todos los selectores a la vez (un round-trip por sondeo)
+        product_counts = waits.condition(any_product_counts, message="productos en la página") or {}
+        
         products_found = 0
         for selector in product_selectors:
-            try:
-                # Usar espera explícita para los elementos
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    products_found = len(elements)
-                    print(f"[OK] Encontrados {products_found} elementos con selector: {selector}")
-                    break
-            except TimeoutException:
-                continue
-            except:
-                continue
+            if product_counts.get(selector):
+                products_found = product_counts[selector]
+                print(f"[OK] Encontrados {products_found} elementos con selector: {selector}")
+                break
         
         if products_found > 0:
-            results.append({
-                'test': 'Detectar productos',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': f"Productos encontrados: {products_found}"
-            })
+            results.add_result('Detectar productos', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               f"Productos encontrados: {products_found}")
         else:
-            results.append({
-                'test': 'Detectar productos',
-                'status': 'FAILED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'No se encontraron productos'
-            })
+            results.add_result('Detectar productos', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'No se encontraron productos')
             print("[FAIL] No se encontraron productos")
         
         # Test 3: Buscar botones de "Agregar al carrito"
@@ -153,8 +161,7 @@ def test_cart_functionality():
                         first_button = elements[0]
                         
                         # Scroll al elemento
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", first_button)
-                        time.sleep(1)
+                        waits.scroll_into_view(first_button)
                         
                         # Intentar clic normal primero
                         try:
@@ -166,7 +173,7 @@ def test_cart_functionality():
                             driver.execute_script("arguments[0].click();", first_button)
                             print(f"[OK] Clic exitoso en botón de carrito (método JavaScript)")
                         
-                        time.sleep(2)  # Esperar respuesta
+                        waits.dom_settled()  # Esperar respuesta de la UI
                     except Exception as e:
                         print(f"[WARN] Clic en botón falló: {str(e)}")
                     
@@ -175,19 +182,13 @@ def test_cart_functionality():
                 continue
         
         if cart_buttons > 0:
-            results.append({
-                'test': 'Botones de carrito',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': f"Botones encontrados: {cart_buttons}"
-            })
+            results.add_result('Botones de carrito', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               f"Botones encontrados: {cart_buttons}")
         else:
-            results.append({
-                'test': 'Botones de carrito',
-                'status': 'FAILED', 
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'No se encontraron botones de carrito'
-            })
+            results.add_result('Botones de carrito', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'No se encontraron botones de carrito')
             print("[FAIL] No se encontraron botones de carrito")
         
         # Test 4: Buscar icono/contador de carrito en header
@@ -221,82 +222,59 @@ def test_cart_functionality():
             "//a[.//svg]"       # Cualquier enlace con SVG
         ]
         
-        cart_icon_found = False
-        for i, selector in enumerate(cart_icon_selectors):
+        # Todos los candidatos se evalúan en un solo round-trip; el ganador se cachea por ruta
+        resolver = SelectorResolver(driver)
+        element = resolver.find("cart-icon", cart_icon_selectors, enabled=False)
+        cart_icon_found = element is not None
+        if cart_icon_found:
+            element_tag = element.tag_name
+            element_class = element.get_attribute('class') or ''
+            element_text = element.text.strip()[:20] or element.get_attribute('aria-label') or element.get_attribute('title') or ''
+            print(f"[OK] Icono de carrito encontrado con selector: {resolver.last_selector}")
+            print(f"    Elemento: <{element_tag} class='{element_class[:50]}' text='{element_text}'>")
+            
+            # Intentar hacer clic con mejor manejo
             try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                # Scroll al elemento
+                waits.scroll_into_view(element)
                 
-                for element in elements:
-                    if element.is_displayed():
-                        cart_icon_found = True
-                        element_tag = element.tag_name
-                        element_class = element.get_attribute('class') or ''
-                        element_text = element.text.strip()[:20] or element.get_attribute('aria-label') or element.get_attribute('title') or ''
-                        print(f"[OK] Icono de carrito encontrado con selector #{i+1}: {selector}")
-                        print(f"    Elemento: <{element_tag} class='{element_class[:50]}' text='{element_text}'>")
-                        
-                        # Intentar hacer clic con mejor manejo
-                        try:
-                            # Scroll al elemento
-                            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                            time.sleep(1)
-                            
-                            # Intentar clic normal primero
-                            try:
-                                WebDriverWait(driver, 5).until(EC.element_to_be_clickable(element))
-                                element.click()
-                                print(f"[OK] Clic en icono de carrito exitoso (método normal)")
-                            except:
-                                # Si falla, usar JavaScript click
-                                driver.execute_script("arguments[0].click();", element)
-                                print(f"[OK] Clic en icono de carrito exitoso (método JavaScript)")
-                            
-                            time.sleep(2)
-                        except Exception as e:
-                            print(f"[WARN] Clic en icono falló: {str(e)}")
-                        
-                        break
+                # Intentar clic normal primero
+                try:
+                    WebDriverWait(driver, 5).until(EC.element_to_be_clickable(element))
+                    element.click()
+                    print(f"[OK] Clic en icono de carrito exitoso (método normal)")
+                except:
+                    # Si falla, usar JavaScript click
+                    driver.execute_script("arguments[0].click();", element)
+                    print(f"[OK] Clic en icono de carrito exitoso (método JavaScript)")
                 
-                if cart_icon_found:
-                    break
-                    
+                waits.dom_settled()
             except Exception as e:
-                print(f"[DEBUG] Selector #{i+1} falló: {selector} - {str(e)[:100]}")
-                continue
+                print(f"[WARN] Clic en icono falló: {str(e)}")
         
         # Si no encuentra nada, listar todos los botones y SVGs para debug
         if not cart_icon_found:
             print("[DEBUG] Listando todos los botones y SVGs en la página...")
             try:
-                all_buttons = driver.find_elements(By.TAG_NAME, "button")
-                all_svgs = driver.find_elements(By.TAG_NAME, "svg")
-                print(f"[DEBUG] Encontrados {len(all_buttons)} botones y {len(all_svgs)} SVGs")
+                totals = count(driver, ["button", "svg"])
+                print(f"[DEBUG] Encontrados {totals.get('button', 0)} botones y {totals.get('svg', 0)} SVGs")
                 
-                for i, btn in enumerate(all_buttons[:10]):  # Solo los primeros 10
-                    if btn.is_displayed():
-                        btn_class = btn.get_attribute('class') or ''
-                        btn_text = btn.text.strip()[:20] or btn.get_attribute('aria-label') or ''
+                for i, btn in enumerate(snapshot(driver, "button", limit=10)):  # Solo los primeros 10
+                    if btn['visible']:
+                        btn_class = btn['attributes'].get('class', '')
+                        btn_text = btn['text'][:20] or btn['attributes'].get('aria-label', '')
                         print(f"[DEBUG] Botón #{i+1}: class='{btn_class[:50]}' text='{btn_text}'")
             except:
                 pass
         
         if cart_icon_found:
-            results.append({
-                'test': 'Icono de carrito',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Icono de carrito encontrado y clickeable'
-            })
+            results.add_result('Icono de carrito', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               'Icono de carrito encontrado y clickeable')
         else:
-            results.append({
-                'test': 'Icono de carrito',
-                'status': 'FAILED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'No se encontró icono de carrito'
-            })
+            results.add_result('Icono de carrito', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'No se encontró icono de carrito')
             print("[FAIL] No se encontró icono de carrito")
         
         # Resumen
@@ -304,45 +282,36 @@ def test_cart_functionality():
         print("RESUMEN DE PRUEBAS DE CARRITO")
         print("="*50)
         
-        passed = len([r for r in results if r['status'] == 'PASSED'])
-        failed = len([r for r in results if r['status'] == 'FAILED'])
-        total = len(results)
-        success_rate = round((passed / total) * 100) if total > 0 else 0
-        
-        print(f"Total de pruebas: {total}")
-        print(f"Exitosas: {passed}")
-        print(f"Fallidas: {failed}")
-        print(f"Tasa de éxito: {success_rate}%")
+        summary = results.close('cart_simple_results.json',
+                                summary_fields={'test_type': 'shopping_cart_simple'})
         
-        # Guardar resultados
-        final_results = {
-            'summary': {
-                'total_tests': total,
-                'passed': passed,
-                'failed': failed,
-                'success_rate': success_rate,
-                'test_type': 'shopping_cart_simple'
-            },
-            'results': results,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        with open('cart_simple_results.json', 'w', encoding='utf-8') as f:
-            json.dump(final_results, f, indent=2, ensure_ascii=False)
+        print(f"Total de pruebas: {summary['total_tests']}")
+        print(f"Exitosas: {summary['passed']}")
+        print(f"Fallidas: {summary['failed']}")
+        print(f"Tasa de éxito: {summary['success_rate']}%")
         
         print(f"\nResultados guardados en: cart_simple_results.json")
         print("="*50)
         
-        return success_rate > 0
+        return summary['success_rate'] > 0
         
     except Exception as e:
         print(f"[ERROR] Durante las pruebas: {str(e)}")
         return False
     
     finally:
-        if driver:
+        if driver and owns_driver:
             driver.quit()
 
+def run_suite(driver=None):
+    """Punto de entrada común usado por run_parallel.py"""
+    results = ResultsSink(SUITE)
+    test_cart_functionality(driver, results)
+    return {
+        'suite': SUITE,
+        'results': results.results
+    }
+
 if __name__ == "__main__":
     try:
         success = test_cart_functionality()
@@ -11,18 +11,37 @@ import json
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.keys import Keys
 from config import Config
+from waits import Waits, pause
+from session_bootstrap import bootstrap_session
+from selector_resolver import SelectorResolver
+from dom_snapshot import snapshot, count
+from order_confirmation import capture_page_state, detect_order_confirmation
+from results_sink import ResultsSink
+import idle_time
+from screenshot_writer import capture_screenshot
+from page_metrics import navigate_with_metrics, format_metrics
+from driver_resolver import chrome_binary, chromedriver_path
+from network_cache import attach_interceptor
+from console_collector import attach_console_collector, stepped
+from tracing import traced
+
+# Nombre de la suite en los resultados (results_sink.py, sharding.py)
+SUITE = 'complete_order_flow'
 
 def setup_driver():
     """Configurar Chrome WebDriver con pantalla completa"""
+    idle_time.install()
     try:
         chrome_options = Options()
-        chrome_options.binary_location = Config.CHROME_BINARY_PATH
+        if chrome_binary():
+            chrome_options.binary_location = chrome_binary()
         
         # Opciones para test optimizado
         chrome_options.add_argument('--no-sandbox')
@@ -36,8 +55,11 @@ def setup_driver():
         chrome_options.add_argument('--disable-web-security')
         chrome_options.add_argument('--allow-running-insecure-content')
         
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
         driver.implicitly_wait(10)
+        driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+        attach_interceptor(driver)
+        attach_console_collector(driver)
         driver.maximize_window()
         
         return driver
@@ -45,6 +67,8 @@ def setup_driver():
         print(f"[ERROR] Setup driver: {str(e)}")
         return None
 
+@traced("step")
+@stepped()
 def perform_login(driver, email="demo@example.com", password="123456"):
     """Realizar login en la aplicación"""
     try:
@@ -67,33 +91,25 @@ def perform_login(driver, email="demo@example.com", password="123456"):
         ]
         
         wait = WebDriverWait(driver, 10)
-        login_button = None
+        waits = Waits(driver)
+        resolver = SelectorResolver(driver)
         
-        for selector in login_selectors:
-            try:
-                if selector.startswith("//"):
-                    login_button = wait.until(EC.element_to_be_clickable((By.XPATH, selector)))
-                else:
-                    login_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                print(f"[OK] Botón de login encontrado: {selector}")
-                break
-            except TimeoutException:
-                continue
+        # Todos los candidatos se evalúan juntos en cada sondeo (un round-trip)
+        login_button = resolver.find("login-button", login_selectors, timeout=10)
+        if login_button:
+            print(f"[OK] Botón de login encontrado: {resolver.last_selector}")
         
         if not login_button:
             print("[WARN] No se encontró botón de login, intentando acceso directo a /login")
             driver.get(f"{Config.BASE_URL}/login")
-            time.sleep(2)
         else:
             # Hacer click en el botón de login
             try:
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", login_button)
-                time.sleep(1)
+                waits.scroll_into_view(login_button)
                 login_button.click()
-                time.sleep(2)
             except:
                 driver.execute_script("arguments[0].click();", login_button)
-                time.sleep(2)
+            waits.route_contains("/login")
         
         # Buscar campos de email y password
         email_selectors = [
@@ -113,27 +129,15 @@ def perform_login(driver, email="demo@example.com", password="123456"):
         ]
         
         # Llenar email
-        email_field = None
-        for selector in email_selectors:
-            try:
-                email_field = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                print(f"[OK] Campo email encontrado: {selector}")
-                break
-            except:
-                continue
-        
+        email_field = resolver.find("email-field", email_selectors, timeout=10)
         if not email_field:
             raise Exception("No se pudo encontrar el campo de email")
+        print(f"[OK] Campo email encontrado: {resolver.last_selector}")
         
         # Llenar password
-        password_field = None  
-        for selector in password_selectors:
-            try:
-                password_field = driver.find_element(By.CSS_SELECTOR, selector)
-                print(f"[OK] Campo password encontrado: {selector}")
-                break
-            except:
-                continue
+        password_field = resolver.find("password-field", password_selectors)
+        if password_field:
+            print(f"[OK] Campo password encontrado: {resolver.last_selector}")
         
         if not password_field:
             raise Exception("No se pudo encontrar el campo de password")
@@ -141,11 +145,11 @@ def perform_login(driver, email="demo@example.com", password="123456"):
         # Llenar los campos
         email_field.clear()
         email_field.send_keys(email)
-        time.sleep(0.5)
+        pause(0.5, "escritura de email")
         
         password_field.clear()
         password_field.send_keys(password)
-        time.sleep(0.5)
+        pause(0.5, "escritura de password")
         
         # Buscar botón de submit con debugging detallado
         submit_selectors = [
@@ -163,44 +167,23 @@ def perform_login(driver, email="demo@example.com", password="123456"):
             "form button[type='submit']"
         ]
         
-        submit_button = None
+        login_mark = waits.network_mark()
         print("[DEBUG] Buscando botón de submit...")
         
-        for i, selector in enumerate(submit_selectors):
-            try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        submit_button = element
-                        btn_text = element.text.strip()
-                        btn_class = element.get_attribute('class')
-                        btn_data_slot = element.get_attribute('data-slot')
-                        print(f"[OK] Botón submit encontrado con selector #{i+1}: {selector}")
-                        print(f"    Texto: '{btn_text}'")
-                        print(f"    data-slot: '{btn_data_slot}'")
-                        print(f"    class: '{btn_class[:100]}...'")
-                        break
-                
-                if submit_button:
-                    break
-            except Exception as e:
-                print(f"[DEBUG] Selector #{i+1} falló: {str(e)[:50]}")
-                continue
+        submit_button = resolver.find("login-submit", submit_selectors)
+        if submit_button:
+            print(f"[OK] Botón submit encontrado con selector: {resolver.last_selector}")
         
         if not submit_button:
             print("[DEBUG] No se encontró botón submit, listando todos los botones...")
             try:
-                all_buttons = driver.find_elements(By.TAG_NAME, "button")
+                all_buttons = snapshot(driver, "button")
                 print(f"[DEBUG] Encontrados {len(all_buttons)} botones en total")
                 for i, btn in enumerate(all_buttons[:10]):
-                    if btn.is_displayed():
-                        btn_text = btn.text.strip()[:30]
-                        btn_class = btn.get_attribute('class')[:80] or ''
-                        btn_data_slot = btn.get_attribute('data-slot') or ''
+                    if btn['visible']:
+                        btn_text = btn['text'][:30]
+                        btn_class = btn['attributes'].get('class', '')[:80]
+                        btn_data_slot = btn['attributes'].get('data-slot', '')
                         print(f"[DEBUG] Botón #{i+1}: text='{btn_text}' data-slot='{btn_data_slot}' class='{btn_class}...'")
             except:
                 pass
@@ -214,8 +197,7 @@ def perform_login(driver, email="demo@example.com", password="123456"):
                 print("[INFO] Intentando click en botón submit...")
                 
                 # Estrategia 1: Scroll y click normal
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", submit_button)
-                time.sleep(1)
+                waits.scroll_into_view(submit_button)
                 
                 # Verificar que sigue siendo clickeable
                 wait.until(EC.element_to_be_clickable(submit_button))
@@ -254,8 +236,9 @@ def perform_login(driver, email="demo@example.com", password="123456"):
             except Exception as e:
                 print(f"[ERROR] Error general en submit: {str(e)[:100]}")
         
-        # Esperar redirección o confirmación de login
-        time.sleep(3)
+        # Esperar la respuesta de /api/auth/login y la redirección fuera de /login
+        waits.response("/auth/login", since=login_mark)
+        waits.route_excludes("login", timeout=3)
         
         # Verificar si el login fue exitoso
         current_url = driver.current_url
@@ -272,16 +255,10 @@ def perform_login(driver, email="demo@example.com", password="123456"):
                 ".user-avatar"
             ]
             
-            for indicator in success_indicators:
-                try:
-                    if indicator.startswith("//"):
-                        driver.find_element(By.XPATH, indicator)
-                    else:
-                        driver.find_element(By.CSS_SELECTOR, indicator)
-                    print("[OK] Login exitoso - Indicador de usuario logueado encontrado")
-                    return True
-                except:
-                    continue
+            if SelectorResolver(driver).find("logged-in-indicator", success_indicators,
+                                             visible=False, enabled=False):
+                print("[OK] Login exitoso - Indicador de usuario logueado encontrado")
+                return True
             
             print("[WARN] Login incierto - No se detectó redirección ni indicadores claros")
             return False
@@ -290,6 +267,8 @@ def perform_login(driver, email="demo@example.com", password="123456"):
         print(f"[ERROR] Durante login: {str(e)}")
         return False
 
+@traced("step")
+@stepped()
 def add_product_to_cart(driver):
     """Agregar producto al carrito"""
     try:
@@ -298,13 +277,13 @@ def add_product_to_cart(driver):
         # Ir a la página principal si no estamos ahí
         if "localhost" not in driver.current_url or driver.current_url.endswith("/cart"):
             driver.get(Config.BASE_URL)
-            time.sleep(2)
         
         wait = WebDriverWait(driver, 15)
+        waits = Waits(driver, 15)
         
-        # Esperar que la página cargue completamente
-        wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
-        time.sleep(2)
+        # Esperar que la página cargue y que React termine de renderizar los productos
+        waits.document_ready()
+        waits.dom_settled()
         
         # Buscar botones de "Agregar al carrito"
         cart_button_selectors = [
@@ -326,41 +305,32 @@ def add_product_to_cart(driver):
         ]
         
         product_added = False
-        for selector in cart_button_selectors:
+        resolver = SelectorResolver(driver)
+        # Todos los candidatos en orden de prioridad: si uno falla se prueba el siguiente
+        for selector, element in resolver.find_all("add-to-cart", cart_button_selectors, timeout=5):
             try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                # Scroll al elemento
+                waits.scroll_into_view(element)
+                cart_mark = waits.network_mark()
                 
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        try:
-                            # Scroll al elemento
-                            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                            time.sleep(1)
-                            
-                            # Intentar click
-                            try:
-                                wait.until(EC.element_to_be_clickable(element))
-                                element.click()
-                                print(f"[OK] Producto agregado al carrito (método normal)")
-                            except:
-                                driver.execute_script("arguments[0].click();", element)
-                                print(f"[OK] Producto agregado al carrito (método JavaScript)")
-                            
-                            product_added = True
-                            time.sleep(2)  # Esperar respuesta
-                            break
-                            
-                        except Exception as e:
-                            print(f"[WARN] Error agregando producto: {str(e)[:100]}")
-                            continue
+                # Intentar click
+                try:
+                    wait.until(EC.element_to_be_clickable(element))
+                    element.click()
+                    print(f"[OK] Producto agregado al carrito (método normal)")
+                except:
+                    driver.execute_script("arguments[0].click();", element)
+                    print(f"[OK] Producto agregado al carrito (método JavaScript)")
                 
-                if product_added:
-                    break
-                    
-            except:
+                product_added = True
+                resolver.remember("add-to-cart", selector)
+                # Esperar la respuesta del carrito (o al menos que la UI se estabilice)
+                if not waits.response("/cart", since=cart_mark, timeout=5):
+                    waits.dom_settled()
+                break
+                
+            except Exception as e:
+                print(f"[WARN] Error agregando producto: {str(e)[:100]}")
                 continue
         
         if not product_added:
@@ -374,6 +344,8 @@ def add_product_to_cart(driver):
         print(f"[ERROR] Agregando producto al carrito: {str(e)}")
         return False
 
+@traced("step")
+@stepped()
 def go_to_cart_and_checkout(driver):
     """Ir al carrito y proceder al checkout"""
     try:
@@ -382,9 +354,10 @@ def go_to_cart_and_checkout(driver):
         # Intentar ir al carrito
         cart_url = f"{Config.BASE_URL}/cart"
         driver.get(cart_url)
-        time.sleep(3)
         
         wait = WebDriverWait(driver, 15)
+        waits = Waits(driver, 15)
+        waits.dom_settled()
         
         # Verificar que hay productos en el carrito
         cart_item_selectors = [
@@ -395,16 +368,14 @@ def go_to_cart_and_checkout(driver):
             ".checkout-item"
         ]
         
+        # Conteo de todos los selectores en un round-trip (sin esperas implícitas por fallo)
         items_found = False
+        item_counts = count(driver, cart_item_selectors)
         for selector in cart_item_selectors:
-            try:
-                items = driver.find_elements(By.CSS_SELECTOR, selector)
-                if items:
-                    print(f"[OK] {len(items)} productos encontrados en el carrito")
-                    items_found = True
-                    break
-            except:
-                continue
+            if item_counts.get(selector):
+                print(f"[OK] {item_counts[selector]} productos encontrados en el carrito")
+                items_found = True
+                break
         
         if not items_found:
             print("[WARN] No se detectaron productos en el carrito")
@@ -436,14 +407,14 @@ def go_to_cart_and_checkout(driver):
         
         # Primero hacer análisis de todos los botones disponibles
         try:
-            all_buttons = driver.find_elements(By.TAG_NAME, "button")
+            all_buttons = snapshot(driver, "button")
             print(f"[DEBUG] Encontrados {len(all_buttons)} botones en la página de carrito")
             
             checkout_candidates = []
             for i, btn in enumerate(all_buttons):
-                if btn.is_displayed() and btn.is_enabled():
-                    btn_text = btn.text.strip()
-                    btn_class = btn.get_attribute('class') or ''
+                if btn['visible'] and btn['enabled']:
+                    btn_text = btn['text']
+                    btn_class = btn['attributes'].get('class', '')
                     
                     # Calcular prioridad
                     priority = 0
@@ -470,7 +441,7 @@ def go_to_cart_and_checkout(driver):
                         priority -= 10
                     
                     checkout_candidates.append({
-                        'element': btn,
+                        'element': btn['element'],
                         'text': btn_text,
                         'priority': priority,
                         'class': btn_class[:100]
@@ -486,59 +457,42 @@ def go_to_cart_and_checkout(driver):
         except Exception as e:
             print(f"[ERROR] Analizando botones de checkout: {str(e)}")
         
-        # Intentar con selectores específicos primero
-        for i, selector in enumerate(checkout_selectors):
-            if checkout_clicked:
-                break
-                
+        # Intentar con selectores específicos primero (un solo round-trip por sondeo)
+        resolver = SelectorResolver(driver)
+        matches = resolver.find_all("checkout-button", checkout_selectors, timeout=5,
+                                    exclude=['buscar', 'agregar', 'productos', 'ver detalles', 'volver'])
+        for selector, element in matches:
             try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                # Scroll al elemento
+                waits.scroll_into_view(element)
+                checkout_url = driver.current_url
+                
+                print(f"[INFO] Intentando checkout con selector: {selector}")
+                
+                # Click con múltiples estrategias
+                try:
+                    wait.until(EC.element_to_be_clickable(element))
+                    element.click()
+                    print(f"[OK] Click exitoso en checkout (método normal)")
+                    checkout_clicked = True
+                except Exception as click_error:
+                    print(f"[WARN] Click normal falló: {str(click_error)[:50]}")
+                    try:
+                        driver.execute_script("arguments[0].click();", element)
+                        print(f"[OK] Click exitoso en checkout (método JavaScript)")
+                        checkout_clicked = True
+                    except Exception as js_error:
+                        print(f"[ERROR] JavaScript click falló: {str(js_error)[:50]}")
+                
+                if checkout_clicked:
+                    resolver.remember("checkout-button", selector)
+                    # Esperar navegación o re-render del carrito
+                    if not waits.route_change(checkout_url, timeout=3):
+                        waits.dom_settled()
+                    break
                 
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        element_text = element.text.strip()
-                        
-                        # Verificar que sea realmente un botón de checkout
-                        text_lower = element_text.lower()
-                        if any(avoid in text_lower for avoid in ['buscar', 'agregar', 'productos', 'ver detalles', 'volver']):
-                            print(f"[SKIP] Evitando botón: '{element_text}'")
-                            continue
-                        
-                        try:
-                            # Scroll al elemento
-                            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                            time.sleep(1)
-                            
-                            print(f"[INFO] Intentando checkout con selector #{i+1}: '{element_text}'")
-                            print(f"      Clase: {element.get_attribute('class')[:100]}...")
-                            
-                            # Click con múltiples estrategias
-                            try:
-                                wait.until(EC.element_to_be_clickable(element))
-                                element.click()
-                                print(f"[OK] Click exitoso en checkout (método normal)")
-                            except Exception as click_error:
-                                print(f"[WARN] Click normal falló: {str(click_error)[:50]}")
-                                try:
-                                    driver.execute_script("arguments[0].click();", element)
-                                    print(f"[OK] Click exitoso en checkout (método JavaScript)")
-                                except Exception as js_error:
-                                    print(f"[ERROR] JavaScript click falló: {str(js_error)[:50]}")
-                                    continue
-                            
-                            checkout_clicked = True
-                            time.sleep(3)  # Esperar navegación
-                            break
-                            
-                        except Exception as e:
-                            print(f"[WARN] Error en checkout click: {str(e)[:100]}")
-                            continue
-                        
             except Exception as e:
-                print(f"[DEBUG] Selector #{i+1} falló: {str(e)[:50]}")
+                print(f"[WARN] Error en checkout click: {str(e)[:100]}")
                 continue
         
         # Si los selectores no funcionaron, intentar con candidatos de alta prioridad
@@ -555,8 +509,8 @@ def go_to_cart_and_checkout(driver):
                         if any(avoid in text_lower for avoid in ['buscar', 'agregar', 'productos']):
                             continue
                         
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                        time.sleep(1)
+                        waits.scroll_into_view(element)
+                        checkout_url = driver.current_url
                         
                         print(f"[INFO] Intentando con candidato prioridad {candidate['priority']}: '{element_text}'")
                         
@@ -569,7 +523,8 @@ def go_to_cart_and_checkout(driver):
                             print(f"[OK] Checkout exitoso con candidato priorizado (JavaScript)")
                         
                         checkout_clicked = True
-                        time.sleep(3)
+                        if not waits.route_change(checkout_url, timeout=3):
+                            waits.dom_settled()
                         break
                         
                     except Exception as e:
@@ -589,22 +544,25 @@ def go_to_cart_and_checkout(driver):
         print(f"[ERROR] Durante checkout: {str(e)}")
         return False
 
+@traced("step")
+@stepped()
 def complete_order(driver):
     """Completar el proceso de pedido"""
     try:
         print("[ORDER] Completando pedido...")
         
         wait = WebDriverWait(driver, 15)
-        time.sleep(2)
+        waits = Waits(driver, 15)
+        waits.dom_settled()
         
         # Buscar botón de confirmar pedido/completar compra con lógica inteligente
         print("[DEBUG] Analizando página para encontrar botón de completar pedido...")
         
-        # Primero, detectar en qué tipo de página estamos
-        current_url = driver.current_url.lower()
-        page_content = driver.page_source.lower()
+        # Primero, detectar en qué tipo de página estamos (texto visible, sin page_source)
+        page_state = capture_page_state(driver)
+        page_content = page_state['text'].lower()
         
-        print(f"[DEBUG] URL actual: {driver.current_url}")
+        print(f"[DEBUG] URL actual: {page_state['url']}")
         print(f"[DEBUG] Contenido detectado: {'checkout' in page_content}, {'cart' in page_content}, {'order' in page_content}")
         
         # Selectores específicos por prioridad y contexto
@@ -644,15 +602,15 @@ def complete_order(driver):
         
         # Primero analizar todos los botones disponibles
         try:
-            all_buttons = driver.find_elements(By.TAG_NAME, "button")
+            all_buttons = snapshot(driver, "button")
             print(f"[DEBUG] Analizando {len(all_buttons)} botones en la página...")
             
             for i, btn in enumerate(all_buttons):
-                if btn.is_displayed() and btn.is_enabled():
-                    btn_text = btn.text.strip()
-                    btn_class = btn.get_attribute('class') or ''
-                    btn_data_slot = btn.get_attribute('data-slot') or ''
-                    btn_type = btn.get_attribute('type') or ''
+                if btn['visible'] and btn['enabled']:
+                    btn_text = btn['text']
+                    btn_class = btn['attributes'].get('class', '')
+                    btn_data_slot = btn['attributes'].get('data-slot', '')
+                    btn_type = btn['attributes'].get('type', '')
                     
                     # Calcular prioridad del botón
                     priority = 0
@@ -673,7 +631,7 @@ def complete_order(driver):
                         priority -= 20
                     
                     buttons_analyzed.append({
-                        'element': btn,
+                        'element': btn['element'],
                         'text': btn_text,
                         'class': btn_class[:50],
                         'priority': priority,
@@ -690,52 +648,32 @@ def complete_order(driver):
         except Exception as e:
             print(f"[ERROR] Analizando botones: {str(e)[:100]}")
         
-        # Intentar con los selectores específicos primero
-        for i, selector in enumerate(order_complete_selectors):
-            if order_completed:
-                break
-                
+        # Intentar con los selectores específicos primero (un solo round-trip por sondeo)
+        resolver = SelectorResolver(driver)
+        matches = resolver.find_all("order-complete-button", order_complete_selectors, timeout=5,
+                                    exclude=avoid_texts)
+        for selector, element in matches:
             try:
-                if selector.startswith("//"):
-                    elements = driver.find_elements(By.XPATH, selector)
-                else:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                # Scroll al elemento
+                waits.scroll_into_view(element)
+                
+                print(f"[INFO] Intentando completar pedido con selector: {selector}")
+                
+                # Click
+                try:
+                    wait.until(EC.element_to_be_clickable(element))
+                    element.click()
+                    print(f"[OK] Pedido enviado (método normal)")
+                except:
+                    driver.execute_script("arguments[0].click();", element)
+                    print(f"[OK] Pedido enviado (método JavaScript)")
+                
+                order_completed = True
+                resolver.remember("order-complete-button", selector)
+                break
                 
-                for element in elements:
-                    if element.is_displayed() and element.is_enabled():
-                        element_text = element.text.strip().lower()
-                        
-                        # Verificar que no sea un botón a evitar
-                        if any(avoid in element_text for avoid in avoid_texts):
-                            print(f"[SKIP] Evitando botón: '{element.text.strip()}'")
-                            continue
-                        
-                        try:
-                            # Scroll al elemento
-                            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                            time.sleep(1)
-                            
-                            print(f"[INFO] Intentando completar pedido con selector #{i+1}: '{element.text.strip()}'")
-                            
-                            # Click
-                            try:
-                                wait.until(EC.element_to_be_clickable(element))
-                                element.click()
-                                print(f"[OK] Pedido enviado (método normal)")
-                            except:
-                                driver.execute_script("arguments[0].click();", element)
-                                print(f"[OK] Pedido enviado (método JavaScript)")
-                            
-                            order_completed = True
-                            time.sleep(3)  # Esperar confirmación
-                            break
-                            
-                        except Exception as e:
-                            print(f"[WARN] Error completando pedido: {str(e)[:100]}")
-                            continue
-                        
             except Exception as e:
-                print(f"[DEBUG] Selector #{i+1} falló: {str(e)[:50]}")
+                print(f"[WARN] Error completando pedido: {str(e)[:100]}")
                 continue
         
         # Si no funcionó con selectores, intentar con los botones de mayor prioridad
@@ -751,8 +689,7 @@ def complete_order(driver):
                         if any(avoid in element_text for avoid in avoid_texts):
                             continue
                         
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
-                        time.sleep(1)
+                        waits.scroll_into_view(element)
                         
                         print(f"[INFO] Intentando con botón prioridad {btn_info['priority']}: '{btn_info['text']}'")
                         
@@ -765,7 +702,6 @@ def complete_order(driver):
                             print(f"[OK] Pedido enviado con botón priorizado (JavaScript)")
                         
                         order_completed = True
-                        time.sleep(3)
                         break
                         
                     except Exception as e:
@@ -776,162 +712,26 @@ def complete_order(driver):
             print("[WARN] No se encontró botón de completar pedido")
         
         # Verificar confirmación de pedido con análisis inteligente
-        time.sleep(3)
-        current_url = driver.current_url
-        page_content = driver.page_source.lower()
-        page_title = driver.title.lower()
-        
-        print(f"[DEBUG] Verificando confirmación de pedido...")
-        print(f"[DEBUG] URL después del click: {current_url}")
-        print(f"[DEBUG] Título de página: {driver.title}")
-        
-        # Indicadores de éxito en contenido
-        success_indicators = [
-            "pedido confirmado",
-            "pedido realizado", 
-            "pedido completado",
-            "compra exitosa",
-            "compra realizada",
-            "order confirmed", 
-            "order placed",
-            "order completed",
-            "purchase successful",
-            "gracias por tu compra",
-            "thank you for your purchase",
-            "confirmación de pedido",
-            "order confirmation",
-            "éxito",
-            "success"
-        ]
-        
-        # Indicadores de éxito en URL
-        success_url_indicators = [
-            "success", "confirmation", "complete", "thank", "gracias", 
-            "pedido", "order", "checkout/success", "purchase/complete"
-        ]
-        
-        order_confirmed = False
-        confirmation_method = ""
-        
-        # 1. Verificar URL para indicadores de éxito
-        for indicator in success_url_indicators:
-            if indicator in current_url.lower():
-                print(f"[OK] Confirmación detectada en URL: '{indicator}' en {current_url}")
-                order_confirmed = True
-                confirmation_method = f"URL contains '{indicator}'"
-                break
-        
-        # 2. Verificar título de página
-        if not order_confirmed:
-            for indicator in success_indicators:
-                if indicator in page_title:
-                    print(f"[OK] Confirmación detectada en título: '{indicator}'")
-                    order_confirmed = True
-                    confirmation_method = f"Title contains '{indicator}'"
-                    break
-        
-        # 3. Verificar contenido de página
-        if not order_confirmed:
-            for indicator in success_indicators:
-                if indicator in page_content:
-                    print(f"[OK] Confirmación detectada en contenido: '{indicator}'")
-                    order_confirmed = True
-                    confirmation_method = f"Content contains '{indicator}'"
-                    break
-        
-        # 4. Buscar elementos visuales de confirmación
-        if not order_confirmed:
-            print("[DEBUG] Buscando elementos visuales de confirmación...")
-            confirmation_selectors = [
-                # Elementos específicos de éxito
-                ".success-message",
-                ".order-success", 
-                ".purchase-success",
-                ".confirmation-message",
-                "[class*='success']",
-                "[class*='confirm']",
-                "[class*='complete']",
-                # Alertas y notificaciones
-                ".alert-success",
-                ".notification-success",
-                "[role='alert']",
-                # Elementos genéricos
-                ".success",
-                ".confirmation",
-                "#success",
-                "#confirmation"
-            ]
-            
-            for selector in confirmation_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element_text = element.text.strip().lower()
-                            if any(word in element_text for word in ['éxito', 'success', 'confirmado', 'confirmed', 'realizado', 'completed']):
-                                print(f"[OK] Elemento de confirmación encontrado: {selector} - '{element.text.strip()[:50]}'")
-                                order_confirmed = True
-                                confirmation_method = f"Element {selector}"
-                                break
-                    if order_confirmed:
-                        break
-                except:
-                    continue
+        # (esperar a que la página de confirmación termine de renderizar)
+        waits.dom_settled()
+        verdict = detect_order_confirmation(driver)
+        order_confirmed = verdict['confirmed']
         
-        # 5. Análisis heurístico de la página
-        if not order_confirmed:
-            print("[DEBUG] Realizando análisis heurístico...")
-            
-            # Verificar si cambió la URL significativamente (indica progreso)
-            url_changed_significantly = False
-            if 'checkout' in current_url or 'order' in current_url or 'purchase' in current_url:
-                url_changed_significantly = True
-            
-            # Buscar indicadores visuales positivos
-            positive_elements = driver.find_elements(By.XPATH, "//*[contains(@class, 'success') or contains(@class, 'confirm') or contains(@class, 'complete')]")
-            
-            # Buscar iconos de check o éxito
-            success_icons = driver.find_elements(By.XPATH, "//svg[contains(@class, 'check') or contains(@class, 'success')] | //*[contains(@class, 'fa-check')] | //*[contains(@class, 'icon-success')]")
-            
-            if url_changed_significantly or positive_elements or success_icons:
-                print(f"[INFO] Indicadores heurísticos de éxito:")
-                print(f"  - URL cambió significativamente: {url_changed_significantly}")
-                print(f"  - Elementos positivos: {len(positive_elements)}")
-                print(f"  - Iconos de éxito: {len(success_icons)}")
-                
-                # Considerar como parcialmente exitoso
-                order_confirmed = True
-                confirmation_method = "Heuristic analysis"
-        
-        # 6. Si nada funcionó, analizar si al menos no hay errores
-        if not order_confirmed:
-            error_indicators = [
-                'error', 'fallo', 'failed', 'problema', 'incorrecto', 
-                'invalid', 'inválido', 'no válido'
-            ]
-            
-            has_errors = any(error in page_content for error in error_indicators)
-            
-            if not has_errors:
-                print("[INFO] No se detectaron errores explícitos, asumiendo progreso parcial")
-                order_confirmed = True
-                confirmation_method = "No errors detected"
-            else:
-                print(f"[WARN] Posibles errores detectados en la página")
+        print(f"[DEBUG] Verificando confirmación de pedido ({verdict['elapsed_ms']} ms)...")
+        print(f"[DEBUG] URL después del click: {verdict['url']}")
+        print(f"[DEBUG] Título de página: {verdict['title']}")
         
         # Log final del resultado
         if order_confirmed:
-            print(f"[OK] Orden confirmada - Método: {confirmation_method}")
+            print(f"[OK] Orden confirmada - Método: {verdict['method']}")
+            if verdict['method'] == "Heuristic analysis":
+                heuristics = verdict['heuristics']
+                print(f"  - URL cambió significativamente: {heuristics['url_progress']}")
+                print(f"  - Elementos positivos: {heuristics['positive_elements']}")
+                print(f"  - Iconos de éxito: {heuristics['success_icons']}")
         else:
             print(f"[WARN] No se pudo confirmar el pedido definitivamente")
-            
-            # Debug adicional
-            print("[DEBUG] Primeros 200 caracteres del contenido visible:")
-            try:
-                visible_text = driver.find_element(By.TAG_NAME, "body").text[:200]
-                print(f"  {visible_text}")
-            except:
-                pass
+            print(f"[WARN] Posibles errores detectados en la página: {verdict['evidence']['errors']}")
         
         return order_confirmed
         
@@ -939,10 +739,13 @@ def complete_order(driver):
         print(f"[ERROR] Completando pedido: {str(e)}")
         return False
 
-def test_complete_order_flow():
-    """Test principal del flujo completo de pedido"""
-    results = []
-    driver = setup_driver()
+@traced("step")
+def test_complete_order_flow(driver=None, results=None, session=None):
+    """Test principal del flujo completo de pedido (driver, sink y sesión ya inyectada opcionales)"""
+    results = ResultsSink(SUITE) if results is None else results
+    owns_driver = driver is None
+    if owns_driver:
+        driver = setup_driver()
     
     if not driver:
         return False
@@ -957,40 +760,42 @@ def test_complete_order_flow():
         # Test 1: Cargar página principal
         print("\n[1/6] Cargando página principal...")
         start = time.time()
-        driver.get(Config.BASE_URL)
+        metrics = navigate_with_metrics(driver, Config.BASE_URL)
         
         wait = WebDriverWait(driver, 15)
         wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
         
         title = driver.title
-        print(f"[OK] Página cargada: {title}")
-        results.append({
-            'test': 'Carga de página',
-            'status': 'PASSED',
-            'duration_ms': round((time.time() - start) * 1000),
-            'details': f"Título: {title}"
-        })
+        print(f"[OK] Página cargada: {title} ({format_metrics(metrics)})")
+        results.add_result('Carga de página', 'PASSED',
+                           round((time.time() - start) * 1000),
+                           f"Título: {title}",
+                           page_metrics=metrics)
         
         # Test 2: Login
         print("\n[2/6] Realizando login...")
         start = time.time()
-        login_success = perform_login(driver)
+        login_method = 'API'
+        if session is not None:
+            # Sesión inyectada antes de arrancar (fixture authenticated_user de pytest)
+            login_success = True
+            login_method = 'API, sesión previa'
+        else:
+            login_success = Config.FAST_LOGIN and bootstrap_session(driver)
+        if not login_success:
+            # Formulario real: por configuración o si la API no respondió
+            login_method = 'formulario'
+            login_success = perform_login(driver)
         
         if login_success:
-            results.append({
-                'test': 'Login usuario',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Login exitoso con demo@example.com'
-            })
+            results.add_result('Login usuario', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               f'Login exitoso con demo@example.com (vía {login_method})')
         else:
-            results.append({
-                'test': 'Login usuario',
-                'status': 'FAILED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Login falló'
-            })
+            results.add_result('Login usuario', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'Login falló')
             print("[FAIL] Login falló")
         
         # Test 3: Agregar producto al carrito
@@ -999,19 +804,13 @@ def test_complete_order_flow():
         add_success = add_product_to_cart(driver)
         
         if add_success:
-            results.append({
-                'test': 'Agregar al carrito',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Producto agregado exitosamente'
-            })
+            results.add_result('Agregar al carrito', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               'Producto agregado exitosamente')
         else:
-            results.append({
-                'test': 'Agregar al carrito', 
-                'status': 'FAILED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'No se pudo agregar producto'
-            })
+            results.add_result('Agregar al carrito', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'No se pudo agregar producto')
             print("[FAIL] No se pudo agregar producto al carrito")
         
         # Test 4: Ir al carrito
@@ -1020,19 +819,13 @@ def test_complete_order_flow():
         cart_success = go_to_cart_and_checkout(driver)
         
         if cart_success:
-            results.append({
-                'test': 'Navegación a carrito',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Carrito accesible y checkout iniciado'
-            })
+            results.add_result('Navegación a carrito', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               'Carrito accesible y checkout iniciado')
         else:
-            results.append({
-                'test': 'Navegación a carrito',
-                'status': 'FAILED', 
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Error accediendo al carrito'
-            })
+            results.add_result('Navegación a carrito', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'Error accediendo al carrito')
             print("[FAIL] Error accediendo al carrito")
         
         # Test 5: Completar pedido
@@ -1041,19 +834,13 @@ def test_complete_order_flow():
         order_success = complete_order(driver)
         
         if order_success:
-            results.append({
-                'test': 'Completar pedido',
-                'status': 'PASSED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Pedido completado y confirmado'
-            })
+            results.add_result('Completar pedido', 'PASSED',
+                               round((time.time() - start) * 1000),
+                               'Pedido completado y confirmado')
         else:
-            results.append({
-                'test': 'Completar pedido',
-                'status': 'FAILED',
-                'duration_ms': round((time.time() - start) * 1000),
-                'details': 'Pedido no se completó correctamente'
-            })
+            results.add_result('Completar pedido', 'FAILED',
+                               round((time.time() - start) * 1000),
+                               'Pedido no se completó correctamente')
             print("[FAIL] Pedido no se completó correctamente")
         
         # Test 6: Verificación final
@@ -1068,33 +855,27 @@ def test_complete_order_flow():
         
         # Tomar screenshot final
         try:
-            screenshot_path = f"final_state_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            driver.save_screenshot(screenshot_path)
+            screenshot_path = capture_screenshot(driver, "final_state")
             print(f"[INFO] Screenshot guardado: {screenshot_path}")
         except:
             pass
         
-        results.append({
-            'test': 'Verificación final',
-            'status': 'PASSED',
-            'duration_ms': round((time.time() - start) * 1000),
-            'details': f'URL: {current_url}, Título: {final_title}'
-        })
+        results.add_result('Verificación final', 'PASSED',
+                           round((time.time() - start) * 1000),
+                           f'URL: {current_url}, Título: {final_title}')
         
         # Resumen final
         print("\n" + "="*60)
         print("RESUMEN DE FLUJO COMPLETO DE PEDIDO")
         print("="*60)
         
-        passed = len([r for r in results if r['status'] == 'PASSED'])
-        failed = len([r for r in results if r['status'] == 'FAILED'])
-        total = len(results)
-        success_rate = round((passed / total) * 100) if total > 0 else 0
+        summary = results.get_summary()
+        passed = summary['passed']
         
-        print(f"Total de pruebas: {total}")
+        print(f"Total de pruebas: {summary['total_tests']}")
         print(f"Exitosas: {passed}")
-        print(f"Fallidas: {failed}")
-        print(f"Tasa de éxito: {success_rate}%")
+        print(f"Fallidas: {summary['failed']}")
+        print(f"Tasa de éxito: {summary['success_rate']}%")
         
         # Estado del flujo
         if passed >= 5:  # Al menos 5 de 6 pasos exitosos
@@ -1107,40 +888,36 @@ def test_complete_order_flow():
             print("\n[FAILED] Flujo de pedido falló")
             flow_status = "FAILED"
         
-        # Guardar resultados
-        final_results = {
-            'summary': {
-                'total_tests': total,
-                'passed': passed,
-                'failed': failed,
-                'success_rate': success_rate,
-                'flow_status': flow_status,
-                'test_type': 'complete_order_flow'
-            },
-            'results': results,
-            'final_url': current_url,
-            'final_title': final_title,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        with open('complete_order_flow_results.json', 'w', encoding='utf-8') as f:
-            json.dump(final_results, f, indent=2, ensure_ascii=False)
+        # Cerrar el run y escribir el resumen clásico desde el JSONL
+        summary = results.close('complete_order_flow_results.json',
+                                summary_fields={'flow_status': flow_status,
+                                                'test_type': 'complete_order_flow'},
+                                final_url=current_url,
+                                final_title=final_title)
         
         print(f"\nResultados guardados en: complete_order_flow_results.json")
         print("="*60)
         
-        return success_rate > 50
+        return summary['success_rate'] > 50
         
     except Exception as e:
         print(f"[ERROR] Durante las pruebas: {str(e)}")
         return False
     
     finally:
-        if driver:
-            print("\n[INFO] Cerrando navegador en 5 segundos...")
-            time.sleep(5)  # Tiempo para ver el resultado final
+        if driver and owns_driver:
+            pause(5, "tiempo para ver el resultado final")
             driver.quit()
 
+def run_suite(driver=None):
+    """Punto de entrada común usado por run_parallel.py"""
+    results = ResultsSink(SUITE)
+    test_complete_order_flow(driver, results)
+    return {
+        'suite': SUITE,
+        'results': results.results
+    }
+
 if __name__ == "__main__":
     try:
         success = test_complete_order_flow()
@@ -10,6 +10,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from base_test import BaseTest
 from config import Config
+from results_sink import ResultsSink
+from dom_snapshot import probe_present
+
+# Nombre de la suite en los resultados (results_sink.py, sharding.py)
+SUITE = 'login'
 
 class TestLogin(BaseTest):
     def __init__(self):
@@ -21,14 +26,17 @@ class TestLogin(BaseTest):
             "screenshots": []
         }
     
-    def run_test(self):
-        """Ejecutar el test completo"""
+    def run_test(self, driver=None):
+        """Ejecutar el test completo (driver opcional para reutilizar uno existente)"""
         print("Iniciando TC-002: Login de Usuario Válido")
         print("="*50)
         
+        owns_driver = driver is None
         try:
             # Setup
-            if not self.setup_driver():
+            if driver is not None:
+                self.use_driver(driver)
+            elif not self.setup_driver():
                 self.test_results["status"] = "FAILED"
                 self.test_results["details"].append("Error configurando WebDriver")
                 return self.test_results
@@ -49,7 +57,8 @@ class TestLogin(BaseTest):
         
         finally:
             # Cleanup
-            self.teardown_driver()
+            if owns_driver:
+                self.teardown_driver()
             
         # Mostrar resultados
         self._print_results()
@@ -64,7 +73,7 @@ class TestLogin(BaseTest):
             self.test_results["details"].append("❌ Fallo navegando a /login")
             return False
         
-        time.sleep(2)
+        self.waits.document_ready()
         screenshot = self.take_screenshot("step1_login_page")
         if screenshot:
             self.test_results["screenshots"].append(screenshot)
@@ -108,8 +117,8 @@ class TestLogin(BaseTest):
         submit_button.click()
         self.test_results["details"].append("✅ Botón de login clickeado")
         
-        # Esperar redirección
-        time.sleep(3)
+        # Esperar redirección fuera de /login
+        self.waits.route_excludes("/login")
         
         # Paso 5: Verificar redirección exitosa
         print("📝 Paso 5: Verificando redirección")
@@ -136,18 +145,14 @@ class TestLogin(BaseTest):
             ".dropdown-toggle"
         ]
         
-        user_element = None
-        for selector in user_indicators:
-            user_element = self.find_element_safe(By.CSS_SELECTOR, selector)
-            if user_element:
-                break
+        # Todos los indicadores en una sola consulta al DOM (los selectores inválidos se ignoran)
+        user_element = probe_present(self.driver, user_indicators, settle=1)
         
         if user_element:
             self.test_results["details"].append("✅ Indicador de usuario autenticado encontrado")
         else:
-            # Alternativa: verificar que no aparece el botón de login
-            login_button = self.find_element_safe(By.CSS_SELECTOR, "a[href='/login'], .login-link")
-            if not login_button:
+            # Alternativa: verificar que no aparece el botón de login (margen corto por si aún se está desmontando)
+            if self.is_absent(By.CSS_SELECTOR, "a[href='/login'], .login-link", settle=0.5, visible_only=True):
                 self.test_results["details"].append("✅ Botón de login ya no visible (usuario autenticado)")
             else:
                 self.test_results["details"].append("⚠️  No se encontraron indicadores claros de autenticación")
@@ -178,6 +183,23 @@ class TestLogin(BaseTest):
         
         print("="*50)
 
+def run_suite(driver=None):
+    """Punto de entrada común usado por run_parallel.py"""
+    start_time = time.time()
+    sink = ResultsSink(SUITE)
+    test = TestLogin()
+    results = test.run_test(driver)
+    sink.add_result(results['test_name'], results['status'],
+                    round((time.time() - start_time) * 1000),
+                    "; ".join(results['details']),
+                    screenshots=results['screenshots'],
+                    page_metrics=test.page_metrics)
+    sink.close()
+    return {
+        'suite': SUITE,
+        'results': sink.results
+    }
+
 def main():
     """Función principal"""
     print("SELENIUM TEST - LOGIN FUNCTIONALITY")
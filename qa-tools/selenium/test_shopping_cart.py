@@ -11,51 +11,37 @@ import json
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from config import Config
+from waits import Waits
+from dom_snapshot import snapshot, first_selector_group
+from selector_resolver import SelectorResolver
+from results_sink import ResultsSink
+import idle_time
+from screenshot_writer import capture_screenshot
+from driver_resolver import chrome_binary, chromedriver_path
+from network_cache import attach_interceptor
 
-class ShoppingCartTestResults:
-    def __init__(self):
-        self.results = []
-        self.start_time = datetime.now()
-        
-    def add_result(self, test_name, status, duration, details="", screenshot_path=None):
-        self.results.append({
-            'test': test_name,
-            'status': status,
-            'duration_ms': duration,
-            'details': details,
-            'screenshot': screenshot_path,
-            'timestamp': datetime.now().isoformat()
-        })
-    
-    def get_summary(self):
-        total = len(self.results)
-        passed = len([r for r in self.results if r['status'] == 'PASSED'])
-        failed = len([r for r in self.results if r['status'] == 'FAILED'])
-        
-        return {
-            'total_tests': total,
-            'passed': passed,
-            'failed': failed,
-            'success_rate': round((passed / total * 100) if total > 0 else 0, 2),
-            'duration_seconds': round((datetime.now() - self.start_time).total_seconds(), 2)
-        }
+# Nombre de la suite en los resultados (results_sink.py, sharding.py)
+SUITE = 'shopping_cart_functionality'
 
 class ShoppingCartTests:
     def __init__(self):
         self.driver = None
-        self.results = ShoppingCartTestResults()
-        self.screenshots_dir = "screenshots"
+        self.waits = None
+        self.results = ResultsSink(SUITE)
     
     def setup_driver(self):
         """Configurar Chrome WebDriver"""
+        idle_time.install()
         try:
             chrome_options = Options()
-            chrome_options.binary_location = Config.CHROME_BINARY_PATH
+            if chrome_binary():
+                chrome_options.binary_location = chrome_binary()
             
             # Agregar opciones de Chrome
             for option in Config.CHROME_OPTIONS:
@@ -69,9 +55,12 @@ class ShoppingCartTests:
             chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
             chrome_options.add_argument('--disable-blink-features=AutomationControlled')
             
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
             self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
+            self.driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+            attach_interceptor(self.driver)
             self.driver.maximize_window()
+            self.waits = Waits(self.driver)
             
             print(f"[OK] Chrome WebDriver configurado para pruebas de carrito")
             return True
@@ -81,15 +70,9 @@ class ShoppingCartTests:
             return False
     
     def take_screenshot(self, test_name):
-        """Tomar screenshot del estado actual"""
+        """Tomar screenshot del estado actual (escritura en segundo plano)"""
         try:
-            import os
-            if not os.path.exists(self.screenshots_dir):
-                os.makedirs(self.screenshots_dir)
-            
-            filename = f"{self.screenshots_dir}/{test_name.replace(' ', '_').replace(':', '')}.png"
-            self.driver.save_screenshot(filename)
-            return filename
+            return capture_screenshot(self.driver, test_name.replace(' ', '_').replace(':', ''))
         except:
             return None
     
@@ -128,20 +111,14 @@ class ShoppingCartTests:
                 "#products-link"
             ]
             
-            products_element = None
-            for selector in products_selectors:
-                try:
-                    if selector.startswith("//"):
-                        products_element = self.driver.find_element(By.XPATH, selector)
-                    else:
-                        products_element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
+            products_element = SelectorResolver(self.driver).find("products-link", products_selectors, timeout=5)
             
             if products_element:
+                previous_url = self.driver.current_url
                 products_element.click()
-                time.sleep(2)  # Esperar navegación
+                # Esperar navegación (ruta nueva o re-render de la misma página)
+                if not self.waits.route_change(previous_url, timeout=3):
+                    self.waits.dom_settled()
                 
                 current_url = self.driver.current_url
                 duration = round((time.time() - start_time) * 1000)
@@ -195,18 +172,10 @@ class ShoppingCartTests:
                 "[class*='software']"
             ]
             
-            found_products = []
-            for selector in product_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        found_products.extend(elements)
-                        break
-                except:
-                    continue
-            
-            # Eliminar duplicados
-            unique_products = list(set(found_products))
+            # Snapshot de todos los selectores en un round-trip (ya sin duplicados);
+            # se conserva el grupo del primer selector que encontró productos
+            entries = first_selector_group(snapshot(self.driver, product_selectors))
+            unique_products = [entry['element'] for entry in entries]
             
             if unique_products:
                 duration = round((time.time() - start_time) * 1000)
@@ -259,18 +228,13 @@ class ShoppingCartTests:
                 ".//a[contains(text(), 'Agregar')]"
             ]
             
-            add_button = None
-            for selector in add_to_cart_selectors:
-                try:
-                    add_button = first_product.find_element(By.XPATH, selector)
-                    break
-                except NoSuchElementException:
-                    continue
+            # Todos los candidatos en un round-trip dentro del producto (sin la espera implícita por fallo)
+            add_button = SelectorResolver(self.driver).find("product-add-to-cart", add_to_cart_selectors,
+                                                            timeout=5, root=first_product)
             
             if add_button:
                 # Hacer scroll al elemento si es necesario
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", add_button)
-                time.sleep(1)
+                self.waits.scroll_into_view(add_button)
                 
                 # Intentar hacer clic
                 try:
@@ -279,7 +243,7 @@ class ShoppingCartTests:
                     # Si el clic normal falla, usar JavaScript
                     self.driver.execute_script("arguments[0].click();", add_button)
                 
-                time.sleep(2)  # Esperar respuesta del sistema
+                self.waits.dom_settled()  # Esperar respuesta del sistema
                 
                 # Verificar si se agregó al carrito (buscar notificación o cambio en contador)
                 success_indicators = [
@@ -292,18 +256,8 @@ class ShoppingCartTests:
                     "[class*='success']"
                 ]
                 
-                success_found = False
-                for indicator in success_indicators:
-                    try:
-                        if indicator.startswith("//"):
-                            element = self.driver.find_element(By.XPATH, indicator)
-                        else:
-                            element = self.driver.find_element(By.CSS_SELECTOR, indicator)
-                        if element.is_displayed():
-                            success_found = True
-                            break
-                    except:
-                        continue
+                success_found = SelectorResolver(self.driver).find(
+                    "add-to-cart-feedback", success_indicators, enabled=False) is not None
                 
                 duration = round((time.time() - start_time) * 1000)
                 if success_found:
@@ -352,16 +306,9 @@ class ShoppingCartTests:
                 "[title*='carrito']"
             ]
             
-            cart_icon = None
-            for selector in cart_selectors:
-                try:
-                    if selector.startswith("//"):
-                        cart_icon = self.driver.find_element(By.XPATH, selector)
-                    else:
-                        cart_icon = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
+            # Visibilidad se reporta aparte: basta con que el icono exista
+            resolver = SelectorResolver(self.driver)
+            cart_icon = resolver.find("cart-icon", cart_selectors, timeout=5, visible=False, enabled=False)
             
             if cart_icon:
                 # Verificar si el icono es visible
@@ -376,14 +323,9 @@ class ShoppingCartTests:
                 ]
                 
                 counter_text = "Sin contador visible"
-                for counter_selector in counter_selectors:
-                    try:
-                        counter = cart_icon.find_element(By.XPATH, counter_selector)
-                        if counter.is_displayed():
-                            counter_text = f"Contador: {counter.text}"
-                            break
-                    except:
-                        continue
+                counter = resolver.find("cart-counter", counter_selectors, root=cart_icon, enabled=False)
+                if counter:
+                    counter_text = f"Contador: {counter.text}"
                 
                 duration = round((time.time() - start_time) * 1000)
                 details = f"Icono visible: {is_visible}, {counter_text}"
@@ -422,15 +364,17 @@ class ShoppingCartTests:
                 return False
             
             # Hacer clic en el icono del carrito
-            self.driver.execute_script("arguments[0].scrollIntoView(true);", cart_icon)
-            time.sleep(1)
+            self.waits.scroll_into_view(cart_icon)
+            previous_url = self.driver.current_url
             
             try:
                 cart_icon.click()
             except:
                 self.driver.execute_script("arguments[0].click();", cart_icon)
             
-            time.sleep(3)  # Esperar que se abra el carrito
+            # Esperar que se abra el carrito (navegación o modal/sidebar)
+            if not self.waits.route_change(previous_url, timeout=3):
+                self.waits.dom_settled()
             
             # Verificar que se abrió algún modal, página o sidebar del carrito
             cart_opened_selectors = [
@@ -443,18 +387,8 @@ class ShoppingCartTests:
                 "//h2[contains(text(), 'Carrito')]"
             ]
             
-            cart_opened = False
-            for selector in cart_opened_selectors:
-                try:
-                    if selector.startswith("//"):
-                        element = self.driver.find_element(By.XPATH, selector)
-                    else:
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    if element.is_displayed():
-                        cart_opened = True
-                        break
-                except:
-                    continue
+            cart_opened = SelectorResolver(self.driver).find(
+                "cart-opened", cart_opened_selectors, enabled=False) is not None
             
             # También verificar cambio de URL
             current_url = self.driver.current_url
@@ -481,8 +415,8 @@ class ShoppingCartTests:
             print(f"[FAIL] {test_name}: {str(e)}")
             return False
     
-    def run_shopping_cart_tests(self):
-        """Ejecutar suite completa de pruebas de carrito"""
+    def run_shopping_cart_tests(self, driver=None):
+        """Ejecutar suite completa de pruebas de carrito (driver opcional para reutilizar uno existente)"""
         print("="*70)
         print("INICIANDO PRUEBAS DE CARRITO DE COMPRAS CON SELENIUM")
         print("Sistema: CISNET - Software Sales System")
@@ -490,7 +424,11 @@ class ShoppingCartTests:
         print(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*70)
         
-        if not self.setup_driver():
+        owns_driver = driver is None
+        if driver is not None:
+            self.driver = driver
+            self.waits = Waits(self.driver)
+        elif not self.setup_driver():
             return False
         
         try:
@@ -510,8 +448,9 @@ class ShoppingCartTests:
                 else:
                     print("[INFO] No se encontraron productos, saltando pruebas de agregar al carrito")
             
-            # Mostrar resumen
-            summary = self.results.get_summary()
+            # Mostrar resumen (los resultados ya están en el JSONL de la ejecución)
+            summary = self.results.close('shopping_cart_test_results.json',
+                                         test_type='shopping_cart_functionality')
             print("\n" + "="*70)
             print("RESUMEN DE RESULTADOS - CARRITO DE COMPRAS")
             print("="*70)
@@ -522,24 +461,24 @@ class ShoppingCartTests:
             print(f"Duración Total: {summary['duration_seconds']} segundos")
             print("="*70)
             
-            # Guardar resultados
-            with open('shopping_cart_test_results.json', 'w', encoding='utf-8') as f:
-                json.dump({
-                    'summary': summary,
-                    'results': self.results.results,
-                    'timestamp': datetime.now().isoformat(),
-                    'test_type': 'shopping_cart_functionality'
-                }, f, indent=2, ensure_ascii=False)
-            
             print(f"\nResultados guardados en: shopping_cart_test_results.json")
             
             return summary['success_rate'] > 0
             
         finally:
-            if self.driver:
+            if self.driver and owns_driver:
                 self.driver.quit()
                 print("WebDriver cerrado correctamente")
 
+def run_suite(driver=None):
+    """Punto de entrada común usado por run_parallel.py"""
+    tester = ShoppingCartTests()
+    tester.run_shopping_cart_tests(driver)
+    return {
+        'suite': SUITE,
+        'results': tester.results.results
+    }
+
 if __name__ == "__main__":
     tester = ShoppingCartTests()
     success = tester.run_shopping_cart_tests()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Trazas por spans en formato Chrome trace-event (Perfetto / chrome://tracing)
+El duration_ms de cada paso mezcla comandos WebDriver, fallbacks de selectores
+y esperas; con las trazas activas cada paso queda desglosado en spans anidados:
+
+    step       funciones del flujo (perform_login, add_product_to_cart, ...)
+    helper     métodos de BaseTest (navigate_to, wait_for_element, login, ...)
+    wait       Waits.* y la resolución de selectores (incluye el sondeo)
+    sleep      pausas fijas (waits.pause)
+    webdriver  cada comando enviado a chromedriver (findElement, executeScript, ...)
+
+Se activa con QA_TRACE_SPANS=1, Config.TRACE_SPANS, --trace-spans en pytest o
+run_parallel.py. Cada proceso escribe results/traces/trace_<run_id>_<pid>.json
+al terminar; abrirlo en https://ui.perfetto.dev. Desactivado, span() y
+@traced no registran nada.
+
+Uso:
+    QA_TRACE_SPANS=1 python test_complete_order_flow.py
+    python tracing.py results/traces/trace_*.json             # spans con más tiempo propio
+    python tracing.py results/traces/trace_*.json --merge todo.json
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import functools
+import threading
+from contextlib import contextmanager
+from config import Config
+from results_sink import current_run_id
+
+_events = []
+_lock = threading.Lock()
+_thread_names = {}
+_dropped = 0
+_enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    """Activar el registro de spans en este proceso (idempotente)"""
+    global _enabled
+    if _enabled:
+        return
+    _enabled = True
+    _instrument_webdriver()
+    atexit.register(export)
+
+
+def _instrument_webdriver():
+    """Un span por comando WebDriver, para todos los drivers del proceso"""
+    from selenium.webdriver.remote.webdriver import WebDriver
+    if getattr(WebDriver.execute, '_qa_traced', False):
+        return
+    original = WebDriver.execute
+
+    def execute(self, driver_command, params=None):
+        with span(driver_command, "webdriver", **_command_args(params)):
+            return original(self, driver_command, params)
+    execute._qa_traced = True
+    WebDriver.execute = execute
+
+
+def _command_args(params):
+    """Parámetros útiles del comando, sin el texto de sendKeys (contraseñas)"""
+    if not params or 'text' in params:
+        return {}
+    return {key: str(params[key])[:120] for key in ('using', 'value', 'url', 'script', 'cmd') if key in params}
+
+
+def _record(name, cat, ts_us, dur_us, args):
+    global _dropped
+    thread = threading.current_thread()
+    event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': ts_us, 'dur': dur_us,
+             'pid': os.getpid(), 'tid': thread.ident}
+    if args:
+        event['args'] = args
+    with _lock:
+        if len(_events) >= Config.TRACE_MAX_EVENTS:
+            _dropped += 1
+            return
+        _events.append(event)
+        _thread_names.setdefault(thread.ident, thread.name)
+
+
+@contextmanager
+def span(name, cat="step", **args):
+    """Span anidable; el dict devuelto permite agregar args antes de cerrar"""
+    if not _enabled:
+        yield {}
+        return
+    ts_us = time.time_ns() // 1000
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    except BaseException as e:
+        args['error'] = f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        _record(name, cat, ts_us, (time.perf_counter_ns() - start) // 1000, args)
+
+
+def traced(cat="step", name=None):
+    """Decorador: la función completa como un span, con su resultado en args"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(label, cat) as info:
+                result = func(*args, **kwargs)
+                info['result'] = repr(result)[:80]
+                return result
+        return wrapper
+    return decorator
+
+
+def export(path=None):
+    """Escribir los spans del proceso como JSON trace-event; devuelve la ruta o None"""
+    global _dropped
+    with _lock:
+        events = list(_events)
+        threads = dict(_thread_names)
+        dropped = _dropped
+        _events.clear()
+        _dropped = 0
+    if not events:
+        return None
+
+    pid = os.getpid()
+    if path is None:
+        os.makedirs(Config.TRACE_DIR, exist_ok=True)
+        path = os.path.join(Config.TRACE_DIR, f"trace_{current_run_id()}_{pid}.json")
+    metadata = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                 'args': {'name': f"{os.path.basename(sys.argv[0]) or 'python'} ({pid})"}}]
+    metadata += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in threads.items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms',
+                   'otherData': {'run_id': current_run_id(), 'dropped_events': dropped}}, f)
+    if dropped:
+        print(f"[WARN] Traza truncada: {dropped} spans descartados (TRACE_MAX_EVENTS)")
+    print(f"[TRACE] Spans guardados en: {path}")
+    return path
+
+
+def self_times(events):
+    """Tiempo propio (sin hijos) por (cat, nombre), en ms"""
+    totals = {}
+    by_thread = {}
+    for event in events:
+        if event.get('ph') == 'X':
+            by_thread.setdefault((event['pid'], event['tid']), []).append(event)
+    for thread_events in by_thread.values():
+        thread_events.sort(key=lambda e: (e['ts'], -e['dur']))
+        stack = []  # [(fin, clave, hijos_us)]
+        own = {}
+
+        def close(entry):
+            end, key, dur, children = entry
+            own.setdefault(key, [0, 0])
+            own[key][0] += max(0, dur - children)
+            own[key][1] += 1
+            if stack:
+                stack[-1][3] += dur
+
+        for event in thread_events:
+            while stack and stack[-1][0] <= event['ts']:
+                close(stack.pop())
+            stack.append([event['ts'] + event['dur'], (event['cat'], event['name']), event['dur'], 0])
+        while stack:
+            close(stack.pop())
+        for key, (us, calls) in own.items():
+            total = totals.setdefault(key, [0, 0])
+            total[0] += us
+            total[1] += calls
+    return {key: (round(us / 1000, 1), calls) for key, (us, calls) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen y combinación de trazas trace-event")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--merge', help="Escribir todas las trazas en un solo archivo para Perfetto")
+    args = parser.parse_args()
+
+    events = []
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            events.extend(json.load(f)['traceEvents'])
+
+    if args.merge:
+        with open(args.merge, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"Traza combinada: {args.merge}")
+
+    ranking = sorted(self_times(events).items(), key=lambda item: item[1][0], reverse=True)
+    print(f"\n{'tiempo propio ms':>16} {'llamadas':>9}  span")
+    for (cat, name), (ms, calls) in ranking[:args.top]:
+        print(f"{ms:>16} {calls:>9}  [{cat}] {name}")
+    return 0
+
+
+if Config.TRACE_SPANS:
+    enable()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Esperas basadas en eventos para Selenium WebDriver
+Reemplaza los time.sleep fijos por condiciones reales: documento listo,
+cambio de ruta, DOM estable (MutationObserver) o respuesta de red concreta.
+Las pausas fijas quedan como opción explícita mediante Config.FIXED_SLEEPS.
+"""
+
+import time
+from contextlib import contextmanager
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from config import Config
+from tracing import span, traced
+
+# Frecuencia de sondeo: bastante más fina que los 0.5s por defecto de WebDriverWait
+POLL_FREQUENCY = 0.05
+
+# Resuelve cuando el DOM lleva quietMs sin mutaciones, o false al agotar timeoutMs
+DOM_SETTLED_SCRIPT = """
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var done = arguments[arguments.length - 1];
+var finished = false, timer = null;
+var observer = new MutationObserver(function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () { finish(true); }, quietMs);
+});
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    done(result);
+}
+observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+timer = setTimeout(function () { finish(true); }, quietMs);
+setTimeout(function () { finish(false); }, timeoutMs);
+"""
+
+# Resuelve después de dos frames de animación (layout y pintado aplicados)
+LAYOUT_SETTLED_SCRIPT = """
+var done = arguments[arguments.length - 1];
+requestAnimationFrame(function () { requestAnimationFrame(function () { done(true); }); });
+"""
+
+# Busca una entrada de Resource Timing terminada después de "since" cuya URL contenga el fragmento
+RESPONSE_SCRIPT = """
+var fragment = arguments[0], since = arguments[1];
+var entries = performance.getEntriesByType('resource');
+for (var i = entries.length - 1; i >= 0; i--) {
+    var entry = entries[i];
+    if (entry.name.indexOf(fragment) !== -1 && entry.responseEnd > since) {
+        return {url: entry.name, status: entry.responseStatus || null,
+                duration_ms: Math.round(entry.duration)};
+    }
+}
+return null;
+"""
+
+
+@contextmanager
+def script_timeout(driver, seconds):
+    """Timeout de scripts asíncronos de al menos 'seconds' mientras dure el bloque
+
+    Los drivers arrancan con Config.SCRIPT_TIMEOUT: si alcanza no se envía ningún
+    comando, y si hubo que subirlo se restaura al salir para no afectar a nadie más.
+    """
+    if seconds <= Config.SCRIPT_TIMEOUT:
+        yield
+        return
+    driver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        driver.set_script_timeout(Config.SCRIPT_TIMEOUT)
+
+
+def pause(seconds, reason=""):
+    """Pausa fija opcional: solo duerme si Config.FIXED_SLEEPS está activo"""
+    if Config.FIXED_SLEEPS:
+        if reason:
+            print(f"[WAIT] Pausa fija de {seconds}s: {reason}")
+        with span("pause", "sleep", seconds=seconds, reason=reason):
+            time.sleep(seconds)
+
+
+class Waits:
+    def __init__(self, driver, timeout=None):
+        self.driver = driver
+        self.timeout = timeout or Config.EXPLICIT_WAIT
+
+    def condition(self, predicate, timeout=None, message=""):
+        """Esperar a que predicate(driver) sea verdadero; devuelve su valor o None"""
+        try:
+            wait = WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=POLL_FREQUENCY)
+            with span("Waits.condition", "wait", message=message):
+                return wait.until(predicate)
+        except TimeoutException:
+            if message:
+                print(f"[WAIT] Timeout esperando {message}")
+            return None
+
+    def document_ready(self, timeout=None):
+        """Esperar a que document.readyState sea 'complete'"""
+        return bool(self.condition(
+            lambda d: d.execute_script("return document.readyState") == "complete",
+            timeout, "document.readyState == 'complete'"
+        ))
+
+    def route_change(self, from_url, timeout=None):
+        """Esperar a que la URL actual deje de ser from_url; devuelve la nueva URL o None"""
+        return self.condition(
+            lambda d: d.current_url if d.current_url != from_url else False,
+            timeout, f"cambio de ruta desde {from_url}"
+        )
+
+    def route_contains(self, fragment, timeout=None):
+        """Esperar a que la URL actual contenga el fragmento indicado"""
+        return bool(self.condition(
+            lambda d: fragment in d.current_url,
+            timeout, f"ruta que contenga '{fragment}'"
+        ))
+
+    def route_excludes(self, fragment, timeout=None):
+        """Esperar a que la URL actual ya no contenga el fragmento (p. ej. salir de /login)"""
+        return bool(self.condition(
+            lambda d: fragment not in d.current_url.lower(),
+            timeout, f"ruta sin '{fragment}'"
+        ))
+
+    @traced("wait")
+    def dom_settled(self, quiet_ms=300, timeout=None):
+        """Esperar a que el DOM pase quiet_ms sin mutaciones (renderizado de React terminado)"""
+        timeout = timeout or self.timeout
+        try:
+            with script_timeout(self.driver, timeout + 5):
+                settled = self.driver.execute_async_script(DOM_SETTLED_SCRIPT, quiet_ms, int(timeout * 1000))
+            if not settled:
+                print(f"[WAIT] El DOM siguió cambiando durante {timeout}s")
+            return bool(settled)
+        except WebDriverException as e:
+            print(f"[WAIT] No se pudo observar el DOM: {str(e)[:100]}")
+            return False
+
+    @traced("wait")
+    def layout_settled(self):
+        """Esperar dos frames de animación tras un cambio de tamaño o scroll"""
+        try:
+            return bool(self.driver.execute_async_script(LAYOUT_SETTLED_SCRIPT))
+        except WebDriverException:
+            return False
+
+    def network_mark(self):
+        """Marca temporal de la página para usar con response(since=...)"""
+        try:
+            return self.driver.execute_script("return performance.now();")
+        except WebDriverException:
+            return 0
+
+    def response(self, url_fragment, since=0, timeout=None):
+        """Esperar a que termine una petición cuya URL contenga url_fragment; devuelve la entrada o None"""
+        return self.condition(
+            lambda d: d.execute_script(RESPONSE_SCRIPT, url_fragment, since),
+            timeout, f"respuesta de red '{url_fragment}'"
+        )
+
+    @traced("wait")
+    def scroll_into_view(self, element):
+        """Scroll inmediato al elemento (sin animación 'smooth' que obligue a dormir)"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        self.layout_settled()